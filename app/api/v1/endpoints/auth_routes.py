@@ -1,12 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from fastapi.security import OAuth2PasswordRequestForm
 from fastapi.responses import JSONResponse
 from sqlmodel import Session
 
 from app.core.config import settings
-from app.core.database import get_session
+from app.core.database import get_session, get_read_session
 from app.core.security import Security
-from app.core.auth import create_access_token, create_refresh_token
+from app.core.auth import create_access_token, create_refresh_token, get_current_user, token_claims
+from app.core.token_versions import token_versions
+from app.core.refresh_tokens import refresh_token_store
+from app.core.availability import taken_names
 
 from app.crud.player_crud import crud_create_player
 from app.schemas.player_schema import PlayerCreate
@@ -14,8 +18,8 @@ from app.schemas.player_schema import PlayerCreate
 from app.crud.profile_crud import crud_create_profile
 from app.schemas.profile_schema import ProfileCreate
 
-from app.crud.auth_crud import crud_sign_up_user
-from app.schemas.auth_schema import SignUpRequest
+from app.crud.auth_crud import crud_sign_up_user, crud_read_sign_in_user, crud_read_token_claims
+from app.schemas.auth_schema import SignUpRequest, TokenClaims, AvailabilityResponse
 
 from app.crud.user_crud import crud_read_user_by_username, crud_create_user
 from app.models.user_model import User
@@ -36,7 +40,7 @@ class InvalidCredential(HTTPException):
 async def sign_in(form_data: OAuth2PasswordRequestForm = Depends(), session: Session = Depends(get_session)) -> JSONResponse:
     
     try:
-        user = await crud_read_user_by_username(session, username=form_data.username)
+        user, claims = await crud_read_sign_in_user(session, username=form_data.username)
     except:
         raise InvalidCredential
 
@@ -46,51 +50,89 @@ async def sign_in(form_data: OAuth2PasswordRequestForm = Depends(), session: Ses
     if not Security.verify_hash(form_data.password, user.password):
         raise InvalidCredential
 
-    response = _get_authentication_response(user)
+    response = _get_authentication_response(user, claims)
 
     return response
 
 @router.post("/sign_up")
 async def sign_up(sign_up_request: SignUpRequest, session: Session = Depends(get_session)) -> JSONResponse:
-    new_user = await crud_sign_up_user(session, sign_up_request)
-    response = _get_authentication_response(new_user)
+    new_user, claims = await crud_sign_up_user(session, sign_up_request)
+    response = _get_authentication_response(new_user, claims)
     return response 
 
+@router.get("/availability", response_model=AvailabilityResponse, response_model_exclude_none=True)
+async def availability(
+    username: Optional[str] = Query(None, max_length=64),
+    email: Optional[str] = Query(None, max_length=320),
+    session: Session = Depends(get_read_session),
+):
+    """Whether a username and/or email is still free; names never taken cost no query."""
+    if username is None and email is None:
+        raise HTTPException(status_code=400, detail="Pass a username and/or an email")
+
+    answers = await taken_names.available(session, username=username, email=email)
+    return AvailabilityResponse(
+        username_available=answers.get("username"),
+        email_available=answers.get("email"),
+    )
+
 @router.post("/sign_out")
-async def sign_out() -> JSONResponse:
+async def sign_out(request: Request, session: Session = Depends(get_session)) -> JSONResponse:
+    refresh_token = request.cookies.get(refresh_token_cookie_key)
+    if refresh_token:
+        try:
+            payload = Security.verify_refresh_token_payload(refresh_token)
+        except HTTPException:
+            payload = None  # nothing to revoke: it is expired or forged
+        if payload is not None:
+            # ✅ The refresh token (and any copy of it) stops working, not just this browser's cookie
+            await refresh_token_store.revoke_family(session, payload)
+            await session.commit()
+
     response = JSONResponse(content={"message": "Successfully signed out"})
+    _delete_refresh_token_cookie(response)
+    return response
 
-    response.delete_cookie(
-        key=refresh_token_cookie_key,
-        secure=False,
-        path="/",
-        samesite="lax",
-        httponly=True,
-    )
+@router.post("/revoke_tokens")
+async def revoke_tokens(current_user: TokenClaims = Depends(get_current_user), session: Session = Depends(get_session)) -> JSONResponse:
+    """Sign out everywhere: every access and refresh token issued so far stops working."""
+    await token_versions.bump(session, current_user.id)
+    await session.commit()
 
+    response = JSONResponse(content={"message": "Successfully signed out of all sessions"})
+    _delete_refresh_token_cookie(response)
     return response
 
 @router.post("/refresh_token")
-async def refresh_token(request: Request):
+async def refresh_token(request: Request, response: Response, session: Session = Depends(get_session)):
     refresh_token = request.cookies.get(refresh_token_cookie_key)
 
     if not refresh_token:
         raise HTTPException(status_code=401, detail="Missing refresh token")
 
     try:
-        user_id = Security.verify_refresh_token(refresh_token)
+        payload = Security.verify_refresh_token_payload(refresh_token)
     except ExpiredSignatureError:
         raise HTTPException(status_code=403, detail="Refresh token expired")
     except JWTError:
         raise HTTPException(status_code=401, detail="Invalid refresh token")
 
-    new_access_token = create_access_token({"sub": user_id})
-    return {"access_token": new_access_token, "user_id": int(user_id)}
+    # ✅ Re-read the claims: is_admin, the player and the token version may have changed
+    claims = await crud_read_token_claims(session, int(payload["sub"]))
+    if claims is None or payload.get("ver", 0) != claims.token_version:
+        raise HTTPException(status_code=401, detail="Invalid refresh token")
 
+    # ✅ Rotation: the presented token is used up, a copy of it presented later revokes the family
+    new_refresh_token = await refresh_token_store.rotate(session, payload, claims)
+    _set_refresh_token_cookie(response, new_refresh_token)
 
-def _get_authentication_response(user: UserRead) -> JSONResponse:
-    access_token = create_access_token({"sub": str(user.id)})
-    refresh_token = create_refresh_token({"sub": str(user.id)})
+    new_access_token = create_access_token(token_claims(claims))
+    return {"access_token": new_access_token, "user_id": claims.id}
+
+
+def _get_authentication_response(user: UserRead, claims: TokenClaims) -> JSONResponse:
+    access_token = create_access_token(token_claims(claims))
+    refresh_token = refresh_token_store.issue(claims)
 
     response = JSONResponse(content={
         "message": "Sucessfully signed in",
@@ -100,6 +142,11 @@ def _get_authentication_response(user: UserRead) -> JSONResponse:
         "access_token": access_token,
     })
 
+    _set_refresh_token_cookie(response, refresh_token)
+
+    return response
+
+def _set_refresh_token_cookie(response: Response, refresh_token: str) -> None:
     response.set_cookie(
         key=refresh_token_cookie_key,
         value=refresh_token,
@@ -109,4 +156,11 @@ def _get_authentication_response(user: UserRead) -> JSONResponse:
         path="/",        # Send this cookie to all routes
     )
 
-    return response
\ No newline at end of file
+def _delete_refresh_token_cookie(response: Response) -> None:
+    response.delete_cookie(
+        key=refresh_token_cookie_key,
+        secure=False,
+        path="/",
+        samesite="lax",
+        httponly=True,
+    )
@@ -0,0 +1,20 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.auth import get_current_user
+from app.core.database import get_session
+from app.core.responses import SchemaResponse
+from app.schemas.batch_schema import BatchRequest, BatchResponse
+from app.services.batch_service import BatchService
+
+router = APIRouter(dependencies=[Depends(get_session), Depends(get_current_user)])
+
+
+@router.post("", response_model=BatchResponse)
+async def run_batch(batch: BatchRequest, session: AsyncSession = Depends(get_session)):
+    response = await BatchService.run(session, batch.operations)
+
+    # ✅ a failed batch answers with the status of the operation that failed
+    status_code = 200
+    if not response.committed:
+        status_code = next(result.status_code for result in response.results if result.status_code not in (0, 200))
+    return SchemaResponse(response, status_code=status_code)
@@ -0,0 +1,18 @@
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import FileResponse
+from app.core.auth import get_current_admin
+from app.core.profiling import profile_store
+
+router = APIRouter(dependencies=[Depends(get_current_admin)])
+
+
+@router.get("/profiles")
+async def list_profiles():
+    return profile_store.list()
+
+@router.get("/profiles/{name}")
+async def download_profile(name: str):
+    path = profile_store.path(name)
+    if path is None:
+        raise HTTPException(status_code=404, detail=f"Profile {name} not found")
+    return FileResponse(path, filename=name, media_type="application/octet-stream")
@@ -1,13 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlmodel import Session
 from typing import List
-from app.core.database import get_session
+from app.core.database import get_session, get_read_session
+from app.core.responses import SchemaResponse
+from app.core.singleflight import read_flights, flight_key
+from app.core.fieldsets import Fieldset, sparse_fieldset
 from app.core.auth import get_current_user, get_current_admin
 from app.schemas.player_schema import PlayerCreate, PlayerRead
 from app.schemas.profile_schema import ProfileRead
 from app.schemas.subject_schema import SubjectRead
+from app.schemas.review_schema import QuestReviewRead
 from app.crud.player_crud import crud_create_player, crud_read_all_players_with_users, crud_read_player_with_user, crud_read_all_player_subjects, crud_read_player_profile
-from app.models import User
+from app.crud.review_crud import crud_read_due_reviews
+from app.schemas.auth_schema import TokenClaims
 
 router = APIRouter(dependencies=[Depends(get_session), Depends(get_current_user)])
 # router = APIRouter()
@@ -17,22 +22,28 @@ async def create_player(user_id: int, player_create: PlayerCreate, session: Sess
     return await crud_create_player(session, user_id, player_create)
 
 @router.get("/{player_id}/", response_model=PlayerRead)
-async def read_player(player_id: int, session: Session = Depends(get_session)):
-    return await crud_read_player_with_user(session, player_id)
+async def read_player(player_id: int, request: Request, session: Session = Depends(get_read_session), current_user: TokenClaims = Depends(get_current_user), fieldset: Fieldset = Depends(sparse_fieldset(PlayerRead))):
+    player = await read_flights.do(
+        flight_key(request, current_user.is_admin),
+        lambda flight_session: crud_read_player_with_user(flight_session, player_id),
+        session.factory,
+    )
+    return SchemaResponse(fieldset.dump(player))
     
 @router.get("", response_model=List[PlayerRead])
-async def read_all_players(session: Session = Depends(get_session), admin_user: User = Depends(get_current_admin)):
+async def read_all_players(session: Session = Depends(get_read_session), admin_user: TokenClaims = Depends(get_current_admin)):
     if not admin_user.is_admin  :
         raise HTTPException(status_code=403, detail="Not enough permissions") 
-    return await crud_read_all_players_with_users(session)
+    return SchemaResponse(await crud_read_all_players_with_users(session))
     
 @router.get("/{player_id}/subjects", response_model=List[SubjectRead])
-async def read_all_player_subjects(player_id: int, session: Session = Depends(get_session)):
-    return await crud_read_all_player_subjects(session, player_id)
+async def read_all_player_subjects(player_id: int, session: Session = Depends(get_read_session), fieldset: Fieldset = Depends(sparse_fieldset(SubjectRead))):
+    return SchemaResponse(fieldset.dump_all(await crud_read_all_player_subjects(session, player_id)))
 
 @router.get("/{player_id}/profile", response_model=ProfileRead)
-async def read_player_profile(player_id: int, session: Session = Depends(get_session)):
-    return await crud_read_player_profile(session, player_id)
-
-
+async def read_player_profile(player_id: int, session: Session = Depends(get_read_session)):
+    return SchemaResponse(await crud_read_player_profile(session, player_id))
 
+@router.get("/{player_id}/reviews/due", response_model=List[QuestReviewRead])
+async def read_due_reviews(player_id: int, limit: int = Query(default=20, ge=1, le=100), session: Session = Depends(get_read_session)):
+    return SchemaResponse(await crud_read_due_reviews(session, player_id, limit))
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.core.database import get_session
+from app.core.database import get_session, get_read_session
+from app.core.responses import SchemaResponse
 from app.core.auth import get_current_user
 from app.schemas.profile_schema import ProfileCreate, ProfileRead, ProfileUpdate
 from app.crud.profile_crud import crud_create_profile, crud_read_profile, crud_read_all_profiles, crud_update_profile
@@ -13,12 +14,12 @@ async def create_profile(player_id: int, profile_create: ProfileCreate, session:
     return await crud_create_profile(session, player_id, profile_create)
 
 @router.get("/{profile_id}", response_model=ProfileRead)
-async def read_profile(profile_id: int, session: AsyncSession = Depends(get_session)):
-    return await crud_read_profile(session, profile_id)
+async def read_profile(profile_id: int, session: AsyncSession = Depends(get_read_session)):
+    return SchemaResponse(await crud_read_profile(session, profile_id))
 
 @router.get("/", response_model=list[ProfileRead])
-async def read_all_profiles(session: AsyncSession = Depends(get_session)):
-    return await crud_read_all_profiles(session)
+async def read_all_profiles(session: AsyncSession = Depends(get_read_session)):
+    return SchemaResponse(await crud_read_all_profiles(session))
 
 @router.patch("/{profile_id}", response_model=ProfileRead)
 async def update_profile(profile_id: int, profile_update: ProfileUpdate, session: AsyncSession = Depends(get_session)):
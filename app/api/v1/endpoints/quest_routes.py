@@ -2,7 +2,9 @@ from fastapi import APIRouter, Depends
 from app.core.auth import get_current_user
 from app.schemas.quest_schema import QuestRead, QuestCreate, QuestUpdate
 from app.crud.quest_crud import crud_create_quest, crud_read_quest, crud_update_quest, crud_read_all_quests, crud_delete_quest
-from app.core.database import get_session
+from app.core.database import get_session, get_read_session
+from app.core.responses import SchemaResponse
+from app.core.fieldsets import Fieldset, sparse_fieldset
 from sqlalchemy.ext.asyncio import AsyncSession
 
 # router = APIRouter()
@@ -14,12 +16,12 @@ async def create_quest(new_quest: QuestCreate, session: AsyncSession = Depends(g
     return await crud_create_quest(session, new_quest)
 
 @router.get("/{quest_id}", response_model=QuestRead)
-async def read_quest(quest_id: int, session: AsyncSession = Depends(get_session)):
-    return await crud_read_quest(session, quest_id)
+async def read_quest(quest_id: int, session: AsyncSession = Depends(get_read_session), fieldset: Fieldset = Depends(sparse_fieldset(QuestRead))):
+    return SchemaResponse(await crud_read_quest(session, quest_id, fieldset))
 
 @router.get("/", response_model=list[QuestRead])
-async def read_all_quests(session: AsyncSession = Depends(get_session)):
-    return await crud_read_all_quests(session)
+async def read_all_quests(session: AsyncSession = Depends(get_read_session), fieldset: Fieldset = Depends(sparse_fieldset(QuestRead))):
+    return SchemaResponse(await crud_read_all_quests(session, fieldset))
 
 @router.patch("/{quest_id}", response_model=QuestRead)
 async def update_quest(quest_id: int, updated_quest: QuestUpdate, session: AsyncSession = Depends(get_session)):
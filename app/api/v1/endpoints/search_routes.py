@@ -0,0 +1,35 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.auth import get_current_user
+from app.core.database import get_read_session
+from app.core.responses import SchemaResponse
+from app.schemas.auth_schema import TokenClaims
+from app.schemas.search_schema import SearchEntityType, SearchPage
+from app.services.search_service import SearchService, InvalidSearchCursor
+
+router = APIRouter(dependencies=[Depends(get_current_user)])
+
+
+@router.get("", response_model=SearchPage)
+async def search(
+    player_id: Optional[int] = None,
+    q: str = Query(..., min_length=1, max_length=100),
+    types: list[SearchEntityType] = Query(default=list(SearchEntityType)),
+    limit: int = Query(default=20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    session: AsyncSession = Depends(get_read_session),
+    current_user: TokenClaims = Depends(get_current_user),
+):
+    # ✅ Callers search their own player's index; only admins may name another player
+    if player_id is None:
+        player_id = current_user.player_id
+    if player_id is None or (player_id != current_user.player_id and not current_user.is_admin):
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+
+    try:
+        page = await SearchService.search(session, player_id, q, types, limit, cursor)
+    except InvalidSearchCursor:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    return SchemaResponse(page)
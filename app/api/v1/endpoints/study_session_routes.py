@@ -1,6 +1,8 @@
 from fastapi import APIRouter, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.core.database import get_session
+from app.core.database import get_session, get_read_session
+from app.core.responses import SchemaResponse
+from app.core.fieldsets import Fieldset, sparse_fieldset
 from app.core.auth import get_current_user
 from app.schemas.study_session_schema import (
     StudySessionRead,
@@ -25,15 +27,20 @@ async def create_study_session(
 
 
 @router.get("/", response_model=list[StudySessionRead])
-async def read_all_study_sessions(session: AsyncSession = Depends(get_session)):
-    return await crud_read_all_study_sessions(session)
+async def read_all_study_sessions(
+    session: AsyncSession = Depends(get_read_session),
+    fieldset: Fieldset = Depends(sparse_fieldset(StudySessionRead)),
+):
+    return SchemaResponse(await crud_read_all_study_sessions(session, fieldset))
 
 
 @router.get("/{study_session_id}", response_model=StudySessionRead)
 async def read_study_session(
-    study_session_id: int, session: AsyncSession = Depends(get_session)
+    study_session_id: int,
+    session: AsyncSession = Depends(get_read_session),
+    fieldset: Fieldset = Depends(sparse_fieldset(StudySessionRead)),
 ):
-    return await crud_read_study_session(session, study_session_id)
+    return SchemaResponse(await crud_read_study_session(session, study_session_id, fieldset))
 
 
 @router.patch("/{study_session_id}/end", response_model=StudySessionRead)
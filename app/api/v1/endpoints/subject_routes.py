@@ -1,10 +1,15 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.auth import get_current_user
 
-from app.core.database import get_session
+from app.core.database import get_session, get_read_session
+from app.core.responses import SchemaResponse
+from app.core.singleflight import read_flights, flight_key
+from app.core.fieldsets import Fieldset, sparse_fieldset
+from app.schemas.auth_schema import TokenClaims
 from app.schemas.subject_schema import SubjectCreate, SubjectRead, SubjectUpdate
 from app.schemas.quest_schema import QuestRead
+from app.schemas.deletion_schema import DeleteMode
 from app.crud.subject_crud import crud_create_subject, crud_read_subject, crud_update_subject, crud_delete_subject, crud_read_subject_all_quests
 
 from app.schemas.material_schema import MaterialCreate, MaterialUpdate, MaterialRead
@@ -25,20 +30,30 @@ async def create_subject(player_id: int, subject_create: SubjectCreate, session:
     return await crud_create_subject(session, player_id, subject_create)
 
 @router.get("/{subject_id}", response_model=SubjectRead)
-async def read_subject(subject_id: int, session: AsyncSession = Depends(get_session)):
-    return await crud_read_subject(session, subject_id)
+async def read_subject(subject_id: int, session: AsyncSession = Depends(get_read_session), fieldset: Fieldset = Depends(sparse_fieldset(SubjectRead))):
+    # cached read: the fieldset only trims the output
+    return SchemaResponse(fieldset.dump(await crud_read_subject(session, subject_id)))
 
 @router.get("/{subject_id}/quests", response_model=list[QuestRead])
-async def read_subject_quests(subject_id: int, session: AsyncSession = Depends(get_session)):
-    return await crud_read_subject_all_quests(session, subject_id)
+async def read_subject_quests(subject_id: int, request: Request, session: AsyncSession = Depends(get_read_session), current_user: TokenClaims = Depends(get_current_user), fieldset: Fieldset = Depends(sparse_fieldset(QuestRead))):
+    quests = await read_flights.do(
+        flight_key(request, current_user.is_admin),
+        lambda flight_session: crud_read_subject_all_quests(flight_session, subject_id),
+        session.factory,
+    )
+    return SchemaResponse(fieldset.dump_all(quests))
 
 @router.patch("/{subject_id}", response_model=SubjectRead)
 async def update_subject(subject_id: int, updated_subject: SubjectUpdate, session: AsyncSession = Depends(get_session)):
     return await crud_update_subject(session, subject_id, updated_subject)
 
 @router.delete("/{subject_id}", response_model=SubjectRead)
-async def delete_subject(subject_id: int, session: AsyncSession = Depends(get_session)):
-    return await crud_delete_subject(session, subject_id)
+async def delete_subject(
+    subject_id: int,
+    mode: DeleteMode = Query(DeleteMode.AUTO),
+    session: AsyncSession = Depends(get_session),
+):
+    return await crud_delete_subject(session, subject_id, mode)
 
 
 
@@ -58,18 +73,20 @@ async def create_material(
 @router.get("/{subject_id}/materials", response_model=list[MaterialRead])
 async def read_all_materials(
     subject_id: int,
-    session: AsyncSession = Depends(get_session)
+    session: AsyncSession = Depends(get_read_session),
+    fieldset: Fieldset = Depends(sparse_fieldset(MaterialRead)),
 ):
-    return await crud_read_all_subject_materials(session, subject_id)
+    return SchemaResponse(fieldset.dump_all(await crud_read_all_subject_materials(session, subject_id)))
 
 # READ one material
 @router.get("/{subject_id}/materials/{material_id}", response_model=MaterialRead)
 async def read_material(
     subject_id: int,
     material_id: int,
-    session: AsyncSession = Depends(get_session)
+    session: AsyncSession = Depends(get_read_session),
+    fieldset: Fieldset = Depends(sparse_fieldset(MaterialRead)),
 ):
-    return await crud_read_material(session, material_id, subject_id)
+    return SchemaResponse(await crud_read_material(session, material_id, subject_id, fieldset))
 
 # UPDATE material
 @router.patch("/{subject_id}/materials/{material_id}", response_model=MaterialRead)
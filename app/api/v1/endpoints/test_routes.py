@@ -1,6 +1,12 @@
 from fastapi import APIRouter, Depends
 from sqlmodel import Session
-from app.core.database import get_session
+from app.core.auth import get_current_admin
+from app.core.database import get_session, pool_managers
+from app.core.singleflight import read_flights
+from app.core.invalidation import invalidation_bus
+from app.core.admission import admission_controller
+from app.core.refresh_tokens import refresh_token_store
+from app.core.availability import taken_names
 from sqlalchemy import text
 
 router = APIRouter()
@@ -8,4 +14,28 @@ router = APIRouter()
 @router.get("/debug/foreign_keys/")
 def check_foreign_keys(session: Session = Depends(get_session)):
     result = session.exec(text("PRAGMA foreign_keys;")).fetchone()
-    return {"foreign_keys_enabled": bool(result[0])}
\ No newline at end of file
+    return {"foreign_keys_enabled": bool(result[0])}
+
+@router.get("/debug/pool", dependencies=[Depends(get_current_admin)])
+async def pool_stats():
+    return [manager.stats() for manager in pool_managers]
+
+@router.get("/debug/single_flight", dependencies=[Depends(get_current_admin)])
+async def single_flight_stats():
+    return read_flights.stats()
+
+@router.get("/debug/invalidation", dependencies=[Depends(get_current_admin)])
+async def invalidation_stats():
+    return invalidation_bus.stats()
+
+@router.get("/debug/admission", dependencies=[Depends(get_current_admin)])
+async def admission_stats():
+    return admission_controller.stats()
+
+@router.get("/debug/refresh_tokens", dependencies=[Depends(get_current_admin)])
+async def refresh_token_stats():
+    return refresh_token_store.stats()
+
+@router.get("/debug/availability", dependencies=[Depends(get_current_admin)])
+async def availability_stats():
+    return taken_names.stats()
@@ -1,7 +1,9 @@
-from fastapi import APIRouter, Depends
-from app.core.database import get_session
+from fastapi import APIRouter, Depends, Query
+from app.core.database import get_session, get_read_session
+from app.core.responses import SchemaResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.schemas.user_schema import UserCreate, UserRead, UserUpdate
+from app.schemas.deletion_schema import DeleteMode
 from app.crud.user_crud import crud_create_user, crud_read_user_by_id, crud_read_all_users, crud_update_user, crud_delete_user, crud_read_user_player
 from app.core.auth import get_current_user
 
@@ -20,18 +22,22 @@ async def update_user(user_id: int, user_update: UserUpdate, session: AsyncSessi
     return await crud_update_user(session, user_id, user_update)
 
 @router.get("/{user_id}", response_model=UserRead)
-async def read_user(user_id: int, session: AsyncSession = Depends(get_session)):
-    return await crud_read_user_by_id(session, user_id)
+async def read_user(user_id: int, session: AsyncSession = Depends(get_read_session)):
+    return SchemaResponse(await crud_read_user_by_id(session, user_id))
 
 @router.get("/{user_id}/player", response_model=PlayerRead)
-async def read_user_player(user_id: int, session: AsyncSession = Depends(get_session)):
-    return await crud_read_user_player(session, user_id)
+async def read_user_player(user_id: int, session: AsyncSession = Depends(get_read_session)):
+    return SchemaResponse(await crud_read_user_player(session, user_id))
 
 @router.get("/", response_model=list[UserRead])
-async def read_all_users(session: AsyncSession = Depends(get_session)):
-    return await crud_read_all_users(session)
+async def read_all_users(session: AsyncSession = Depends(get_read_session)):
+    return SchemaResponse(await crud_read_all_users(session))
 
 @router.delete("/{user_id}", response_model=UserRead)
-async def delete_user(user_id: int, session: AsyncSession = Depends(get_session)):
-    return await crud_delete_user(session, user_id)
+async def delete_user(
+    user_id: int,
+    mode: DeleteMode = Query(DeleteMode.AUTO),
+    session: AsyncSession = Depends(get_session),
+):
+    return await crud_delete_user(session, user_id, mode)
 
@@ -0,0 +1,166 @@
+import asyncio
+import json
+import re
+import time
+from dataclasses import dataclass, asdict
+from typing import Callable, Optional
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.database import engine
+
+
+class LoopLagMonitor:
+    """Samples how late the event loop wakes up a ``sleep(interval)``.
+
+    Anything running on the loop without yielding (bcrypt, big JSON encodes, prints to
+    a slow stdout) shows up as lag. ``lag_seconds`` is an exponentially weighted
+    average, so a single hiccup does not count as overload.
+    """
+
+    def __init__(self, interval: float = 0.1, smoothing: float = 0.3):
+        self.interval = interval
+        self.smoothing = smoothing
+        self.lag_seconds = 0.0
+        self.lag_seconds_max = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._sample_forever())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _sample_forever(self) -> None:
+        while True:
+            started_at = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            lag = max(time.perf_counter() - started_at - self.interval, 0.0)
+            self.lag_seconds += self.smoothing * (lag - self.lag_seconds)
+            self.lag_seconds_max = max(self.lag_seconds_max, lag)
+
+    def stats(self) -> dict:
+        return {"lag_seconds": self.lag_seconds, "lag_seconds_max": self.lag_seconds_max}
+
+
+@dataclass
+class AdmissionMetrics:
+    admitted: int = 0
+    admitted_priority_under_load: int = 0
+    rejected: int = 0
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+class AdmissionController:
+    """Decides which requests a worker takes on while it is overloaded.
+
+    The worker counts as overloaded while the loop lag is above ``max_lag_seconds``
+    or recent pool checkouts waited longer than ``max_pool_wait_seconds`` on average
+    (0 disables either check). Requests whose path matches ``priority_paths`` (signing
+    in, refreshing tokens, ending a study session, ...) are still admitted; everything
+    else is turned away before any work is done for it.
+    """
+
+    def __init__(
+        self,
+        lag_monitor: LoopLagMonitor,
+        pool_wait: Callable[[], float],
+        max_lag_seconds: float,
+        max_pool_wait_seconds: float,
+        priority_paths: list[str],
+        retry_after_seconds: int = 1,
+    ):
+        self.lag_monitor = lag_monitor
+        self.pool_wait = pool_wait
+        self.max_lag_seconds = max_lag_seconds
+        self.max_pool_wait_seconds = max_pool_wait_seconds
+        self.priority = re.compile("|".join(f"(?:{pattern})" for pattern in priority_paths)) if priority_paths else None
+        self.retry_after_seconds = retry_after_seconds
+        self.metrics = AdmissionMetrics()
+
+    def overload_reason(self) -> Optional[str]:
+        if self.max_lag_seconds > 0 and self.lag_monitor.lag_seconds > self.max_lag_seconds:
+            return "event loop lag"
+        if self.max_pool_wait_seconds > 0 and self.pool_wait() > self.max_pool_wait_seconds:
+            return "database pool wait"
+        return None
+
+    def admit(self, path: str) -> Optional[str]:
+        """None to admit the request, or why it is rejected."""
+        reason = self.overload_reason()
+        if reason is None:
+            self.metrics.admitted += 1
+        elif self.priority is not None and self.priority.match(path):
+            self.metrics.admitted_priority_under_load += 1
+            reason = None
+        else:
+            self.metrics.rejected += 1
+        return reason
+
+    def stats(self) -> dict:
+        return {
+            "overloaded": self.overload_reason(),
+            **self.lag_monitor.stats(),
+            "pool_wait_seconds": self.pool_wait(),
+            **self.metrics.as_dict(),
+        }
+
+
+class AdmissionControlMiddleware:
+    """Answers 503 + ``Retry-After`` to the requests the controller turns away."""
+
+    def __init__(self, app: ASGIApp, controller: AdmissionController):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http":
+            reason = self.controller.admit(scope["path"])
+            if reason is not None:
+                await self._reject(send, reason)
+                return
+
+        await self.app(scope, receive, send)
+
+    async def _reject(self, send: Send, reason: str) -> None:
+        body = json.dumps({"detail": f"Server overloaded ({reason}), retry later"}).encode()
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 503,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", str(self.controller.retry_after_seconds).encode()),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
+
+
+def _primary_pool_wait() -> float:
+    tracker = getattr(engine.pool, "wait_tracker", None)
+    return tracker.recent_average() if tracker is not None else 0.0
+
+
+loop_lag_monitor = LoopLagMonitor(interval=settings.ADMISSION_LAG_SAMPLE_INTERVAL_MS / 1000)
+
+admission_controller = AdmissionController(
+    lag_monitor=loop_lag_monitor,
+    pool_wait=_primary_pool_wait,
+    max_lag_seconds=settings.ADMISSION_MAX_LOOP_LAG_MS / 1000,
+    max_pool_wait_seconds=settings.ADMISSION_MAX_POOL_WAIT_MS / 1000,
+    priority_paths=settings.admission_priority_paths,
+    retry_after_seconds=settings.ADMISSION_RETRY_AFTER_SECONDS,
+)
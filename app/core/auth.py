@@ -1,13 +1,17 @@
+import logging
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 from jose import JWTError, jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from app.models import User
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.database import get_session
-from sqlmodel import select
 from app.core.config import settings
+from app.core.token_versions import token_versions
+from app.crud.auth_crud import crud_read_token_claims
+from app.schemas.auth_schema import TokenClaims
+
+logger = logging.getLogger(__name__)
 
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/sign_in")
@@ -19,40 +23,82 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode.update({"exp": expire})
     return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)  # ✅ Use settings
 
+def token_claims(claims: TokenClaims) -> dict:
+    """JWT payload for ``claims``: "sub"-only unless ACCESS_TOKEN_CLAIMS."""
+    if not settings.ACCESS_TOKEN_CLAIMS:
+        return {"sub": str(claims.id)}
+    return {"sub": str(claims.id), "pid": claims.player_id, "adm": claims.is_admin, "ver": claims.token_version}
+
 def create_refresh_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     expire = datetime.now(timezone.utc) + (expires_delta or timedelta(days=settings.ACCESS_TOKEN_EXPIRE_DAYS))
     to_encode.update({"exp": expire})
     return jwt.encode(to_encode, settings.REFRESH_SECRET_KEY, algorithm=settings.ALGORITHM)
 
-async def get_current_user(token: str = Depends(oauth2_scheme), session: AsyncSession = Depends(get_session)) -> User:
-    """Verify token and return the logged-in user."""
+def _decode_access_token(token: str) -> tuple[int, dict]:
+    """``(user_id, payload)`` of a valid access token; raises JWTError or ValueError."""
+    payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    user_id = payload.get("sub")
+    if user_id is None:
+        raise JWTError("Missing subject")
+    return int(user_id), payload
+
+async def _verified_claims(user_id: int, payload: dict) -> Optional[TokenClaims]:
+    """Claims carried by ``payload``, or None if the token version was revoked since."""
+    claims = TokenClaims(
+        id=user_id, player_id=payload.get("pid"), is_admin=payload.get("adm", False), token_version=payload["ver"]
+    )
+    if claims.token_version != await token_versions.current(user_id):
+        return None
+    return claims
+
+async def claims_from_token(token: str) -> Optional[TokenClaims]:
+    """Claims of a valid, unrevoked claims token, without a query.
+
+    None for anything else, including "sub"-only tokens (those need a query).
+    """
+    try:
+        user_id, payload = _decode_access_token(token)
+    except (JWTError, ValueError):
+        return None
+    if "ver" not in payload:
+        return None
+    return await _verified_claims(user_id, payload)
+
+async def get_current_user(token: str = Depends(oauth2_scheme), session: AsyncSession = Depends(get_session)) -> TokenClaims:
+    """Verify token and return who is logged in.
+
+    Claims tokens are authorized from the token alone (plus the cached token version);
+    "sub"-only tokens still cost a query.
+    """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Invalid authentication credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        user_id: int = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
-    except JWTError as e:
-        print("JWTError in get_current_user", e)
+        user_id, payload = _decode_access_token(token)
+    except (JWTError, ValueError) as e:
+        logger.debug("Rejected access token: %s", e)
         raise credentials_exception
-    
-    
 
-    result = await session.execute(select(User).where(User.id == int(user_id)))
-    user = result.scalar_one_or_none()
-    if user is None:
+    if "ver" in payload:
+        # ✅ No query: the claims are signed, only the revocation counter is checked (cached)
+        claims = await _verified_claims(user_id, payload)
+        if claims is None:
+            logger.debug("Rejected revoked access token", extra={"user_id": user_id})
+            raise credentials_exception
+        return claims
+
+    claims = await crud_read_token_claims(session, user_id)
+    if claims is None:
         raise credentials_exception
-    return user 
+    return claims
 
-def get_current_admin(current_user: User = Depends(get_current_user)):
+def get_current_admin(current_user: TokenClaims = Depends(get_current_user)):
     if not current_user.is_admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Admin access only",
         )
-    return current_user
\ No newline at end of file
+    return current_user
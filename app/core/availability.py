@@ -0,0 +1,203 @@
+import asyncio
+import logging
+from dataclasses import dataclass, asdict
+from typing import Optional
+
+from sqlalchemy import func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.bloom import BloomFilter
+from app.core.config import settings
+from app.core.database import engine
+from app.core.invalidation import invalidation_bus
+from app.models.user_model import User
+
+logger = logging.getLogger(__name__)
+
+# invalidation keys: "taken_name:u:<username>" / "taken_name:e:<email>" add the name to every worker's filter
+TAKEN_PREFIX = "taken_name:"
+
+
+def _username_key(username: str) -> str:
+    return f"u:{username}"
+
+
+def _email_key(email: str) -> str:
+    return f"e:{email}"
+
+
+@dataclass
+class AvailabilityMetrics:
+    filter_negatives: int = 0
+    untrusted_checks: int = 0
+    store_checks: int = 0
+    false_positives: int = 0
+    rebuilds: int = 0
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+class TakenNamesIndex:
+    """Per-worker Bloom filter of every username and email in the user table.
+
+    A name the filter has never seen is free without asking the database; a possible
+    hit is confirmed with the indexed ``User.username`` / ``User.email`` lookup. Names
+    taken on any worker are published on ``invalidation_bus`` by the transaction taking
+    them, so a miss is only trusted while the bus is listening and the filter was built
+    after it connected: otherwise (SQLite, bus disabled or down, a flush after missed
+    messages) every check is a lookup. Names freed by deleting or renaming a user stay
+    in the filter (they only cost that lookup) until the next rebuild, every
+    ``rebuild_seconds`` (or sooner, once more than ``STALE_FRACTION`` of the names in it
+    were freed).
+
+    The answer is advice for the sign-up form: the unique constraints stay the
+    authority when the account is actually created.
+    """
+
+    STALE_FRACTION = 0.1
+
+    def __init__(self, engine, rebuild_seconds: float, error_rate: float):
+        self.engine = engine
+        self.rebuild_seconds = rebuild_seconds
+        self.error_rate = error_rate
+        self.metrics = AvailabilityMetrics()
+        self._filter: Optional[BloomFilter] = None
+        self._complete = False  # built while the bus was listening: nothing taken elsewhere missed
+        self._added_while_building: Optional[list[str]] = None
+        self._freed = 0
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    async def publish_taken(self, session: AsyncSession, username: Optional[str] = None, email: Optional[str] = None) -> None:
+        """Add names taken in the session's transaction to every worker's filter once it commits."""
+        keys = [key for key in (username and _username_key(username), email and _email_key(email)) if key]
+        await invalidation_bus.publish(session, *(TAKEN_PREFIX + key for key in keys))
+
+    def add(self, keys: list[str]) -> None:
+        if self._filter is not None:
+            self._filter.update(keys)
+        if self._added_while_building is not None:
+            self._added_while_building.extend(keys)
+
+    def _evict(self, keys: list[str]) -> None:
+        self.add([key[len(TAKEN_PREFIX):] for key in keys if key.startswith(TAKEN_PREFIX)])
+
+    def _flush(self) -> None:
+        # names taken elsewhere may have been missed: look every name up until rebuilt
+        self._complete = False
+        self._wake.set()
+
+    def trusted(self) -> bool:
+        """Whether a filter miss means the name is free."""
+        return self._filter is not None and self._complete and invalidation_bus.metrics.connected
+
+    def remove(self, username: Optional[str] = None, email: Optional[str] = None) -> None:
+        """Record names freed (user deleted or renamed). Bloom filters cannot forget: count
+        them, and rebuild early once too many answers would need the lookup."""
+        self._freed += (username is not None) + (email is not None)
+        if self._filter is not None and self._freed > self._filter.count * self.STALE_FRACTION:
+            self._wake.set()
+
+    async def available(self, session: AsyncSession, username: Optional[str] = None, email: Optional[str] = None) -> dict:
+        """{"username": bool, "email": bool} for the names given."""
+        answers = {}
+        possible = {}
+        trusted = self.trusted()
+        for field, value, key in (
+            ("username", username, username and _username_key(username)),
+            ("email", email, email and _email_key(email)),
+        ):
+            if value is None:
+                continue
+            if self._filter is not None and key not in self._filter:
+                if trusted:
+                    self.metrics.filter_negatives += 1
+                    answers[field] = True
+                    continue
+                self.metrics.untrusted_checks += 1
+            possible[field] = value
+
+        if possible:
+            self.metrics.store_checks += 1
+            conditions = []
+            if "username" in possible:
+                conditions.append(User.username == possible["username"])
+            if "email" in possible:
+                conditions.append(User.email == possible["email"])
+            result = await session.execute(select(User.username, User.email).where(or_(*conditions)))
+            taken = result.all()
+            for field, value in possible.items():
+                answers[field] = not any(getattr(row, field) == value for row in taken)
+                if answers[field] and trusted:
+                    self.metrics.false_positives += 1
+
+        return answers
+
+    async def build(self) -> None:
+        """Rebuild the filter from the user table, streamed."""
+        self._added_while_building = []
+        self._freed = 0
+        complete = invalidation_bus.metrics.connected
+        try:
+            async with self.engine.connect() as conn:
+                users = await conn.scalar(select(func.count()).select_from(User))
+                bloom = BloomFilter.sized_for(2 * users, self.error_rate)
+                result = await conn.stream(select(User.username, User.email).execution_options(yield_per=5000))
+                async for username, email in result:
+                    bloom.add(_username_key(username))
+                    bloom.add(_email_key(email))
+            # sign-ups committed after our read started may not be in what we read
+            bloom.update(self._added_while_building)
+            self._filter, self._complete = bloom, complete
+            self.metrics.rebuilds += 1
+            logger.info("Built username/email filter", extra={"users": users, "bits": bloom.size})
+        finally:
+            self._added_while_building = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            self._wake.clear()
+            try:
+                await self.build()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Building the username/email filter failed, retrying in %.0fs", self.rebuild_seconds)
+
+            # built before the bus connected (startup): rebuild once it has
+            wait = self.rebuild_seconds if self._complete or not invalidation_bus.enabled else 1
+            try:
+                await asyncio.wait_for(self._wake.wait(), wait)
+            except asyncio.TimeoutError:
+                pass
+
+    def stats(self) -> dict:
+        return {
+            "filter": self._filter.stats() if self._filter is not None else None,
+            "trusted": self.trusted(),
+            "freed_since_build": self._freed,
+            **self.metrics.as_dict(),
+        }
+
+
+taken_names = TakenNamesIndex(
+    engine,
+    rebuild_seconds=settings.AVAILABILITY_FILTER_REBUILD_SECONDS,
+    error_rate=settings.AVAILABILITY_FILTER_ERROR_RATE,
+)
+invalidation_bus.subscribe(taken_names._evict, taken_names._flush)
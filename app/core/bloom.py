@@ -0,0 +1,58 @@
+import hashlib
+import math
+from typing import Iterable
+
+
+class BloomFilter:
+    """Set membership in a fixed bit array: no false negatives, false positives at
+    about ``error_rate`` while at most ``capacity`` items are in it.
+
+    Items cannot be removed; rebuild the filter from the source of truth instead.
+    Positions come from one blake2b digest split into two hashes (Kirsch–Mitzenmacher
+    double hashing), so ``add`` and ``in`` hash the item once.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        capacity = max(capacity, 1)
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2), 8)
+        self.hash_count = max(round(self.size / capacity * math.log(2)), 1)
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    @classmethod
+    def sized_for(cls, expected: int, error_rate: float = 0.01, headroom: float = 2.0, minimum: int = 1024) -> "BloomFilter":
+        """A filter for ``expected`` items now, with room for ``headroom`` times as many before it degrades."""
+        return cls(max(int(expected * headroom), minimum), error_rate)
+
+    def _positions(self, item: str) -> Iterable[int]:
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hash_count))
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def update(self, items: Iterable[str]) -> None:
+        for item in items:
+            self.add(item)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+    def false_positive_rate(self) -> float:
+        """Expected rate at the current fill (grows past ``error_rate`` beyond ``capacity``)."""
+        return (1 - math.exp(-self.hash_count * self.count / self.size)) ** self.hash_count
+
+    def stats(self) -> dict:
+        return {
+            "items": self.count,
+            "capacity": self.capacity,
+            "bits": self.size,
+            "hashes": self.hash_count,
+            "false_positive_rate": self.false_positive_rate(),
+        }
@@ -0,0 +1,208 @@
+import asyncio
+import functools
+import time
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Optional
+
+from dogpile.cache import make_region
+
+from app.core.config import settings
+from app.core.database import LazySession, read_router
+from app.core.invalidation import invalidation_bus
+
+
+class LRUDict(OrderedDict):
+    """``cache_dict`` for dogpile's memory backend: evicts the least recently used key past ``maxsize``."""
+
+    def __init__(self, maxsize: int):
+        super().__init__()
+        self.maxsize = maxsize
+
+    def get(self, key, default=None):
+        if key not in self:
+            return default
+        self.move_to_end(key)
+        return super().__getitem__(key)
+
+    def __setitem__(self, key, value) -> None:
+        super().__setitem__(key, value)
+        self.move_to_end(key)
+        while len(self) > self.maxsize:
+            self.popitem(last=False)
+
+
+def _backend_config(backend: str) -> tuple[str, dict]:
+    """dogpile backend and arguments for CACHE_BACKEND.
+
+    "memory" is per worker. "redis" is the shared external backend; "dbm" is its local
+    stand-in (a file every worker on the host shares), so the shared code path can be
+    run without a Redis server. "null" disables caching.
+    """
+    if backend == "memory":
+        return "dogpile.cache.memory", {"cache_dict": LRUDict(settings.CACHE_MAX_ENTRIES)}
+    if backend == "redis":
+        return "dogpile.cache.redis", {"url": settings.CACHE_URL, "distributed_lock": True, "thread_local_lock": False}
+    if backend == "dbm":
+        return "dogpile.cache.dbm", {"filename": settings.CACHE_DBM_PATH}
+    if backend == "null":
+        return "dogpile.cache.null", {}
+    raise ValueError(f"Unknown CACHE_BACKEND {backend!r}")
+
+
+class ReadCache:
+    """Async read-through cache on a dogpile region.
+
+    Dogpile protection: a missing or expired key is recomputed by one caller per key
+    (per worker, and across workers when the backend hands out a distributed mutex)
+    while concurrent callers get the expired value, or wait if there is none.
+
+    Every worker remembers when it last evicted each key: entries stored before that
+    count as missing (also while a shared backend's delete is still on its way), and a
+    value computed by a creator that started before it is returned but not stored, as
+    it may predate the write. The external backends do blocking I/O, so they are only
+    used from worker threads.
+    """
+
+    MUTEX_POLL_SECONDS = 0.01
+
+    def __init__(self, backend: str, default_ttl: float, max_entries: int = 10000):
+        name, arguments = _backend_config(backend)
+        self.region = make_region(key_mangler=lambda key: f"cramquest:{key}").configure(
+            name, expiration_time=default_ttl, arguments=arguments
+        )
+        self.default_ttl = default_ttl
+        self.enabled = backend != "null"
+        self.blocking = backend in ("redis", "dbm")
+        self._locks: dict[str, asyncio.Lock] = {}
+        self._evicted_at = LRUDict(max_entries)
+        self._flushed_at = 0.0
+        # backend mutexes may be thread-bound: acquired and released on this one thread
+        self._mutex_thread = ThreadPoolExecutor(max_workers=1, thread_name_prefix="cache-mutex") if self.blocking else None
+
+    async def _mutex(self, fn: Callable, *args) -> Any:
+        if self._mutex_thread is None:
+            return fn(*args)
+        return await asyncio.get_running_loop().run_in_executor(self._mutex_thread, fn, *args)
+
+    async def _io(self, fn: Callable, *args) -> Any:
+        if self.blocking:
+            return await asyncio.to_thread(fn, *args)
+        return fn(*args)
+
+    def _io_later(self, fn: Callable, *args) -> None:
+        """Fire and forget, for the synchronous invalidation callbacks."""
+        if not self.blocking:
+            fn(*args)
+            return
+        try:
+            asyncio.get_running_loop().run_in_executor(None, fn, *args)
+        except RuntimeError:  # no event loop: nothing to block
+            fn(*args)
+
+    def _evicted_since(self, key: str, timestamp: float) -> bool:
+        return max(self._evicted_at.get(key, 0.0), self._flushed_at) >= timestamp
+
+    @staticmethod
+    def key(namespace: str, entity_id: Any) -> str:
+        return f"{namespace}:{entity_id}"
+
+    async def get_or_create(self, key: str, creator: Callable[[], Awaitable[Any]], ttl: Optional[float] = None) -> Any:
+        ttl = ttl or self.default_ttl
+        cached = await self._io(self._get, key)
+        if cached is not None and time.time() - cached.metadata["ct"] < ttl:
+            return cached.payload
+
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        if cached is not None and lock.locked():
+            return cached.payload  # someone is already regenerating it
+
+        async with lock:
+            cached = await self._io(self._get, key)
+            if cached is not None and time.time() - cached.metadata["ct"] < ttl:
+                return cached.payload
+
+            mutex = self.region.backend.get_mutex(key)
+            if mutex is not None:
+                # backend mutexes are blocking: poll instead of blocking the loop
+                while not await self._mutex(mutex.acquire, False):
+                    await asyncio.sleep(self.MUTEX_POLL_SECONDS)
+            try:
+                started = time.time()
+                value = await creator()
+                if not self._evicted_since(key, started):
+                    await self._io(self.region.set, key, value)
+            finally:
+                if mutex is not None:
+                    await self._mutex(mutex.release)
+                self._locks.pop(key, None)
+        return value
+
+    def _get(self, key: str):
+        """The cached value even if expired (served while regenerating), unless flushed or evicted."""
+        cached = self.region.get_value_metadata(key, ignore_expiration=True)
+        if cached is None or self._evicted_since(key, cached.metadata["ct"]):
+            return None
+        if self.region.region_invalidator.is_hard_invalidated(cached.metadata["ct"]):
+            return None
+        return cached
+
+    async def set(self, key: str, value: Any) -> None:
+        await self._io(self.region.set, key, value)
+
+    def invalidate(self, *keys: str) -> None:
+        now = time.time()
+        for key in keys:
+            self._evicted_at[key] = now
+        if keys:
+            self._io_later(self.region.delete_multi, list(keys))
+
+    def flush(self) -> None:
+        # a local timestamp: older entries, in any backend, count as missing for this worker
+        self._flushed_at = time.time()
+        self.region.invalidate(hard=True)
+
+
+# namespaces of the cached reads, keyed by the id they are read by
+SUBJECT = "subject"
+SUBJECT_QUESTS = "subject_quests"
+SUBJECT_MATERIALS = "subject_materials"
+PLAYER = "player"
+
+read_cache = ReadCache(settings.CACHE_BACKEND, settings.CACHE_DEFAULT_TTL_SECONDS, settings.CACHE_MAX_ENTRIES)
+invalidation_bus.subscribe(lambda keys: read_cache.invalidate(*keys), read_cache.flush)
+
+
+def cached_read(namespace: str, ttl: Optional[float] = None):
+    """Cache ``async def fn(session, entity_id)`` under ``namespace:entity_id``.
+
+    Exceptions (e.g. 404s) are not cached. Writers keep it fresh with
+    ``invalidation_bus.publish`` before they commit (and ``read_cache.set`` after).
+    Misses are read from the primary: a replica may not have applied the write whose
+    eviction caused the miss yet, and what is stored here is served to everyone.
+    """
+
+    def decorator(fn):
+        async def create(session, entity_id, *args, **kwargs):
+            if getattr(session, "factory", None) is read_router.primary:
+                return await fn(session, entity_id, *args, **kwargs)
+            primary_session = LazySession(read_router.primary)
+            try:
+                return await fn(primary_session, entity_id, *args, **kwargs)
+            finally:
+                await primary_session.release()
+
+        @functools.wraps(fn)
+        async def wrapper(session, entity_id, *args, **kwargs):
+            if not read_cache.enabled:
+                return await fn(session, entity_id, *args, **kwargs)
+            return await read_cache.get_or_create(
+                ReadCache.key(namespace, entity_id),
+                lambda: create(session, entity_id, *args, **kwargs),
+                ttl,
+            )
+
+        wrapper.uncached = fn
+        return wrapper
+
+    return decorator
@@ -0,0 +1,245 @@
+import gzip
+import hashlib
+import zlib
+from collections import OrderedDict
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:  # optional, pinned in requirements.txt
+    import brotli
+except ImportError:
+    brotli = None
+
+try:  # optional, pinned in requirements.txt
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+class _GzipStream:
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+
+    def write(self, data: bytes) -> bytes:
+        # sync flush: every chunk of a streamed export reaches the client right away
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def close(self) -> bytes:
+        return self._compressor.flush()
+
+
+class _BrotliStream:
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def write(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def close(self) -> bytes:
+        return self._compressor.finish()
+
+
+class _ZstdStream:
+    def __init__(self, level: int):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def write(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def close(self) -> bytes:
+        return self._compressor.flush()
+
+
+class CompressedBodyCache:
+    """LRU of compressed bodies keyed by (ETag, encoding), bounded by total bytes."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[tuple[str, str], bytes] = OrderedDict()
+
+    def get(self, etag: str, encoding: str) -> Optional[bytes]:
+        body = self._entries.get((etag, encoding))
+        if body is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end((etag, encoding))
+        self.hits += 1
+        return body
+
+    def put(self, etag: str, encoding: str, body: bytes) -> None:
+        if len(body) > self.max_bytes or (etag, encoding) in self._entries:
+            return
+        self._entries[(etag, encoding)] = body
+        self.size += len(body)
+        while self.size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.size -= len(evicted)
+
+    def stats(self) -> dict:
+        return {"entries": len(self._entries), "bytes": self.size, "hits": self.hits, "misses": self.misses}
+
+
+class CompressionMiddleware:
+    """gzip / brotli / zstd response compression, negotiated from Accept-Encoding.
+
+    * bodies smaller than ``minimum_size`` are sent as is
+    * streamed responses (``StreamingResponse``) are compressed chunk by chunk
+    * with ``cache_max_bytes`` set, complete bodies are compressed once per (ETag,
+      encoding); responses without an ETag get one from a hash of their body
+    """
+
+    COMPRESSIBLE_TYPES = ("text/", "application/json", "application/x-ndjson", "application/javascript", "application/xml")
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        zstd_level: int = 3,
+        cache_max_bytes: int = 0,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.cache = CompressedBodyCache(cache_max_bytes) if cache_max_bytes > 0 else None
+
+        # server preference when the client accepts several equally
+        self.encoders = {}
+        if brotli is not None:
+            self.encoders["br"] = lambda: _BrotliStream(brotli_quality)
+        if zstandard is not None:
+            self.encoders["zstd"] = lambda: _ZstdStream(zstd_level)
+        self.encoders["gzip"] = lambda: _GzipStream(gzip_level)
+        self._gzip_level = gzip_level
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = self.negotiate(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        await _CompressedResponder(self, encoding, send).run(self.app, scope, receive)
+
+    def negotiate(self, accept_encoding: str) -> Optional[str]:
+        """The best encoding we support with q > 0, or None."""
+        accepted = {}
+        for part in accept_encoding.lower().split(","):
+            name, _, params = part.strip().partition(";")
+            q = 1.0
+            if params.strip().startswith("q="):
+                try:
+                    q = float(params.strip()[2:])
+                except ValueError:
+                    q = 0.0
+            accepted[name.strip()] = q
+
+        best = None
+        for encoding in self.encoders:
+            q = accepted.get(encoding, accepted.get("*", 0.0))
+            if q > 0 and (best is None or q > best[1]):
+                best = (encoding, q)
+        return best[0] if best else None
+
+    def compress(self, encoding: str, body: bytes) -> bytes:
+        if encoding == "gzip":
+            return gzip.compress(body, self._gzip_level, mtime=0)
+        stream = self.encoders[encoding]()
+        return stream.write(body) + stream.close()
+
+    def is_compressible(self, headers: Headers, status: int) -> bool:
+        if status < 200 or status in (204, 304) or "content-encoding" in headers:
+            return False
+        content_type = headers.get("content-type", "")
+        return content_type.startswith(self.COMPRESSIBLE_TYPES) or "+json" in content_type
+
+
+class _CompressedResponder:
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send: Send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self.send = send
+        self.start_message: Optional[Message] = None
+        self.stream = None
+        self.passthrough = False
+
+    async def run(self, app: ASGIApp, scope: Scope, receive: Receive) -> None:
+        await app(scope, receive, self.send_wrapper)
+
+    async def send_wrapper(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start_message = message
+            self.passthrough = not self.middleware.is_compressible(
+                Headers(raw=message["headers"]), message["status"]
+            )
+            if self.passthrough:
+                await self.send(message)
+            return
+
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.stream is None and not more_body:
+            await self._send_complete(body)
+        else:
+            await self._send_chunk(body, more_body)
+
+    async def _send_complete(self, body: bytes) -> None:
+        headers = MutableHeaders(raw=self.start_message["headers"])
+
+        if len(body) < self.middleware.minimum_size:
+            await self.send(self.start_message)
+            await self.send({"type": "http.response.body", "body": body})
+            return
+
+        cache = self.middleware.cache
+        compressed = None
+        if cache is not None:
+            etag = headers.get("etag")
+            if etag is None:
+                etag = headers["ETag"] = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+            compressed = cache.get(etag, self.encoding)
+
+        if compressed is None:
+            compressed = self.middleware.compress(self.encoding, body)
+            if cache is not None:
+                cache.put(etag, self.encoding, compressed)
+
+        self._set_encoding_headers(headers)
+        headers["Content-Length"] = str(len(compressed))
+        await self.send(self.start_message)
+        await self.send({"type": "http.response.body", "body": compressed})
+
+    async def _send_chunk(self, body: bytes, more_body: bool) -> None:
+        if self.stream is None:
+            # the size is unknown up front, so streamed bodies are always compressed
+            headers = MutableHeaders(raw=self.start_message["headers"])
+            self._set_encoding_headers(headers)
+            del headers["Content-Length"]
+            self.stream = self.middleware.encoders[self.encoding]()
+            await self.send(self.start_message)
+
+        data = self.stream.write(body) if body else b""
+        if not more_body:
+            data += self.stream.close()
+        await self.send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+    def _set_encoding_headers(self, headers: MutableHeaders) -> None:
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            # the encoded bytes differ from the identity body, so the validator becomes weak
+            headers["ETag"] = f"W/{etag}"
@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings
 import os
+from typing import Optional
 from dotenv import load_dotenv
 
 
@@ -15,6 +16,170 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30))
     ACCESS_TOKEN_EXPIRE_DAYS: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_DAYS", 30))
 
+    # Access tokens carry signed claims (user, player, is_admin, token version) so
+    # authorizing a request needs no query; set False to issue "sub"-only tokens (both
+    # kinds are accepted either way). Revocations reach every worker within
+    # TOKEN_VERSION_MAX_AGE_SECONDS even without the invalidation bus.
+    ACCESS_TOKEN_CLAIMS: bool = True
+    TOKEN_VERSION_MAX_AGE_SECONDS: float = float(os.getenv("TOKEN_VERSION_MAX_AGE_SECONDS", 30))
+
+    # Refresh tokens rotate on every use; revoked ones are checked through a per-worker
+    # Bloom filter rebuilt every REFRESH_TOKEN_FILTER_REBUILD_SECONDS.
+    REFRESH_TOKEN_FILTER_REBUILD_SECONDS: float = float(os.getenv("REFRESH_TOKEN_FILTER_REBUILD_SECONDS", 300))
+    REFRESH_TOKEN_FILTER_ERROR_RATE: float = float(os.getenv("REFRESH_TOKEN_FILTER_ERROR_RATE", 0.01))
+
+    # GET /auth/availability answers from a per-worker Bloom filter of taken usernames
+    # and emails, rebuilt from the user table every AVAILABILITY_FILTER_REBUILD_SECONDS.
+    # New names reach every worker through the invalidation bus; without it (SQLite,
+    # bus disabled or disconnected) the filter is not trusted and every check is a lookup.
+    AVAILABILITY_FILTER_REBUILD_SECONDS: float = float(os.getenv("AVAILABILITY_FILTER_REBUILD_SECONDS", 600))
+    AVAILABILITY_FILTER_ERROR_RATE: float = float(os.getenv("AVAILABILITY_FILTER_ERROR_RATE", 0.01))
+
+    # Connection pool. Keepalive pings idle connections so they (and the serverless
+    # compute) stay warm; DB_POOL_PRE_PING defaults to on only for local databases.
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", 10))
+    DB_POOL_RECYCLE_SECONDS: int = int(os.getenv("DB_POOL_RECYCLE_SECONDS", -1))
+    DB_POOL_PRE_PING: Optional[bool] = None
+    DB_KEEPALIVE_INTERVAL_SECONDS: float = float(os.getenv("DB_KEEPALIVE_INTERVAL_SECONDS", 240))
+    DB_SIMULATED_CONNECT_DELAY_MS: int = int(os.getenv("DB_SIMULATED_CONNECT_DELAY_MS", 0))
+
+    # PgBouncer (e.g. Neon "-pooler" endpoints) in transaction mode. Prepared statements
+    # get unique names so they never collide across server connections, and are not
+    # cached: only set DB_PREPARED_STATEMENT_CACHE_SIZE (e.g. 100) once the pooler tracks
+    # prepared statements (PgBouncer 1.21+ with max_prepared_statements).
+    DB_PGBOUNCER_MODE: Optional[bool] = None
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int = int(os.getenv("DB_PREPARED_STATEMENT_CACHE_SIZE", 0))
+    DB_QUERY_CACHE_SIZE: int = int(os.getenv("DB_QUERY_CACHE_SIZE", 1200))
+
+    # How get_read_session runs GET handlers: "autocommit" (no BEGIN/COMMIT round trips),
+    # "read_only" (BEGIN READ ONLY, one consistent snapshot) or "transaction" (as writes).
+    DB_READ_SESSION_MODE: str = os.getenv("DB_READ_SESSION_MODE", "autocommit")
+
+    # "create_all" reflects and creates missing tables on boot; "migrations" only checks
+    # that the database is at the Alembic head and loads routers while the pool warms up.
+    STARTUP_MODE: str = os.getenv("STARTUP_MODE", "create_all")
+
+    # Read replicas (comma separated URLs). Leave empty to send every read to the primary.
+    DATABASE_REPLICA_URLS: str = os.getenv("DATABASE_REPLICA_URLS", "")
+    REPLICA_MAX_LAG_SECONDS: float = float(os.getenv("REPLICA_MAX_LAG_SECONDS", 5))
+    REPLICA_LAG_CHECK_INTERVAL_SECONDS: float = float(os.getenv("REPLICA_LAG_CHECK_INTERVAL_SECONDS", 2))
+    READ_YOUR_WRITES_SECONDS: int = int(os.getenv("READ_YOUR_WRITES_SECONDS", 10))
+
+    # Response compression (brotli/zstd when installed, else gzip). Bodies below the
+    # minimum size go out as is; COMPRESSION_CACHE_MAX_BYTES=0 disables the ETag-keyed
+    # cache of compressed bodies.
+    COMPRESSION_MINIMUM_SIZE: int = int(os.getenv("COMPRESSION_MINIMUM_SIZE", 1024))
+    COMPRESSION_GZIP_LEVEL: int = int(os.getenv("COMPRESSION_GZIP_LEVEL", 6))
+    COMPRESSION_BROTLI_QUALITY: int = int(os.getenv("COMPRESSION_BROTLI_QUALITY", 4))
+    COMPRESSION_ZSTD_LEVEL: int = int(os.getenv("COMPRESSION_ZSTD_LEVEL", 3))
+    COMPRESSION_CACHE_MAX_BYTES: int = int(os.getenv("COMPRESSION_CACHE_MAX_BYTES", 16 * 1024 * 1024))
+
+    # Identical concurrent GETs (same route, params and user) share one DB call; its
+    # result is also handed to identical requests arriving this long after it finished.
+    SINGLE_FLIGHT_WINDOW_MS: float = float(os.getenv("SINGLE_FLIGHT_WINDOW_MS", 5))
+
+    # Read cache for subjects, players and subject quest/material lists. CACHE_BACKEND:
+    # "memory" (per worker, LRU of CACHE_MAX_ENTRIES), "redis" (shared, CACHE_URL),
+    # "dbm" (shared through a local file, stand-in for redis) or "null" (off).
+    CACHE_BACKEND: str = os.getenv("CACHE_BACKEND", "memory")
+    CACHE_URL: str = os.getenv("CACHE_URL", "redis://localhost:6379/0")
+    CACHE_DBM_PATH: str = os.getenv("CACHE_DBM_PATH", ".cramquest_cache.dbm")
+    CACHE_MAX_ENTRIES: int = int(os.getenv("CACHE_MAX_ENTRIES", 10000))
+    CACHE_DEFAULT_TTL_SECONDS: float = float(os.getenv("CACHE_DEFAULT_TTL_SECONDS", 60))
+    CACHE_SUBJECT_TTL_SECONDS: float = float(os.getenv("CACHE_SUBJECT_TTL_SECONDS", 300))
+    CACHE_PLAYER_TTL_SECONDS: float = float(os.getenv("CACHE_PLAYER_TTL_SECONDS", 60))
+    CACHE_QUEST_LIST_TTL_SECONDS: float = float(os.getenv("CACHE_QUEST_LIST_TTL_SECONDS", 60))
+    CACHE_MATERIAL_LIST_TTL_SECONDS: float = float(os.getenv("CACHE_MATERIAL_LIST_TTL_SECONDS", 300))
+
+    # Cross-worker cache invalidation over LISTEN/NOTIFY (on by default with asyncpg).
+    # The listener needs a direct connection: by default DATABASE_URL minus "-pooler".
+    # A message skipped over (writes can commit out of order) is waited for
+    # INVALIDATION_GAP_TIMEOUT_SECONDS before it counts as lost and caches are flushed.
+    INVALIDATION_BUS_ENABLED: Optional[bool] = None
+    INVALIDATION_DATABASE_URL: str = os.getenv("INVALIDATION_DATABASE_URL", "")
+    INVALIDATION_RECONNECT_MAX_SECONDS: float = float(os.getenv("INVALIDATION_RECONNECT_MAX_SECONDS", 30))
+    INVALIDATION_GAP_TIMEOUT_SECONDS: float = float(os.getenv("INVALIDATION_GAP_TIMEOUT_SECONDS", 5))
+
+    # Idempotency-Key support for POSTs. IDEMPOTENCY_STORE: "memory" (per worker, LRU of
+    # IDEMPOTENCY_MAX_ENTRIES) or "database" (idempotencyrecord table, shared by workers).
+    IDEMPOTENCY_STORE: str = os.getenv("IDEMPOTENCY_STORE", "memory")
+    IDEMPOTENCY_TTL_SECONDS: float = float(os.getenv("IDEMPOTENCY_TTL_SECONDS", 24 * 60 * 60))
+    IDEMPOTENCY_MAX_ENTRIES: int = int(os.getenv("IDEMPOTENCY_MAX_ENTRIES", 10000))
+    IDEMPOTENCY_WAIT_SECONDS: float = float(os.getenv("IDEMPOTENCY_WAIT_SECONDS", 10))
+    # Comma separated regexes of paths never stored: retrying them is cheap, and their
+    # responses are only tokens. Sign-up is stored without its tokens and cookie.
+    IDEMPOTENCY_EXCLUDED_PATHS: str = os.getenv(
+        "IDEMPOTENCY_EXCLUDED_PATHS", r"^/auth/(sign_in|sign_out|refresh_token|revoke_tokens)$"
+    )
+
+    # Deleting users and subjects. Accounts/subjects with more than DELETE_SOFT_THRESHOLD_ROWS
+    # study sessions are soft-deleted and purged in the background, DELETE_PURGE_BATCH_SIZE
+    # rows per transaction with a DELETE_PURGE_PAUSE_MS pause in between; smaller ones go at
+    # once through the ON DELETE CASCADE foreign keys.
+    DELETE_SOFT_THRESHOLD_ROWS: int = int(os.getenv("DELETE_SOFT_THRESHOLD_ROWS", 10000))
+    DELETE_PURGE_BATCH_SIZE: int = int(os.getenv("DELETE_PURGE_BATCH_SIZE", 2000))
+    DELETE_PURGE_PAUSE_MS: float = float(os.getenv("DELETE_PURGE_PAUSE_MS", 10))
+    DELETE_PURGE_INTERVAL_SECONDS: float = float(os.getenv("DELETE_PURGE_INTERVAL_SECONDS", 60))
+
+    # yappi request profiling, off unless PROFILING_ON_REQUEST or PROFILING_SAMPLE_RATE is set.
+    # With PROFILING_ON_REQUEST, admins' requests sending "X-Profile: 1" are profiled (needs
+    # ACCESS_TOKEN_CLAIMS tokens), plus a random PROFILING_SAMPLE_RATE fraction of all
+    # requests; the newest PROFILING_MAX_PROFILES are kept.
+    PROFILING_ON_REQUEST: bool = False
+    PROFILING_SAMPLE_RATE: float = float(os.getenv("PROFILING_SAMPLE_RATE", 0))
+    PROFILING_DIR: str = os.getenv("PROFILING_DIR", ".cramquest_profiles")
+    PROFILING_MAX_PROFILES: int = int(os.getenv("PROFILING_MAX_PROFILES", 50))
+
+    # Load shedding: while the event loop lags more than ADMISSION_MAX_LOOP_LAG_MS or pool
+    # checkouts wait more than ADMISSION_MAX_POOL_WAIT_MS (0 disables either), requests
+    # not matching ADMISSION_PRIORITY_PATHS (comma separated regexes) get a 503.
+    ADMISSION_ENABLED: bool = True
+    ADMISSION_MAX_LOOP_LAG_MS: float = float(os.getenv("ADMISSION_MAX_LOOP_LAG_MS", 200))
+    ADMISSION_MAX_POOL_WAIT_MS: float = float(os.getenv("ADMISSION_MAX_POOL_WAIT_MS", 1000))
+    ADMISSION_LAG_SAMPLE_INTERVAL_MS: float = float(os.getenv("ADMISSION_LAG_SAMPLE_INTERVAL_MS", 100))
+    ADMISSION_RETRY_AFTER_SECONDS: int = int(os.getenv("ADMISSION_RETRY_AFTER_SECONDS", 2))
+    ADMISSION_PRIORITY_PATHS: str = os.getenv(
+        "ADMISSION_PRIORITY_PATHS", r"^/auth/(?!availability),^/study_sessions/[^/]+/end$,^/tests/debug/,^/debug/"
+    )
+
+    # Rate limits as "<requests>/<seconds>": sign in/up and availability checks per IP (sliding
+    # window), refresh per IP and other writes per user (token buckets). RATE_LIMIT_BACKEND: "memory" (per worker, LRU
+    # of RATE_LIMIT_MAX_KEYS), "redis" (shared, RATE_LIMIT_URL) or "sqlite" (a file every
+    # worker on the host shares -- the local stand-in for redis).
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_BACKEND: str = os.getenv("RATE_LIMIT_BACKEND", "memory")
+    RATE_LIMIT_URL: str = os.getenv("RATE_LIMIT_URL", "redis://localhost:6379/0")
+    RATE_LIMIT_SQLITE_PATH: str = os.getenv("RATE_LIMIT_SQLITE_PATH", ".cramquest_rate_limit.db")
+    RATE_LIMIT_MAX_KEYS: int = int(os.getenv("RATE_LIMIT_MAX_KEYS", 100000))
+    RATE_LIMIT_TRUST_FORWARDED_FOR: bool = False
+    RATE_LIMIT_SIGN_IN: str = os.getenv("RATE_LIMIT_SIGN_IN", "10/60")
+    RATE_LIMIT_SIGN_UP: str = os.getenv("RATE_LIMIT_SIGN_UP", "5/3600")
+    RATE_LIMIT_REFRESH_TOKEN: str = os.getenv("RATE_LIMIT_REFRESH_TOKEN", "30/60")
+    RATE_LIMIT_AVAILABILITY: str = os.getenv("RATE_LIMIT_AVAILABILITY", "60/60")
+    RATE_LIMIT_WRITES: str = os.getenv("RATE_LIMIT_WRITES", "120/60")
+
+    # Logging goes through a queue to a background writer. LOG_FORMAT: "json" or "text";
+    # LOG_LEVELS overrides per logger, e.g. "sqlalchemy.engine=INFO,app.crud=DEBUG" (which
+    # replaces DB_ECHO); only a LOG_DEBUG_SAMPLE_RATE fraction of requests log at DEBUG.
+    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
+    LOG_LEVELS: str = os.getenv("LOG_LEVELS", "")
+    LOG_FORMAT: str = os.getenv("LOG_FORMAT", "json")
+    LOG_DEBUG_SAMPLE_RATE: float = float(os.getenv("LOG_DEBUG_SAMPLE_RATE", 0.01))
+    LOG_QUEUE_SIZE: int = int(os.getenv("LOG_QUEUE_SIZE", 10000))
+    DB_ECHO: bool = False
+
+    @property
+    def replica_urls(self) -> list[str]:
+        return [url.strip() for url in self.DATABASE_REPLICA_URLS.split(",") if url.strip()]
+
+    @property
+    def idempotency_excluded_paths(self) -> list[str]:
+        return [pattern.strip() for pattern in self.IDEMPOTENCY_EXCLUDED_PATHS.split(",") if pattern.strip()]
+
+    @property
+    def admission_priority_paths(self) -> list[str]:
+        return [pattern.strip() for pattern in self.ADMISSION_PRIORITY_PATHS.split(",") if pattern.strip()]
+
     class Config:
         extra = "allow"
         env_file = ".env"  # Load environment variables
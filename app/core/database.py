@@ -1,26 +1,86 @@
+from uuid import uuid4
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
 from sqlmodel import SQLModel
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
+from app.core.replica import Replica, ReplicaRouter, is_read_your_writes_sticky
+from app.core.pool import PoolManager, TimedAsyncAdaptedQueuePool, pre_ping_is_cheap
 
-# Import models so they are registered
-from app.models.user_model import User
-from app.models.player_model import Player
-from app.models.profile_model import Profile
-from app.models.subject_model import Subject
-from app.models.study_session_model import StudySession
-from app.models.quest_model import Quest
+def _unique_prepared_statement_name() -> str:
+    return f"__asyncpg_{uuid4()}__"
+
+
+def _connect_args(url: str) -> dict:
+    parsed_url = make_url(url)
+    if parsed_url.get_driver_name() != "asyncpg":
+        return {}
+
+    pgbouncer_mode = settings.DB_PGBOUNCER_MODE
+    if pgbouncer_mode is None:
+        pgbouncer_mode = "-pooler" in (parsed_url.host or "")
+
+    if not pgbouncer_mode:
+        return {}
+
+    return {
+        # ✅ Names are unique per statement, so a statement prepared on one server
+        # connection can never clash with another client's on the same backend
+        "prepared_statement_name_func": _unique_prepared_statement_name,
+        "prepared_statement_cache_size": settings.DB_PREPARED_STATEMENT_CACHE_SIZE,
+        # asyncpg's own cache uses fixed names; SQLAlchemy's cache above replaces it
+        "statement_cache_size": 0,
+    }
+
+
+def _create_engine(url: str):
+    pre_ping = settings.DB_POOL_PRE_PING
+    if pre_ping is None:
+        pre_ping = pre_ping_is_cheap(url)
+
+    async_engine = create_async_engine(
+        url,
+        echo=settings.DB_ECHO,  # ✅ prefer LOG_LEVELS="sqlalchemy.engine=INFO": echo writes to stdout on the loop
+        future=True,
+        poolclass=TimedAsyncAdaptedQueuePool,  # ✅ checkout wait times feed admission control
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=5,
+        pool_timeout=30,
+        pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+        pool_pre_ping=pre_ping,
+        query_cache_size=settings.DB_QUERY_CACHE_SIZE,
+        connect_args=_connect_args(url),
+    )
+
+    if async_engine.dialect.name == "sqlite":
+        # ✅ SQLite ignores ON DELETE CASCADE unless foreign keys are switched on per connection
+        event.listen(async_engine.sync_engine, "connect", _enable_sqlite_foreign_keys)
+
+    return async_engine
+
+
+def _enable_sqlite_foreign_keys(dbapi_connection, connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
 
 # ✅ Create async database engine
-engine = create_async_engine(
-    settings.DATABASE_URL, 
-    echo=True,
-    future=True,
-    pool_size=10,
-    max_overflow=5,
-    pool_timeout=30,
-    pool_recycle=1800
-)
+engine = _create_engine(settings.DATABASE_URL)
+
+# ✅ One engine (and therefore one pool) per read replica
+replica_engines = [_create_engine(url) for url in settings.replica_urls]
+
+# ✅ Pre-warm / keepalive / connect-latency metrics for every pool
+pool_managers = [
+    PoolManager(
+        pool_engine,
+        keepalive_interval=settings.DB_KEEPALIVE_INTERVAL_SECONDS,
+        simulated_connect_delay=settings.DB_SIMULATED_CONNECT_DELAY_MS / 1000,
+    )
+    for pool_engine in [engine, *replica_engines]
+]
 
 AsyncSessionLocal = sessionmaker(
     bind=engine, 
@@ -33,13 +93,92 @@ async_session_maker = sessionmaker(
     engine, class_=AsyncSession, expire_on_commit=False
 )
 
+
+def _read_session_maker(bind_engine) -> sessionmaker:
+    """Session factory for GET handlers: nothing is ever flushed, and no write transaction is opened."""
+    if settings.DB_READ_SESSION_MODE == "autocommit":
+        bind_engine = bind_engine.execution_options(isolation_level="AUTOCOMMIT")
+    elif settings.DB_READ_SESSION_MODE == "read_only" and bind_engine.dialect.name == "postgresql":
+        bind_engine = bind_engine.execution_options(postgresql_readonly=True)
+
+    return sessionmaker(
+        bind=bind_engine,
+        class_=AsyncSession,
+        expire_on_commit=False,
+        autoflush=False,
+    )
+
+read_router = ReplicaRouter(
+    primary=_read_session_maker(engine),
+    replicas=[
+        Replica(engine=replica_engine, session_maker=_read_session_maker(replica_engine))
+        for replica_engine in replica_engines
+    ],
+    max_lag_seconds=settings.REPLICA_MAX_LAG_SECONDS,
+    check_interval=settings.REPLICA_LAG_CHECK_INTERVAL_SECONDS,
+)
+
+
+class LazySession:
+    """Proxy that only opens an AsyncSession the first time it is actually used.
+
+    Requests that are rejected early (auth, validation) or answered without touching
+    the database never create a session, so they never check out a pooled connection.
+    """
+
+    def __init__(self, factory: sessionmaker = AsyncSessionLocal):
+        self._factory = factory
+        self._session: AsyncSession | None = None
+
+    @property
+    def is_open(self) -> bool:
+        return self._session is not None
+
+    @property
+    def factory(self) -> sessionmaker:
+        return self._factory
+
+    def _get_session(self) -> AsyncSession:
+        if self._session is None:
+            self._session = self._factory()
+        return self._session
+
+    def __getattr__(self, name):
+        return getattr(self._get_session(), name)
+
+    async def release(self) -> None:
+        """Close the underlying session (if any) and give its connection back to the pool."""
+        if self._session is None:
+            return
+
+        session, self._session = self._session, None
+        await session.close()
+
+
 # ✅ Dependency to get an async session
 async def get_session():
-    async with AsyncSessionLocal() as session:
+    session = LazySession()
+    try:
         yield session
+    finally:
+        # runs as soon as the handler returns, before the response is sent
+        await session.release()
+
+# ✅ Dependency for read-only routes: a fresh replica, or the primary after a recent write,
+# in the read session mode from settings
+async def get_read_session(request: Request):
+    factory = await read_router.pick(sticky=is_read_your_writes_sticky(request))
+    session = LazySession(factory)
+    try:
+        yield session
+    finally:
+        await session.release()
 
 # ✅ Function to create tables asynchronously
 async def create_db_and_tables():
+    import app.models  # noqa: F401 -- register every table on the metadata
+    from app.services.search_service import SearchService
+
     async with engine.begin() as conn:
         await conn.run_sync(SQLModel.metadata.create_all)
-
+        await SearchService.ensure_schema(conn)
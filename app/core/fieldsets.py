@@ -0,0 +1,96 @@
+import typing
+from typing import Any, Iterable, Optional
+
+from fastapi import HTTPException, Query, status
+from pydantic import BaseModel
+
+
+class InvalidFieldset(HTTPException):
+    def __init__(self, param: str, unknown: Iterable[str], allowed: Iterable[str]):
+        super().__init__(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown {param}: {', '.join(sorted(unknown))}. Allowed: {', '.join(allowed) or 'none'}",
+        )
+
+
+def _is_relation(annotation) -> bool:
+    """list[SomeSchema] fields are relations, loaded only when included."""
+    args = typing.get_args(annotation)
+    return typing.get_origin(annotation) is list and bool(args) and isinstance(args[0], type) and issubclass(args[0], BaseModel)
+
+
+class Fieldset:
+    """The part of a ``*Read`` schema a client asked for with ``?fields=`` / ``?include=``.
+
+    ``fields`` picks scalar fields, ``include`` picks relations (e.g. a session's
+    ``tasks``). With neither, the full schema is returned, relations included; with
+    ``fields`` only, relations are left out.
+    """
+
+    def __init__(self, schema: type[BaseModel], fields: Optional[list[str]] = None, include: Optional[list[str]] = None):
+        self.schema = schema
+        all_scalars = [name for name, info in schema.model_fields.items() if not _is_relation(info.annotation)]
+        all_relations = [name for name, info in schema.model_fields.items() if _is_relation(info.annotation)]
+
+        if fields is not None:
+            unknown = set(fields) - set(all_scalars)
+            if unknown:
+                raise InvalidFieldset("fields", unknown, all_scalars)
+        if include is not None:
+            unknown = set(include) - set(all_relations)
+            if unknown:
+                raise InvalidFieldset("include", unknown, all_relations)
+
+        self.is_full = fields is None and include is None
+        self.scalars = [name for name in all_scalars if fields is None or name in fields]
+        if self.is_full:
+            self.relations = all_relations
+        else:
+            self.relations = [name for name in all_relations if include is not None and name in include]
+
+    def includes(self, relation: str) -> bool:
+        return relation in self.relations
+
+    def columns(self, model, always: Iterable[str] = ("id",)) -> list:
+        """Labeled columns for the requested scalars, plus the ``always`` ones callers key on."""
+        names = [name for name in self.schema.model_fields if name in self.scalars or name in always]
+        return [getattr(model, name).label(name) for name in names]
+
+    def dump(self, item: Any, **relations) -> Any:
+        """``item`` (a Row or schema object) as the schema, or as a dict of just the requested fields."""
+        if self.is_full:
+            if isinstance(item, BaseModel):
+                return item
+            return self.schema.model_validate({**item._mapping, **relations})
+
+        if isinstance(item, BaseModel):
+            get = lambda name: getattr(item, name)
+        else:
+            get = item._mapping.__getitem__
+
+        data = {name: get(name) for name in self.scalars}
+        for name in self.relations:
+            data[name] = relations[name] if name in relations else get(name)
+        return data
+
+    def dump_all(self, items: Iterable[Any]) -> list:
+        return [self.dump(item) for item in items]
+
+
+def _split(value: Optional[str]) -> Optional[list[str]]:
+    """Names in a comma separated parameter; None (not asked for) when it names nothing, e.g. ``?fields=``."""
+    if value is None:
+        return None
+    return [name.strip() for name in value.split(",") if name.strip()] or None
+
+
+def sparse_fieldset(schema: type[BaseModel]):
+    """Dependency: parse and validate ``?fields=a,b&include=rel`` against ``schema``."""
+
+    def dependency(
+        fields: Optional[str] = Query(None, description=f"Comma separated {schema.__name__} fields to return"),
+        include: Optional[str] = Query(None, description="Comma separated relations to include"),
+    ) -> Fieldset:
+        return Fieldset(schema, _split(fields), _split(include))
+
+    return dependency
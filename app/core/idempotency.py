@@ -0,0 +1,331 @@
+import asyncio
+import hashlib
+import json
+import re
+import time
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.exc import IntegrityError
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+HEADER = "idempotency-key"
+REPLAYED_HEADER = b"idempotent-replayed"
+MAX_KEY_LENGTH = 64
+# recomputed on replay, or meaningless for a stored copy; cookies may carry credentials
+_SKIPPED_HEADERS = {b"content-length", b"date", b"server", b"set-cookie"}
+# credentials in JSON bodies: never stored, so a replay comes without them
+_REDACTED_FIELDS = ("access_token", "refresh_token")
+
+
+@dataclass
+class StoredResponse:
+    fingerprint: str
+    status_code: Optional[int] = None  # None: the first request is still running
+    headers: Optional[list] = None
+    body: Optional[bytes] = None
+
+    @property
+    def completed(self) -> bool:
+        return self.status_code is not None
+
+
+def _pack_headers(headers: list[tuple[bytes, bytes]]) -> list[list[str]]:
+    return [[name.decode("latin-1"), value.decode("latin-1")] for name, value in headers if name.lower() not in _SKIPPED_HEADERS]
+
+
+def _redact(headers: list[tuple[bytes, bytes]], body: bytes) -> bytes:
+    """``body`` without the top-level ``_REDACTED_FIELDS`` of a JSON object."""
+    content_type = dict((name.lower(), value) for name, value in headers).get(b"content-type", b"")
+    if not content_type.startswith(b"application/json"):
+        return body
+    try:
+        data = json.loads(body)
+    except ValueError:
+        return body
+    if not isinstance(data, dict) or not any(field in data for field in _REDACTED_FIELDS):
+        return body
+    return json.dumps({key: value for key, value in data.items() if key not in _REDACTED_FIELDS}, separators=(",", ":")).encode()
+
+
+def _unpack_headers(headers: list[list[str]]) -> list[tuple[bytes, bytes]]:
+    return [(name.encode("latin-1"), value.encode("latin-1")) for name, value in headers]
+
+
+class MemoryIdempotencyStore:
+    """Per-process LRU with a TTL, for development and single-worker deployments."""
+
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, StoredResponse]] = OrderedDict()
+
+    async def get(self, key: str) -> Optional[StoredResponse]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, record = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return record
+
+    async def claim(self, key: str, fingerprint: str) -> bool:
+        if await self.get(key) is not None:
+            return False
+        self._entries[key] = (time.monotonic() + self.ttl, StoredResponse(fingerprint))
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return True
+
+    async def complete(self, key: str, status_code: int, headers: list, body: bytes) -> None:
+        entry = self._entries.get(key)
+        if entry is not None:
+            entry[1].status_code, entry[1].headers, entry[1].body = status_code, headers, body
+
+    async def release(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+
+class DatabaseIdempotencyStore:
+    """Shared across workers: one idempotencyrecord row per key, bodies zlib compressed."""
+
+    PURGE_INTERVAL_SECONDS = 300
+
+    def __init__(self, engine, ttl: float):
+        self.engine = engine
+        self.ttl = ttl
+        self._next_purge = 0.0
+
+    @staticmethod
+    def _model():
+        # imported on first use: importing app.main must not load every model
+        from app.models import IdempotencyRecord
+
+        return IdempotencyRecord
+
+    async def get(self, key: str) -> Optional[StoredResponse]:
+        IdempotencyRecord = self._model()
+        now = datetime.now(timezone.utc)
+        async with self.engine.connect() as conn:
+            row = (
+                await conn.execute(
+                    select(
+                        IdempotencyRecord.fingerprint,
+                        IdempotencyRecord.status_code,
+                        IdempotencyRecord.headers,
+                        IdempotencyRecord.body,
+                    ).where(IdempotencyRecord.key == key, IdempotencyRecord.expires_at > now)
+                )
+            ).first()
+        if row is None:
+            return None
+        return StoredResponse(
+            fingerprint=row.fingerprint,
+            status_code=row.status_code,
+            headers=json.loads(row.headers) if row.headers else None,
+            body=zlib.decompress(row.body) if row.body is not None else None,
+        )
+
+    async def claim(self, key: str, fingerprint: str) -> bool:
+        IdempotencyRecord = self._model()
+        now = datetime.now(timezone.utc)
+        await self._purge_expired(now)
+        try:
+            async with self.engine.begin() as conn:
+                await conn.execute(
+                    delete(IdempotencyRecord).where(IdempotencyRecord.key == key, IdempotencyRecord.expires_at <= now)
+                )
+                await conn.execute(
+                    IdempotencyRecord.__table__.insert().values(
+                        key=key, fingerprint=fingerprint, created_at=now, expires_at=now + timedelta(seconds=self.ttl)
+                    )
+                )
+            return True
+        except IntegrityError:
+            return False
+
+    async def complete(self, key: str, status_code: int, headers: list, body: bytes) -> None:
+        IdempotencyRecord = self._model()
+        async with self.engine.begin() as conn:
+            await conn.execute(
+                update(IdempotencyRecord)
+                .where(IdempotencyRecord.key == key)
+                .values(status_code=status_code, headers=json.dumps(headers), body=zlib.compress(body))
+            )
+
+    async def release(self, key: str) -> None:
+        IdempotencyRecord = self._model()
+        async with self.engine.begin() as conn:
+            await conn.execute(delete(IdempotencyRecord).where(IdempotencyRecord.key == key))
+
+    async def _purge_expired(self, now: datetime) -> None:
+        if time.monotonic() < self._next_purge:
+            return
+        self._next_purge = time.monotonic() + self.PURGE_INTERVAL_SECONDS
+        IdempotencyRecord = self._model()
+        async with self.engine.begin() as conn:
+            await conn.execute(delete(IdempotencyRecord).where(IdempotencyRecord.expires_at <= now))
+
+
+class IdempotencyMiddleware:
+    """Makes POSTs carrying an ``Idempotency-Key`` header safe to retry.
+
+    The first request with a key runs normally and its response is stored. A retry
+    with the same key and the same request (method, path, query, body) gets the
+    stored response back, marked ``Idempotent-Replayed: true``, without running the
+    handler again. The same key with a different request is rejected with 422.
+    A duplicate arriving while the first is still running waits for it (up to
+    ``wait_seconds``, then 409). 5xx responses are not stored, so they can be retried.
+
+    Keys are scoped to the caller's Authorization header. Requests to ``excluded_paths``
+    (regexes; by default the token issuing auth routes other than sign-up) are passed
+    through and never stored. No stored response keeps its Set-Cookie headers or the
+    token fields of a JSON body: a replayed sign-up confirms the account was created,
+    and the client signs in for its tokens.
+    """
+
+    POLL_SECONDS = 0.05
+
+    def __init__(self, app: ASGIApp, store, methods=("POST",), wait_seconds: float = 10, excluded_paths: list[str] = ()):
+        self.app = app
+        self.store = store
+        self.methods = set(methods)
+        self.wait_seconds = wait_seconds
+        self.excluded = re.compile("|".join(f"(?:{pattern})" for pattern in excluded_paths)) if excluded_paths else None
+        self._running: dict[str, asyncio.Event] = {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] not in self.methods:
+            await self.app(scope, receive, send)
+            return
+        if self.excluded is not None and self.excluded.match(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        idempotency_key = headers.get(HEADER)
+        if idempotency_key is None:
+            await self.app(scope, receive, send)
+            return
+        if not idempotency_key or len(idempotency_key) > MAX_KEY_LENGTH:
+            await self._send_error(send, 400, f"Idempotency-Key must be 1 to {MAX_KEY_LENGTH} characters")
+            return
+
+        body = await self._read_body(receive)
+        caller = hashlib.sha256(headers.get("authorization", "").encode()).hexdigest()[:16]
+        key = f"{caller}:{idempotency_key}"
+        fingerprint = hashlib.sha256(
+            b"\n".join([scope["method"].encode(), scope["path"].encode(), scope.get("query_string", b""), body])
+        ).hexdigest()
+
+        if await self.store.claim(key, fingerprint):
+            await self._execute(key, scope, body, send)
+            return
+
+        record = await self._wait_for_completion(key, fingerprint)
+        if record is None:
+            # the first attempt failed (or expired) meanwhile: this one takes over
+            if await self.store.claim(key, fingerprint):
+                await self._execute(key, scope, body, send)
+            else:
+                await self._send_error(send, 409, "A request with this Idempotency-Key is still in progress")
+            return
+
+        if record.fingerprint != fingerprint:
+            await self._send_error(send, 422, "Idempotency-Key was already used for a different request")
+        elif not record.completed:
+            await self._send_error(send, 409, "A request with this Idempotency-Key is still in progress")
+        else:
+            await self._replay(record, send)
+
+    async def _execute(self, key: str, scope: Scope, body: bytes, send: Send) -> None:
+        done = self._running[key] = asyncio.Event()
+        start: Optional[Message] = None
+        chunks: list[bytes] = []
+
+        async def receive_body() -> Message:
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        async def capture(message: Message) -> None:
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive_body, capture)
+        except BaseException:
+            await self.store.release(key)
+            raise
+        else:
+            if start is not None and start["status"] < 500:
+                body = _redact(start["headers"], b"".join(chunks))
+                await self.store.complete(key, start["status"], _pack_headers(start["headers"]), body)
+            else:
+                await self.store.release(key)
+        finally:
+            del self._running[key]
+            done.set()
+
+    async def _wait_for_completion(self, key: str, fingerprint: str) -> Optional[StoredResponse]:
+        deadline = time.monotonic() + self.wait_seconds
+        while True:
+            record = await self.store.get(key)
+            if record is None or record.completed or record.fingerprint != fingerprint or time.monotonic() >= deadline:
+                return record
+
+            running_here = self._running.get(key)
+            if running_here is not None:
+                # same worker: wake up exactly when it finishes
+                try:
+                    await asyncio.wait_for(running_here.wait(), deadline - time.monotonic())
+                except asyncio.TimeoutError:
+                    pass
+            else:
+                await asyncio.sleep(self.POLL_SECONDS)
+
+    @staticmethod
+    async def _read_body(receive: Receive) -> bytes:
+        chunks = []
+        more_body = True
+        while more_body:
+            message = await receive()
+            chunks.append(message.get("body", b""))
+            more_body = message.get("more_body", False)
+        return b"".join(chunks)
+
+    @staticmethod
+    async def _replay(record: StoredResponse, send: Send) -> None:
+        headers = _unpack_headers(record.headers or [])
+        headers += [(b"content-length", str(len(record.body)).encode()), (REPLAYED_HEADER, b"true")]
+        await send({"type": "http.response.start", "status": record.status_code, "headers": headers})
+        await send({"type": "http.response.body", "body": record.body})
+
+    @staticmethod
+    async def _send_error(send: Send, status_code: int, detail: str) -> None:
+        body = json.dumps({"detail": detail}).encode()
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status_code,
+                "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
+
+
+def create_idempotency_store(kind: str, engine, ttl: float, max_entries: int):
+    if kind == "database":
+        return DatabaseIdempotencyStore(engine, ttl)
+    if kind == "memory":
+        return MemoryIdempotencyStore(ttl, max_entries)
+    raise ValueError(f"Unknown IDEMPOTENCY_STORE {kind!r}")
@@ -0,0 +1,270 @@
+import asyncio
+import itertools
+import json
+import logging
+import time
+from dataclasses import dataclass, asdict
+from typing import Callable, Iterable, Optional
+from uuid import uuid4
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "cramquest_invalidate"
+FLUSH_ALL = "*"
+# Postgres caps NOTIFY payloads at 8000 bytes; bigger batches are sent as a full flush
+MAX_PAYLOAD_BYTES = 7900
+# a jump of more sequence numbers than this is not waited for: flush at once
+MAX_MISSING = 1000
+
+_PENDING_KEYS = "pending_invalidation_keys"
+_NOTIFY = "invalidation_notify"
+
+
+def listen_url(url: str) -> str:
+    """LISTEN needs a session-level connection: bypass a PgBouncer ("-pooler") endpoint."""
+    parsed_url = make_url(url)
+    if parsed_url.host and "-pooler" in parsed_url.host:
+        parsed_url = parsed_url.set(host=parsed_url.host.replace("-pooler", ""))
+    return parsed_url.render_as_string(hide_password=False)
+
+
+@dataclass
+class InvalidationMetrics:
+    published: int = 0
+    received: int = 0
+    keys_evicted: int = 0
+    full_flushes: int = 0
+    gaps: int = 0
+    late: int = 0
+    reconnects: int = 0
+    connected: bool = False
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+class InvalidationBus:
+    """Keeps the in-process caches of every worker in step with writes.
+
+    ``publish`` (called before commit) queues keys on the session. On Postgres they
+    are sent with ``pg_notify`` from the session's before-commit hook, inside the same
+    transaction, so other workers only hear about committed writes and a rolled back
+    transaction never takes a sequence number. This worker evicts the keys itself
+    right after the commit. Every worker holds a dedicated asyncpg connection that
+    LISTENs and evicts what the others publish.
+
+    Messages carry the sender's id and a per-sender sequence number. Concurrent
+    transactions of one worker may commit (and notify) out of order, so a number
+    skipped over is only waited for: it counts as lost, and flushes every local cache,
+    if it has not arrived ``gap_timeout`` seconds later. A reconnect of the listener
+    flushes at once: whatever was missed in between can no longer be told apart.
+    """
+
+    def __init__(self, url: str, enabled: bool, reconnect_max_seconds: float = 30, gap_timeout: float = 5):
+        self.url = url
+        self.enabled = enabled
+        self.reconnect_max_seconds = reconnect_max_seconds
+        self.gap_timeout = gap_timeout
+        self.worker_id = uuid4().hex[:12]
+        self.metrics = InvalidationMetrics()
+        self._sequence = itertools.count(1)
+        self._last_seen: dict[str, int] = {}
+        # sender -> {skipped sequence number: monotonic deadline}
+        self._missing: dict[str, dict[int, float]] = {}
+        self._subscribers: list[tuple[Callable[[list[str]], None], Callable[[], None]]] = []
+        self._task: Optional[asyncio.Task] = None
+
+    def subscribe(self, evict: Callable[[list[str]], None], flush: Callable[[], None]) -> None:
+        self._subscribers.append((evict, flush))
+
+    async def publish(self, session, *keys: str) -> None:
+        """Invalidate ``keys`` everywhere once the session's transaction commits."""
+        if not keys:
+            return
+
+        session.info.setdefault(_PENDING_KEYS, set()).update(keys)
+
+        if self.enabled and session.get_bind().dialect.name == "postgresql":
+            session.info[_NOTIFY] = True  # sent by _notify_before_commit
+
+    def notify(self, session: Session) -> None:
+        """Send the session's pending keys; runs in its before-commit hook."""
+        keys = session.info.get(_PENDING_KEYS)
+        if not keys or not session.info.pop(_NOTIFY, False):
+            return
+        payload = self._encode(keys)
+        session.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": CHANNEL, "payload": payload})
+        self.metrics.published += 1
+
+    def _encode(self, keys: Iterable[str]) -> str:
+        keys = sorted(keys)
+        message = {"w": self.worker_id, "s": next(self._sequence), "k": keys}
+        payload = json.dumps(message, separators=(",", ":"))
+        if len(payload.encode()) > MAX_PAYLOAD_BYTES:
+            message["k"] = [FLUSH_ALL]
+            payload = json.dumps(message, separators=(",", ":"))
+        return payload
+
+    def evict(self, keys: list[str]) -> None:
+        if FLUSH_ALL in keys:
+            self.flush()
+            return
+        for evict, _ in self._subscribers:
+            evict(keys)
+        self.metrics.keys_evicted += len(keys)
+
+    def flush(self) -> None:
+        for _, flush in self._subscribers:
+            flush()
+        self.metrics.full_flushes += 1
+
+    def _on_notification(self, connection, pid, channel, payload: str) -> None:
+        self.metrics.received += 1
+        try:
+            message = json.loads(payload)
+            sender, sequence, keys = message["w"], int(message["s"]), list(message["k"])
+        except (ValueError, KeyError, TypeError):
+            logger.warning("Unreadable invalidation message, flushing caches: %r", payload)
+            self.flush()
+            return
+
+        if sender == self.worker_id:
+            return  # already evicted locally after our own commit
+
+        if self._track(sender, sequence, time.monotonic()):
+            self.evict(keys)
+        self.expire_missing(time.monotonic())
+
+    def _track(self, sender: str, sequence: int, now: float) -> bool:
+        """Record ``sequence`` from ``sender``; False when it flushed the caches instead."""
+        last = self._last_seen.get(sender)
+        missing = self._missing.setdefault(sender, {})
+
+        if last is None or sequence > last:
+            self._last_seen[sender] = sequence
+            skipped = sequence - last - 1 if last is not None else 0
+            if skipped > MAX_MISSING:
+                self.metrics.gaps += 1
+                logger.warning("Invalidation gap from worker %s (%s -> %s), flushing caches", sender, last, sequence)
+                self._missing.clear()
+                self.flush()
+                return False
+            for skipped_sequence in range(sequence - skipped, sequence):
+                missing[skipped_sequence] = now + self.gap_timeout
+        elif missing.pop(sequence, None) is not None:
+            self.metrics.late += 1  # committed after a later transaction of the same worker
+        return True
+
+    def expire_missing(self, now: float) -> None:
+        """Flush the caches if a skipped message is still missing after ``gap_timeout``."""
+        for sender, missing in self._missing.items():
+            expired = [sequence for sequence, deadline in missing.items() if deadline <= now]
+            if expired:
+                self.metrics.gaps += 1
+                logger.warning("Invalidation messages %s from worker %s never arrived, flushing caches", expired, sender)
+                self._missing.clear()
+                self.flush()
+                return
+
+    def start(self, dialect) -> None:
+        if not self.enabled or self._task is not None:
+            return
+        self._task = asyncio.create_task(self._listen_forever(dialect))
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _listen_forever(self, dialect) -> None:
+        import asyncpg
+
+        # same connect arguments (ssl etc.) the engine would use for this URL
+        cargs, cparams = dialect.create_connect_args(make_url(self.url))
+        delay, connected_once = 0.5, False
+
+        while True:
+            connection = None
+            lost = asyncio.Event()
+            try:
+                connection = await asyncpg.connect(*cargs, **cparams)
+                connection.add_termination_listener(lambda _: lost.set())
+                await connection.add_listener(CHANNEL, self._on_notification)
+                self.metrics.connected = True
+
+                if connected_once:
+                    # anything published while we were away is lost
+                    self.metrics.reconnects += 1
+                    self._last_seen.clear()
+                    self._missing.clear()
+                    self.flush()
+                connected_once, delay = True, 0.5
+
+                while not lost.is_set():
+                    try:
+                        await asyncio.wait_for(lost.wait(), self.gap_timeout)
+                    except asyncio.TimeoutError:
+                        pass
+                    self.expire_missing(time.monotonic())
+                logger.warning("Invalidation listener connection lost, reconnecting")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Invalidation listener failed: %s (retrying in %.1fs)", e, delay)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.reconnect_max_seconds)
+            finally:
+                self.metrics.connected = False
+                if connection is not None and not connection.is_closed():
+                    await connection.close()
+
+    def stats(self) -> dict:
+        return {"worker_id": self.worker_id, "enabled": self.enabled, **self.metrics.as_dict()}
+
+
+def pending_invalidation_keys(session) -> list[str]:
+    """Keys published in the session's current transaction."""
+    return list(session.info.get(_PENDING_KEYS, ()))
+
+
+@event.listens_for(Session, "before_commit")
+def _notify_before_commit(session: Session) -> None:
+    invalidation_bus.notify(session)
+
+
+@event.listens_for(Session, "after_commit")
+def _evict_after_commit(session: Session) -> None:
+    keys = session.info.pop(_PENDING_KEYS, None)
+    if keys:
+        invalidation_bus.evict(list(keys))
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session: Session) -> None:
+    session.info.pop(_PENDING_KEYS, None)
+    session.info.pop(_NOTIFY, None)
+
+
+def _bus_enabled(url: str) -> bool:
+    if settings.INVALIDATION_BUS_ENABLED is not None:
+        return settings.INVALIDATION_BUS_ENABLED
+    return make_url(url).get_driver_name() == "asyncpg"
+
+
+invalidation_bus = InvalidationBus(
+    url=settings.INVALIDATION_DATABASE_URL or listen_url(settings.DATABASE_URL),
+    enabled=_bus_enabled(settings.DATABASE_URL),
+    reconnect_max_seconds=settings.INVALIDATION_RECONNECT_MAX_SECONDS,
+    gap_timeout=settings.INVALIDATION_GAP_TIMEOUT_SECONDS,
+)
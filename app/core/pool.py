@@ -0,0 +1,221 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, asdict
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.util import await_only
+
+logger = logging.getLogger(__name__)
+
+_LOCAL_HOSTS = {None, "", "localhost", "127.0.0.1", "::1"}
+
+
+def pre_ping_is_cheap(url: str) -> bool:
+    """Pre-pinging every checkout is only worth it when the database is a local round trip away."""
+    return make_url(url).host in _LOCAL_HOSTS
+
+
+class PoolWaitTracker:
+    """How long checkouts waited for a pooled connection over the last ``window`` seconds."""
+
+    def __init__(self, window: float = 5.0, max_samples: int = 2048):
+        self.window = window
+        self.checkouts = 0
+        self.wait_seconds_max = 0.0
+        self._samples: deque[tuple[float, float]] = deque(maxlen=max_samples)
+
+    def record(self, seconds: float) -> None:
+        self.checkouts += 1
+        self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+        self._samples.append((time.monotonic(), seconds))
+
+    def recent_average(self) -> float:
+        """Mean wait of the checkouts in the window; 0 once nobody has waited for ``window`` seconds."""
+        cutoff = time.monotonic() - self.window
+        while self._samples and self._samples[0][0] < cutoff:
+            self._samples.popleft()
+        if not self._samples:
+            return 0.0
+        return sum(seconds for _, seconds in self._samples) / len(self._samples)
+
+    def as_dict(self) -> dict:
+        return {
+            "checkouts": self.checkouts,
+            "wait_seconds_recent_avg": self.recent_average(),
+            "wait_seconds_max": self.wait_seconds_max,
+        }
+
+
+class TimedAsyncAdaptedQueuePool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that times every checkout (queue wait, or opening an overflow connection)."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_tracker = PoolWaitTracker()
+
+    def _do_get(self):
+        started_at = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            self.wait_tracker.record(time.perf_counter() - started_at)
+
+
+@dataclass
+class PoolMetrics:
+    connects: int = 0
+    connect_failures: int = 0
+    connect_seconds_total: float = 0.0
+    connect_seconds_max: float = 0.0
+    last_connect_seconds: Optional[float] = None
+    keepalive_runs: int = 0
+    keepalive_pings: int = 0
+    keepalive_failures: int = 0
+
+    def record_connect(self, seconds: float) -> None:
+        self.connects += 1
+        self.connect_seconds_total += seconds
+        self.connect_seconds_max = max(self.connect_seconds_max, seconds)
+        self.last_connect_seconds = seconds
+
+    def as_dict(self) -> dict:
+        data = asdict(self)
+        data["connect_seconds_avg"] = self.connect_seconds_total / self.connects if self.connects else None
+        return data
+
+
+class PoolManager:
+    """Keeps an engine's pool warm for serverless Postgres.
+
+    * ``prewarm`` opens ``pool_size`` connections in parallel (e.g. at startup)
+    * ``start_keepalive`` pings idle pooled connections every ``keepalive_interval``
+      seconds so they are not dropped and the compute does not suspend under them
+    * every new DBAPI connection is timed, which is the cold-connection latency
+      reported by ``stats``
+
+    ``simulated_connect_delay`` adds an artificial (non-blocking) delay to every new
+    connection, so all of the above can be exercised against a local Postgres.
+    """
+
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        keepalive_interval: float = 0,
+        simulated_connect_delay: float = 0,
+    ):
+        self.engine = engine
+        self.keepalive_interval = keepalive_interval
+        self.simulated_connect_delay = simulated_connect_delay
+        self.metrics = PoolMetrics()
+        self._keepalive_task: Optional[asyncio.Task] = None
+
+        event.listen(engine.sync_engine, "do_connect", self._on_do_connect)
+        event.listen(engine.sync_engine, "connect", self._on_connect)
+
+    @property
+    def name(self) -> str:
+        return self.engine.url.host or str(self.engine.url)
+
+    def _on_do_connect(self, dialect, conn_rec, cargs, cparams):
+        conn_rec.info["connect_started_at"] = time.perf_counter()
+        if self.simulated_connect_delay:
+            # runs inside SQLAlchemy's greenlet, so this yields to the event loop
+            await_only(asyncio.sleep(self.simulated_connect_delay))
+
+    def _on_connect(self, dbapi_connection, conn_rec):
+        started_at = conn_rec.info.pop("connect_started_at", None)
+        if started_at is not None:
+            self.metrics.record_connect(time.perf_counter() - started_at)
+
+    async def prewarm(self, size: Optional[int] = None) -> None:
+        """Open ``size`` (default: pool_size) connections concurrently, then hand them back to the pool."""
+        size = size or self.engine.pool.size()
+        connections = [self.engine.connect() for _ in range(size)]
+        results = await asyncio.gather(*(conn.start() for conn in connections), return_exceptions=True)
+
+        await asyncio.gather(
+            *(conn.close() for conn, result in zip(connections, results) if not isinstance(result, BaseException))
+        )
+
+        errors = [result for result in results if isinstance(result, BaseException)]
+        if errors:
+            self.metrics.connect_failures += len(errors)
+            logger.warning("Pool pre-warm for %s opened %d/%d connections: %s", self.name, size - len(errors), size, errors[0])
+
+    async def ping_idle(self) -> None:
+        """Ping the connections sitting idle in the pool with the dialect's cheapest ping.
+
+        One at a time: the pool hands connections out first in, first out, so each
+        checkout gets the next idle one, and no overflow connection is opened for a
+        ping while requests hold the others. A connection failing its ping is discarded.
+        """
+        idle = self.engine.pool.checkedin()
+        if not idle:
+            return
+
+        pings = failures = 0
+        for _ in range(idle):
+            if not self.engine.pool.checkedin():
+                break  # requests took the rest: they are not idle
+            pings += 1
+            if not await self._ping_one():
+                failures += 1
+
+        self.metrics.keepalive_runs += 1
+        self.metrics.keepalive_pings += pings
+        self.metrics.keepalive_failures += failures
+
+    async def _ping_one(self) -> bool:
+        async with self.engine.connect() as conn:
+            try:
+                alive = await conn.run_sync(
+                    lambda sync_conn: sync_conn.dialect.do_ping(sync_conn.connection.dbapi_connection)
+                )
+            except Exception as e:
+                logger.debug("Keepalive ping on %s failed: %s", self.name, e)
+                alive = False
+            if not alive:
+                await conn.invalidate()  # closed: the pool opens a fresh one in its place
+            return bool(alive)
+
+    def start_keepalive(self) -> None:
+        if self.keepalive_interval <= 0 or self._keepalive_task is not None:
+            return
+        self._keepalive_task = asyncio.create_task(self._keepalive_loop())
+
+    async def stop_keepalive(self) -> None:
+        if self._keepalive_task is None:
+            return
+
+        self._keepalive_task.cancel()
+        try:
+            await self._keepalive_task
+        except asyncio.CancelledError:
+            pass
+        self._keepalive_task = None
+
+    async def _keepalive_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.keepalive_interval)
+            try:
+                await self.ping_idle()
+            except Exception as e:
+                logger.warning("Keepalive for %s failed: %s", self.name, e)
+
+    def stats(self) -> dict:
+        pool = self.engine.pool
+        return {
+            "engine": self.name,
+            "pool_size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": pool.overflow(),
+            **self.metrics.as_dict(),
+            **(pool.wait_tracker.as_dict() if hasattr(pool, "wait_tracker") else {}),
+        }
@@ -0,0 +1,164 @@
+import asyncio
+import contextvars
+import itertools
+import json
+import os
+import random
+import re
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+from fastapi.security.utils import get_authorization_scheme_param
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.auth import claims_from_token
+from app.core.config import settings
+
+HEADER = "x-profile"
+PROFILE_ID_HEADER = "X-Profile-Id"
+FORMATS = ("pstats", "callgrind")
+
+# yappi tags every sampled call with this: only the profiled request's calls carry it
+_profile_tag: contextvars.ContextVar[int] = contextvars.ContextVar("profile_tag", default=0)
+
+
+class ProfileStore:
+    """A directory of saved profiles, pruned to the newest ``max_profiles``.
+
+    Every profile is ``<id>.json`` (method, path, status, duration) plus one file per
+    format in FORMATS.
+    """
+
+    def __init__(self, directory: str, max_profiles: int):
+        self.directory = Path(directory)
+        self.max_profiles = max_profiles
+
+    def save(self, profile_id: str, stats, meta: dict) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        stats.save(str(self.directory / f"{profile_id}.pstats"), type="pstat")
+        stats.save(str(self.directory / f"{profile_id}.callgrind"), type="callgrind")
+        (self.directory / f"{profile_id}.json").write_text(json.dumps(meta))
+        self._prune()
+
+    def list(self) -> list[dict]:
+        """Saved profiles, newest first."""
+        if not self.directory.is_dir():
+            return []
+        profiles = []
+        for meta_path in sorted(self.directory.glob("*.json"), reverse=True):
+            try:
+                meta = json.loads(meta_path.read_text())
+            except (OSError, ValueError):
+                continue
+            profile_id = meta_path.stem
+            meta["id"] = profile_id
+            meta["files"] = {
+                fmt: f"{profile_id}.{fmt}" for fmt in FORMATS if (self.directory / f"{profile_id}.{fmt}").exists()
+            }
+            profiles.append(meta)
+        return profiles
+
+    def path(self, name: str) -> Optional[Path]:
+        """The file called ``name``, only if it is one of ours (no path traversal)."""
+        stem, _, fmt = name.rpartition(".")
+        if fmt not in FORMATS or not re.fullmatch(r"[\w-]+", stem):
+            return None
+        path = self.directory / name
+        return path if path.is_file() else None
+
+    def _prune(self) -> None:
+        profile_ids = sorted(path.stem for path in self.directory.glob("*.json"))
+        for profile_id in profile_ids[: max(len(profile_ids) - self.max_profiles, 0)]:
+            for suffix in ("json", *FORMATS):
+                try:
+                    os.remove(self.directory / f"{profile_id}.{suffix}")
+                except FileNotFoundError:
+                    pass
+
+
+class ProfilingMiddleware:
+    """Profiles single requests with yappi, in wall time, coroutine-aware.
+
+    With ``on_request``, a request sending ``X-Profile: 1`` is profiled if its bearer
+    token is an admin's claims token (checked without a query, see auth); requests
+    are also profiled at random at ``sample_rate``. One request is profiled at a
+    time; calls are tagged through a context variable so concurrent requests on the
+    same worker do not end up in the profile. The response carries ``X-Profile-Id``;
+    the files are listed under ``/debug/profiles``.
+
+    Only installed when profiling is enabled (see main), so it costs nothing otherwise.
+    """
+
+    def __init__(self, app: ASGIApp, store: ProfileStore, on_request: bool = False, sample_rate: float = 0.0):
+        import yappi
+
+        self.app = app
+        self.store = store
+        self.on_request = on_request
+        self.sample_rate = sample_rate
+        self._yappi = yappi
+        self._tags = itertools.count(1)
+        self._busy = False
+
+    async def _wanted(self, scope: Scope) -> bool:
+        headers = Headers(scope=scope)
+        if self.on_request and headers.get(HEADER) is not None:
+            scheme, token = get_authorization_scheme_param(headers.get("authorization"))
+            if scheme.lower() != "bearer":
+                return False
+            claims = await claims_from_token(token)
+            return claims is not None and claims.is_admin
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or self._busy or not await self._wanted(scope):
+            await self.app(scope, receive, send)
+            return
+
+        yappi = self._yappi
+        self._busy = True
+        tag = next(self._tags)
+        profile_id = f"{datetime.now(timezone.utc):%Y%m%dT%H%M%S%f}-{tag}"
+        status_code = None
+
+        async def send_with_id(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                MutableHeaders(scope=message).append(PROFILE_ID_HEADER, profile_id)
+            await send(message)
+
+        token = _profile_tag.set(tag)
+        yappi.set_clock_type("wall")
+        yappi.set_tag_callback(_profile_tag.get)
+        yappi.start(builtins=False)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            duration = time.perf_counter() - start
+            yappi.stop()
+            _profile_tag.reset(token)
+            stats = yappi.get_func_stats(filter={"tag": tag})
+            yappi.clear_stats()
+            self._busy = False
+
+            meta = {
+                "method": scope["method"],
+                "path": scope["path"],
+                "status": status_code,
+                "duration_ms": round(duration * 1000, 2),
+                "created_at": datetime.now(timezone.utc).isoformat(),
+            }
+            # writing the files is blocking: keep it off the event loop
+            await asyncio.to_thread(self.store.save, profile_id, stats, meta)
+
+
+profile_store = ProfileStore(settings.PROFILING_DIR, settings.PROFILING_MAX_PROFILES)
+
+
+def profiling_enabled() -> bool:
+    return settings.PROFILING_ON_REQUEST or settings.PROFILING_SAMPLE_RATE > 0
@@ -0,0 +1,333 @@
+import asyncio
+import json
+import math
+import re
+import sqlite3
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from jose import JWTError, jwt
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+try:
+    import redis.asyncio as redis_asyncio
+    from redis.exceptions import WatchError
+except ImportError:  # optional: only needed for RATE_LIMIT_BACKEND=redis
+    redis_asyncio = None
+
+TOKEN_BUCKET = "token_bucket"
+SLIDING_WINDOW = "sliding_window"
+
+# what a policy counts requests by
+KEY_IP = "ip"
+KEY_USER = "user"  # the bearer token's subject; falls back to the IP without a valid token
+
+
+@dataclass(frozen=True)
+class RateLimitPolicy:
+    name: str
+    limit: int
+    period: float  # seconds
+    algorithm: str = TOKEN_BUCKET
+    key: str = KEY_IP
+
+    @classmethod
+    def parse(cls, name: str, spec: str, **kwargs) -> "RateLimitPolicy":
+        """``"10/60"``: 10 requests per 60 seconds."""
+        limit, _, period = spec.partition("/")
+        return cls(name=name, limit=int(limit), period=float(period or 60), **kwargs)
+
+
+@dataclass
+class RateLimitResult:
+    allowed: bool
+    remaining: int
+    reset_after: float  # seconds until the limit is fully available again
+    retry_after: float  # seconds until the next request would be allowed
+
+
+def _take_token_bucket(state: Optional[list], policy: RateLimitPolicy, now: float) -> tuple[list, RateLimitResult]:
+    """Bursts up to ``limit``, refilled continuously at ``limit / period`` per second."""
+    rate = policy.limit / policy.period
+    tokens, updated_at = state if state else (policy.limit, now)
+    tokens = min(policy.limit, tokens + (now - updated_at) * rate)
+
+    allowed = tokens >= 1
+    if allowed:
+        tokens -= 1
+
+    return [tokens, now], RateLimitResult(
+        allowed=allowed,
+        remaining=int(tokens),
+        reset_after=(policy.limit - tokens) / rate,
+        retry_after=0.0 if allowed else (1 - tokens) / rate,
+    )
+
+
+def _take_sliding_window(state: Optional[list], policy: RateLimitPolicy, now: float) -> tuple[list, RateLimitResult]:
+    """Sliding window counter: the previous window's count, weighted by how much of it
+    still overlaps the last ``period`` seconds, plus the current window's count."""
+    window_start = math.floor(now / policy.period) * policy.period
+    started, current, previous = state if state else (window_start, 0, 0)
+    if started != window_start:
+        previous = current if started == window_start - policy.period else 0
+        current = 0
+
+    elapsed = (now - window_start) / policy.period
+    used = previous * (1 - elapsed) + current
+    allowed = used + 1 <= policy.limit
+    if allowed:
+        current += 1
+        used += 1
+
+    window_left = window_start + policy.period - now
+    if allowed:
+        retry_after = 0.0
+    elif current + 1 > policy.limit:
+        # this window is full: wait until enough of it has slid out of the next one
+        retry_after = window_left + policy.period * (1 - (policy.limit - 1) / current)
+    else:
+        # until enough of the previous window has slid out
+        retry_after = max(policy.period * (1 - (policy.limit - 1 - current) / previous) - (now - window_start), 0.0)
+
+    return [window_start, current, previous], RateLimitResult(
+        allowed=allowed,
+        remaining=max(int(policy.limit - used), 0),
+        reset_after=window_left + policy.period if current else window_left if previous else 0.0,
+        retry_after=retry_after,
+    )
+
+
+_ALGORITHMS: dict[str, Callable] = {TOKEN_BUCKET: _take_token_bucket, SLIDING_WINDOW: _take_sliding_window}
+
+
+def take(state: Optional[list], policy: RateLimitPolicy, now: float) -> tuple[list, RateLimitResult]:
+    return _ALGORITHMS[policy.algorithm](state, policy, now)
+
+
+class MemoryRateLimitBackend:
+    """Per-worker state in an LRU of at most ``max_keys`` keys, so a flood of distinct
+    clients cannot grow it without bound (an evicted key simply starts over)."""
+
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        self._states: OrderedDict[str, list] = OrderedDict()
+
+    async def hit(self, key: str, policy: RateLimitPolicy) -> RateLimitResult:
+        state, result = take(self._states.get(key), policy, time.time())
+        self._states[key] = state
+        self._states.move_to_end(key)
+        while len(self._states) > self.max_keys:
+            self._states.popitem(last=False)
+        return result
+
+
+class SqliteRateLimitBackend:
+    """Shared by every worker on the host through one SQLite file: the local stand-in
+    for the Redis backend, so the shared code path can run without a Redis server."""
+
+    PRUNE_EVERY_NEW_KEYS = 1000
+
+    def __init__(self, path: str, max_keys: int):
+        self.path = path
+        self.max_keys = max_keys
+        self._new_keys = 0
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = asyncio.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS rate_limit (key TEXT PRIMARY KEY, state TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._connection = connection
+        return self._connection
+
+    def _hit(self, key: str, policy: RateLimitPolicy) -> RateLimitResult:
+        connection = self._connect()
+        now = time.time()
+        connection.execute("BEGIN IMMEDIATE")  # serializes the read-modify-write across workers
+        try:
+            row = connection.execute("SELECT state FROM rate_limit WHERE key = ? AND expires_at > ?", (key, now)).fetchone()
+            state, result = take(json.loads(row[0]) if row else None, policy, now)
+            connection.execute(
+                "INSERT OR REPLACE INTO rate_limit (key, state, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(state), now + 2 * policy.period),
+            )
+            if not row:
+                self._new_keys += 1
+                if self._new_keys % self.PRUNE_EVERY_NEW_KEYS == 0:
+                    self._prune(connection, now)
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        return result
+
+    def _prune(self, connection: sqlite3.Connection, now: float) -> None:
+        """Drop expired keys, then the least recently used ones past ``max_keys``."""
+        connection.execute("DELETE FROM rate_limit WHERE expires_at <= ?", (now,))
+        connection.execute(
+            "DELETE FROM rate_limit WHERE key IN (SELECT key FROM rate_limit ORDER BY expires_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_keys,),
+        )
+
+    async def hit(self, key: str, policy: RateLimitPolicy) -> RateLimitResult:
+        async with self._lock:  # one connection per worker: one statement at a time
+            return await asyncio.to_thread(self._hit, key, policy)
+
+
+class RedisRateLimitBackend:
+    """Shared across hosts: the state of every key lives in Redis, updated optimistically
+    (WATCH/MULTI, retried on conflict) with the same algorithms as the local backends."""
+
+    def __init__(self, url: str):
+        if redis_asyncio is None:
+            raise RuntimeError("RATE_LIMIT_BACKEND=redis needs the redis package")
+        self.client = redis_asyncio.from_url(url)
+
+    async def hit(self, key: str, policy: RateLimitPolicy) -> RateLimitResult:
+        redis_key = f"cramquest:rate_limit:{key}"
+        async with self.client.pipeline(transaction=True) as pipe:
+            while True:
+                try:
+                    await pipe.watch(redis_key)
+                    raw = await pipe.get(redis_key)
+                    state, result = take(json.loads(raw) if raw else None, policy, time.time())
+                    pipe.multi()
+                    pipe.set(redis_key, json.dumps(state), px=int(2 * policy.period * 1000))
+                    await pipe.execute()
+                    return result
+                except WatchError:
+                    continue
+
+
+@dataclass(frozen=True)
+class RoutePolicy:
+    methods: frozenset
+    path: re.Pattern
+    policy: RateLimitPolicy
+
+
+class RateLimitMiddleware:
+    """Applies the first matching per-route policy and reports it in the headers.
+
+    Every limited response carries ``RateLimit-Limit``, ``RateLimit-Remaining``,
+    ``RateLimit-Reset`` (seconds) and ``RateLimit-Policy``; a rejected request gets
+    429 with ``Retry-After`` before the route (and its bcrypt) runs.
+    """
+
+    def __init__(self, app: ASGIApp, backend, routes: list[RoutePolicy], trust_forwarded_for: bool = False):
+        self.app = app
+        self.backend = backend
+        self.routes = routes
+        self.trust_forwarded_for = trust_forwarded_for
+
+    def _match(self, scope: Scope) -> Optional[RateLimitPolicy]:
+        for route in self.routes:
+            if scope["method"] in route.methods and route.path.match(scope["path"]):
+                return route.policy
+        return None
+
+    def _client_ip(self, scope: Scope, headers: Headers) -> str:
+        if self.trust_forwarded_for and "x-forwarded-for" in headers:
+            return headers["x-forwarded-for"].split(",")[0].strip()
+        client = scope.get("client")
+        return client[0] if client else "unknown"
+
+    def _key(self, policy: RateLimitPolicy, scope: Scope) -> str:
+        headers = Headers(scope=scope)
+        if policy.key == KEY_USER:
+            scheme, _, token = headers.get("authorization", "").partition(" ")
+            if scheme.lower() == "bearer" and token:
+                try:
+                    # verified: a forged subject must not buy a fresh bucket
+                    subject = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]).get("sub")
+                    if subject is not None:
+                        return f"{policy.name}:user:{subject}"
+                except JWTError:
+                    pass
+        return f"{policy.name}:ip:{self._client_ip(scope, headers)}"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        policy = self._match(scope) if scope["type"] == "http" else None
+        if policy is None:
+            await self.app(scope, receive, send)
+            return
+
+        result = await self.backend.hit(self._key(policy, scope), policy)
+        rate_limit_headers = [
+            ("RateLimit-Limit", str(policy.limit)),
+            ("RateLimit-Remaining", str(result.remaining)),
+            ("RateLimit-Reset", str(math.ceil(result.reset_after))),
+            ("RateLimit-Policy", f"{policy.limit};w={int(policy.period)}"),
+        ]
+
+        if not result.allowed:
+            await self._reject(send, policy, result, rate_limit_headers)
+            return
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                for name, value in rate_limit_headers:
+                    headers.append(name, value)
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
+
+    @staticmethod
+    async def _reject(send: Send, policy: RateLimitPolicy, result: RateLimitResult, rate_limit_headers: list) -> None:
+        body = json.dumps({"detail": f"Too many requests ({policy.name}), retry later"}).encode()
+        headers = [(name.lower().encode(), value.encode()) for name, value in rate_limit_headers]
+        headers += [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(max(math.ceil(result.retry_after), 1)).encode()),
+        ]
+        await send({"type": "http.response.start", "status": 429, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
+
+
+def create_rate_limit_backend(kind: str):
+    if kind == "memory":
+        return MemoryRateLimitBackend(settings.RATE_LIMIT_MAX_KEYS)
+    if kind == "sqlite":
+        return SqliteRateLimitBackend(settings.RATE_LIMIT_SQLITE_PATH, settings.RATE_LIMIT_MAX_KEYS)
+    if kind == "redis":
+        return RedisRateLimitBackend(settings.RATE_LIMIT_URL)
+    raise ValueError(f"Unknown RATE_LIMIT_BACKEND {kind!r}")
+
+
+_WRITE_METHODS = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+
+# first match wins
+ROUTE_POLICIES = [
+    RoutePolicy(
+        frozenset({"POST"}), re.compile(r"^/auth/sign_in$"),
+        RateLimitPolicy.parse("sign_in", settings.RATE_LIMIT_SIGN_IN, algorithm=SLIDING_WINDOW),
+    ),
+    RoutePolicy(
+        frozenset({"POST"}), re.compile(r"^/auth/sign_up$"),
+        RateLimitPolicy.parse("sign_up", settings.RATE_LIMIT_SIGN_UP, algorithm=SLIDING_WINDOW),
+    ),
+    RoutePolicy(
+        frozenset({"GET"}), re.compile(r"^/auth/availability$"),
+        RateLimitPolicy.parse("availability", settings.RATE_LIMIT_AVAILABILITY, algorithm=SLIDING_WINDOW),
+    ),
+    RoutePolicy(
+        frozenset({"POST"}), re.compile(r"^/auth/refresh_token$"),
+        RateLimitPolicy.parse("refresh_token", settings.RATE_LIMIT_REFRESH_TOKEN),
+    ),
+    RoutePolicy(
+        _WRITE_METHODS, re.compile(r"^/(?!auth/)"),
+        RateLimitPolicy.parse("writes", settings.RATE_LIMIT_WRITES, key=KEY_USER),
+    ),
+]
@@ -0,0 +1,249 @@
+import asyncio
+import hashlib
+import logging
+from dataclasses import dataclass, asdict
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from uuid import uuid4
+
+from fastapi import HTTPException
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.auth import create_refresh_token
+from app.core.bloom import BloomFilter
+from app.core.config import settings
+from app.core.database import engine
+from app.core.invalidation import invalidation_bus
+from app.models.refresh_token_model import RefreshToken
+from app.schemas.auth_schema import TokenClaims
+
+logger = logging.getLogger(__name__)
+
+# invalidation keys: "revoked_refresh_token:<jti>" adds the jti to every worker's filter
+REVOKED_PREFIX = "revoked_refresh_token:"
+
+
+class RefreshTokenRevoked(HTTPException):
+    def __init__(self):
+        super().__init__(status_code=401, detail="Refresh token revoked")
+
+
+class RefreshTokenReused(HTTPException):
+    def __init__(self):
+        super().__init__(status_code=401, detail="Refresh token already used, sign in again")
+
+
+@dataclass
+class RefreshTokenMetrics:
+    filter_negatives: int = 0
+    store_checks: int = 0
+    false_positives: int = 0
+    revoked_rejected: int = 0
+    reuses: int = 0
+    rebuilds: int = 0
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+class RefreshTokenStore:
+    """Rotating refresh tokens, grouped in families (one per sign in).
+
+    Every refresh hands out a new token and retires the presented one. Retiring costs
+    one INSERT of the new token's row: ``parent_jti`` is unique, so presenting an
+    already rotated token fails that insert, which means it was copied; the whole
+    family is revoked then, the thief's and the owner's tokens alike.
+
+    Revoked jtis are also kept in a per-worker Bloom filter, so asking "is this token
+    revoked?" normally needs no query: only a possible hit is confirmed against the
+    table. The filter is rebuilt every ``rebuild_seconds`` (dropping expired tokens)
+    and revocations on other workers reach it at once through ``invalidation_bus``.
+    Until the first rebuild every check goes to the table.
+    """
+
+    def __init__(self, engine, rebuild_seconds: float, error_rate: float):
+        self.engine = engine
+        self.rebuild_seconds = rebuild_seconds
+        self.error_rate = error_rate
+        self.metrics = RefreshTokenMetrics()
+        self._filter: Optional[BloomFilter] = None
+        self._added_while_rebuilding: Optional[list[str]] = None
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def issue(self, claims: TokenClaims, family: Optional[str] = None, jti: Optional[str] = None) -> str:
+        """A signed refresh token; a new family unless ``family`` is given. Stores nothing."""
+        return create_refresh_token(
+            {
+                "sub": str(claims.id),
+                "ver": claims.token_version,
+                "jti": jti or uuid4().hex,
+                "fam": family or uuid4().hex,
+            }
+        )
+
+    @staticmethod
+    def _with_legacy_ids(payload: dict) -> dict:
+        """``payload`` with a jti and family, derived from sub and exp for tokens issued
+        before rotation: those carry nothing else, so equal sub and exp is the same token."""
+        if payload.get("jti") is not None and payload.get("fam") is not None:
+            return payload
+        legacy_id = hashlib.blake2b(f"{payload['sub']}:{payload['exp']}".encode(), digest_size=16).hexdigest()
+        return {**payload, "jti": legacy_id, "fam": legacy_id}
+
+    async def rotate(self, session: AsyncSession, payload: dict, claims: TokenClaims) -> str:
+        """The token replacing the (verified) refresh token ``payload``. Commits the session.
+
+        A token issued before rotation is rotated like any other under its derived ids,
+        so its first use records it and a second one is a reuse.
+        """
+        payload = self._with_legacy_ids(payload)
+        jti, family = payload["jti"], payload["fam"]
+
+        if await self.is_revoked(session, jti):
+            self.metrics.revoked_rejected += 1
+            raise RefreshTokenRevoked
+
+        new_jti = uuid4().hex
+        expires_at = datetime.now(timezone.utc) + timedelta(days=settings.ACCESS_TOKEN_EXPIRE_DAYS)
+        try:
+            await session.execute(
+                RefreshToken.__table__.insert().values(
+                    jti=new_jti, family=family, parent_jti=jti, user_id=claims.id, expires_at=expires_at
+                )
+            )
+            await session.commit()
+        except IntegrityError:
+            await session.rollback()
+            await self.revoke_family(session, payload)
+            await session.commit()
+            self.metrics.reuses += 1
+            logger.warning("Refresh token reused, family revoked", extra={"user_id": claims.id, "family": family})
+            raise RefreshTokenReused
+
+        return self.issue(claims, family=family, jti=new_jti)
+
+    async def revoke_family(self, session: AsyncSession, payload: dict) -> None:
+        """Revoke every token of the family of refresh token ``payload``, once the session commits."""
+        payload = self._with_legacy_ids(payload)
+        jti, family = payload["jti"], payload["fam"]
+
+        now = datetime.now(timezone.utc)
+        result = await session.execute(
+            update(RefreshToken)
+            .where(RefreshToken.family == family, RefreshToken.revoked_at.is_(None))
+            .values(revoked_at=now)
+            .returning(RefreshToken.jti)
+        )
+        revoked = list(result.scalars())
+
+        # the presented token has no row if it was never rotated
+        insert = postgresql_insert if session.get_bind().dialect.name == "postgresql" else sqlite_insert
+        await session.execute(
+            insert(RefreshToken)
+            .values(
+                jti=jti,
+                family=family,
+                user_id=int(payload["sub"]),
+                expires_at=datetime.fromtimestamp(payload["exp"], timezone.utc),
+                revoked_at=now,
+            )
+            .on_conflict_do_nothing(index_elements=[RefreshToken.jti])
+        )
+        revoked.append(jti)
+
+        await invalidation_bus.publish(session, *(REVOKED_PREFIX + revoked_jti for revoked_jti in set(revoked)))
+
+    async def is_revoked(self, session: AsyncSession, jti: str) -> bool:
+        if self._filter is not None and jti not in self._filter:
+            self.metrics.filter_negatives += 1
+            return False
+
+        self.metrics.store_checks += 1
+        revoked_at = await session.scalar(select(RefreshToken.revoked_at).where(RefreshToken.jti == jti))
+        if revoked_at is None and self._filter is not None:
+            self.metrics.false_positives += 1
+        return revoked_at is not None
+
+    def _evict(self, keys: list[str]) -> None:
+        for key in keys:
+            if key.startswith(REVOKED_PREFIX):
+                jti = key[len(REVOKED_PREFIX):]
+                if self._filter is not None:
+                    self._filter.add(jti)
+                if self._added_while_rebuilding is not None:
+                    self._added_while_rebuilding.append(jti)
+
+    def _flush(self) -> None:
+        self._wake.set()  # missed revocations: rebuild now
+
+    async def rebuild(self) -> None:
+        """Rebuild the filter from the unexpired revoked tokens, streamed from the table."""
+        now = datetime.now(timezone.utc)
+        revoked = (RefreshToken.revoked_at.is_not(None), RefreshToken.expires_at > now)
+        self._added_while_rebuilding = []
+        try:
+            async with self.engine.connect() as conn:
+                expected = await conn.scalar(select(func.count()).select_from(RefreshToken).where(*revoked))
+                bloom = BloomFilter.sized_for(expected, self.error_rate)
+                result = await conn.stream(select(RefreshToken.jti).where(*revoked).execution_options(yield_per=1000))
+                async for jti in result.scalars():
+                    bloom.add(jti)
+            # revocations published while we were reading may not be in what we read
+            bloom.update(self._added_while_rebuilding)
+            self._filter = bloom
+            self.metrics.rebuilds += 1
+        finally:
+            self._added_while_rebuilding = None
+
+    async def purge_expired(self) -> None:
+        async with self.engine.begin() as conn:
+            await conn.execute(delete(RefreshToken).where(RefreshToken.expires_at <= datetime.now(timezone.utc)))
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            self._wake.clear()
+            try:
+                await self.purge_expired()
+                await self.rebuild()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Rebuilding the revoked refresh token filter failed, retrying in %.0fs", self.rebuild_seconds)
+
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.rebuild_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+    def stats(self) -> dict:
+        return {
+            "filter": self._filter.stats() if self._filter is not None else None,
+            **self.metrics.as_dict(),
+        }
+
+
+refresh_token_store = RefreshTokenStore(
+    engine,
+    rebuild_seconds=settings.REFRESH_TOKEN_FILTER_REBUILD_SECONDS,
+    error_rate=settings.REFRESH_TOKEN_FILTER_ERROR_RATE,
+)
+invalidation_bus.subscribe(refresh_token_store._evict, refresh_token_store._flush)
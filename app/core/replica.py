@@ -0,0 +1,122 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from itertools import count
+from typing import Optional
+
+from fastapi import Request, Response
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Set after a successful write so the same client keeps reading from the primary
+# until its write has had time to reach the replicas.
+read_your_writes_cookie_key = "cramquest_rw_until"
+
+_REPLICA_LAG_QUERY = text(
+    """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+    """
+)
+
+
+@dataclass
+class Replica:
+    engine: AsyncEngine
+    session_maker: sessionmaker
+    lag_seconds: Optional[float] = None
+    checked_at: float = 0.0
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+    @property
+    def name(self) -> str:
+        return self.engine.url.host or str(self.engine.url)
+
+
+class ReplicaRouter:
+    """Picks a session factory for read-only work.
+
+    Replicas are used round-robin. Each one's replication lag is re-checked at most
+    once per ``check_interval`` seconds; replicas that are too far behind (or that
+    cannot be reached) are skipped, and the primary is used when none qualifies.
+    """
+
+    def __init__(
+        self,
+        primary: sessionmaker,
+        replicas: list[Replica],
+        max_lag_seconds: float,
+        check_interval: float,
+    ):
+        self.primary = primary
+        self.replicas = replicas
+        self.max_lag_seconds = max_lag_seconds
+        self.check_interval = check_interval
+        self._next = count()
+
+    async def pick(self, sticky: bool = False) -> sessionmaker:
+        if sticky or not self.replicas:
+            return self.primary
+
+        start = next(self._next)
+        for offset in range(len(self.replicas)):
+            replica = self.replicas[(start + offset) % len(self.replicas)]
+            if await self._is_fresh(replica):
+                return replica.session_maker
+
+        return self.primary
+
+    async def _is_fresh(self, replica: Replica) -> bool:
+        if time.monotonic() - replica.checked_at >= self.check_interval:
+            async with replica.lock:
+                # another request may have refreshed it while we waited
+                if time.monotonic() - replica.checked_at >= self.check_interval:
+                    await self._check_lag(replica)
+
+        return replica.lag_seconds is not None and replica.lag_seconds <= self.max_lag_seconds
+
+    async def _check_lag(self, replica: Replica) -> None:
+        try:
+            async with replica.engine.connect() as conn:
+                lag = await conn.scalar(_REPLICA_LAG_QUERY)
+            replica.lag_seconds = float(lag or 0)
+        except Exception as e:
+            logger.warning("Replica %s lag check failed: %s", replica.name, e)
+            replica.lag_seconds = None
+        finally:
+            replica.checked_at = time.monotonic()
+
+
+def is_read_your_writes_sticky(request: Request) -> bool:
+    marker = request.cookies.get(read_your_writes_cookie_key)
+    if not marker:
+        return False
+
+    try:
+        return float(marker) > time.time()
+    except ValueError:
+        return False
+
+
+def mark_read_your_writes(response: Response) -> None:
+    window = settings.READ_YOUR_WRITES_SECONDS
+    if window <= 0:
+        return
+
+    response.set_cookie(
+        key=read_your_writes_cookie_key,
+        value=str(int(time.time()) + window),
+        max_age=window,
+        httponly=True,
+        samesite="lax",
+        path="/",
+    )
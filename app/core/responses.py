@@ -0,0 +1,15 @@
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from pydantic_core import to_json
+
+
+class SchemaResponse(JSONResponse):
+    """JSON response for content that is already a (list of) validated schema object(s).
+
+    Serializes straight to bytes with pydantic-core, skipping the response_model
+    re-validation and ``jsonable_encoder`` pass FastAPI otherwise runs on every return.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return to_json(content)
@@ -1,8 +1,11 @@
+import logging
 import bcrypt
 from jose import JWTError, jwt
 from app.core.config import settings
 from fastapi import HTTPException
 
+logger = logging.getLogger(__name__)
+
 class Security:
     @staticmethod
     def hash_string(plain_text: str) -> str:
@@ -16,12 +19,16 @@ class Security:
     
     @staticmethod
     def verify_refresh_token(refresh_token: str) -> str:
+        return Security.verify_refresh_token_payload(refresh_token)["sub"]
+
+    @staticmethod
+    def verify_refresh_token_payload(refresh_token: str) -> dict:
         try:
             payload = jwt.decode(refresh_token, settings.REFRESH_SECRET_KEY, algorithms=[settings.ALGORITHM])
             user_id = payload.get("sub")
             if user_id is None:
                 raise HTTPException(status_code=401, detail="Invalid refresh token")
-            return user_id
+            return payload
         except JWTError:
-            print("JWTError:", JWTError)
+            logger.debug("Rejected refresh token")
             raise HTTPException(status_code=401, detail="Invalid refresh token")
@@ -0,0 +1,114 @@
+import asyncio
+import time
+from dataclasses import dataclass, asdict
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+from fastapi import Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.core.database import LazySession
+from app.core.replica import is_read_your_writes_sticky
+
+
+@dataclass
+class SingleFlightMetrics:
+    executed: int = 0
+    coalesced: int = 0
+    bypassed: int = 0
+
+    def as_dict(self) -> dict:
+        data = asdict(self)
+        total = self.executed + self.coalesced
+        data["coalesced_ratio"] = self.coalesced / total if total else None
+        return data
+
+
+class SingleFlight:
+    """Concurrent identical reads share one in-flight call and its result.
+
+    The first caller for a key runs ``fn`` with a lazy session of its own, from
+    ``session_maker``: the call outlives any single request, so it must not borrow the
+    leader's. Everyone asking for the same key while it runs, or up to ``window``
+    seconds after it finished, gets the same result (or exception) without touching
+    the database. The callers' own lazy sessions are never opened.
+
+    Only read paths use this. ``forget`` drops finished results so that a write is
+    never followed by a coalesced read from before it on this worker; a key of None
+    (see ``flight_key``) runs ``fn`` alone.
+    """
+
+    def __init__(self, window: float = 0.0):
+        self.window = window
+        self.metrics = SingleFlightMetrics()
+        self._flights: dict[Hashable, tuple[asyncio.Task, float]] = {}
+
+    async def do(self, key: Optional[Hashable], fn: Callable[[AsyncSession], Awaitable[Any]], session_maker: sessionmaker) -> Any:
+        if key is None:
+            self.metrics.bypassed += 1
+            return await self._call(fn, session_maker)
+
+        flight = self._flights.get(key)
+        if flight is not None:
+            task, finished_at = flight
+            if not task.done() or time.monotonic() - finished_at <= self.window:
+                self.metrics.coalesced += 1
+                return await asyncio.shield(task)
+
+        self.metrics.executed += 1
+        task = asyncio.ensure_future(self._call(fn, session_maker))
+        self._flights[key] = (task, float("inf"))
+        task.add_done_callback(lambda done: self._finish(key, done))
+        # shielded: a caller going away must not cancel the call the others wait on
+        return await asyncio.shield(task)
+
+    @staticmethod
+    async def _call(fn: Callable[[AsyncSession], Awaitable[Any]], session_maker: sessionmaker) -> Any:
+        session = LazySession(session_maker)
+        try:
+            return await fn(session)
+        finally:
+            await session.release()
+
+    def _finish(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._flights.get(key, (None,))[0] is not task:
+            return
+        if self.window > 0 and not task.cancelled() and task.exception() is None:
+            self._flights[key] = (task, time.monotonic())
+            asyncio.get_running_loop().call_later(self.window, self._expire, key, task)
+        else:
+            del self._flights[key]
+
+    def _expire(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._flights.get(key, (None,))[0] is task:
+            del self._flights[key]
+
+    def forget(self) -> None:
+        """Drop every finished result; calls still in flight keep running for their waiters."""
+        self._flights = {key: flight for key, flight in self._flights.items() if not flight[0].done()}
+
+    def stats(self) -> dict:
+        return {"in_flight": sum(not task.done() for task, _ in self._flights.values()), **self.metrics.as_dict()}
+
+
+def flight_key(request: Request, scope: Hashable) -> Optional[tuple]:
+    """Route, path and query params, and the caller's authorization scope (what it may
+    see, e.g. admin or not: never the caller's id, which would defeat coalescing).
+
+    None for a client inside its read-your-writes window: a flight started elsewhere,
+    maybe on a lagging replica or before its write committed, could answer from
+    before that write, so it reads alone (from the primary).
+    """
+    if is_read_your_writes_sticky(request):
+        return None
+    route = request.scope.get("route")
+    return (
+        getattr(route, "path", None),
+        request.url.path,
+        tuple(sorted(request.query_params.multi_items())),
+        scope,
+    )
+
+
+read_flights = SingleFlight(window=settings.SINGLE_FLIGHT_WINDOW_MS / 1000)
@@ -0,0 +1,78 @@
+import asyncio
+import hashlib
+import json
+import logging
+from pathlib import Path
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+MIGRATIONS_VERSIONS_DIR = PROJECT_ROOT / "migrations" / "versions"
+HEAD_CACHE_FILE = PROJECT_ROOT / ".alembic_head_cache.json"
+
+
+class MigrationsOutOfDate(RuntimeError):
+    def __init__(self, database_revisions: set[str], expected_heads: set[str]):
+        super().__init__(
+            f"Database is at revision(s) {sorted(database_revisions) or 'none'} but the code "
+            f"expects {sorted(expected_heads)}. Run `alembic upgrade head`."
+        )
+
+
+def _versions_fingerprint() -> str:
+    digest = hashlib.sha256()
+    for path in sorted(MIGRATIONS_VERSIONS_DIR.glob("*.py")):
+        stat = path.stat()
+        digest.update(f"{path.name}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+    return digest.hexdigest()
+
+
+def get_alembic_heads() -> set[str]:
+    """Head revision(s) of the migration scripts, cached on disk until a script changes.
+
+    Resolving heads through Alembic imports every migration module, so the result is
+    stored next to the project and reused on later boots.
+    """
+    fingerprint = _versions_fingerprint()
+
+    try:
+        cached = json.loads(HEAD_CACHE_FILE.read_text())
+        if cached.get("fingerprint") == fingerprint:
+            return set(cached["heads"])
+    except (OSError, ValueError, KeyError):
+        pass
+
+    from alembic.config import Config
+    from alembic.script import ScriptDirectory
+
+    config = Config(str(PROJECT_ROOT / "alembic.ini"))
+    config.set_main_option("script_location", str(PROJECT_ROOT / "migrations"))
+    heads = set(ScriptDirectory.from_config(config).get_heads())
+
+    try:
+        HEAD_CACHE_FILE.write_text(json.dumps({"fingerprint": fingerprint, "heads": sorted(heads)}))
+    except OSError as e:
+        logger.warning("Could not write alembic head cache: %s", e)
+
+    return heads
+
+
+async def check_migrations(engine: AsyncEngine) -> None:
+    """Fail fast if the database is not at the Alembic head. Costs one query."""
+    expected_heads, database_revisions = await asyncio.gather(
+        asyncio.to_thread(get_alembic_heads),
+        _read_database_revisions(engine),
+    )
+
+    if database_revisions != expected_heads:
+        raise MigrationsOutOfDate(database_revisions, expected_heads)
+
+
+async def _read_database_revisions(engine: AsyncEngine) -> set[str]:
+    async with engine.connect() as conn:
+        result = await conn.execute(text("SELECT version_num FROM alembic_version"))
+        return {row[0] for row in result}
+
@@ -0,0 +1,78 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import engine
+from app.core.invalidation import invalidation_bus
+from app.models.token_version_model import TokenVersion
+
+logger = logging.getLogger(__name__)
+
+# invalidation key: every worker reloads its copy of the table
+TOKEN_VERSIONS = "token_versions"
+
+
+class TokenVersionCache:
+    """Each worker's copy of the (small) tokenversion table: {user_id: version}.
+
+    Claims tokens carry the version they were issued under; a token whose version
+    is not the user's current one is revoked. The copy is reloaded with one query
+    when it is older than ``max_age`` seconds, or at once after a bump anywhere
+    (through ``invalidation_bus``), so checking a token normally costs no query.
+    """
+
+    def __init__(self, engine, max_age: float):
+        self.engine = engine
+        self.max_age = max_age
+        self._versions: dict[int, int] = {}
+        self._loaded_at = float("-inf")
+        self._lock = asyncio.Lock()
+
+    async def current(self, user_id: int) -> int:
+        if time.monotonic() - self._loaded_at >= self.max_age:
+            await self._reload()
+        return self._versions.get(user_id, 0)
+
+    async def _reload(self) -> None:
+        async with self._lock:
+            if time.monotonic() - self._loaded_at < self.max_age:
+                return  # someone else reloaded it while we waited
+            started_at = time.monotonic()
+            async with self.engine.connect() as conn:
+                rows = (await conn.execute(select(TokenVersion.user_id, TokenVersion.version))).all()
+            self._versions = {row.user_id: row.version for row in rows}
+            self._loaded_at = started_at
+            logger.debug("Loaded token versions", extra={"users": len(self._versions)})
+
+    def flush(self) -> None:
+        self._loaded_at = float("-inf")
+
+    @staticmethod
+    async def bump(session: AsyncSession, user_id: int) -> None:
+        """Revoke every token of ``user_id`` issued so far, once the session commits."""
+        insert = postgresql_insert if session.get_bind().dialect.name == "postgresql" else sqlite_insert
+        now = datetime.now(timezone.utc)
+        statement = insert(TokenVersion).values(user_id=user_id, version=1, updated_at=now)
+        await session.execute(
+            statement.on_conflict_do_update(
+                index_elements=[TokenVersion.user_id],
+                set_={"version": TokenVersion.version + 1, "updated_at": now},
+            )
+        )
+        await invalidation_bus.publish(session, TOKEN_VERSIONS)
+
+
+def _evict(keys: list[str]) -> None:
+    if TOKEN_VERSIONS in keys:
+        token_versions.flush()
+
+
+token_versions = TokenVersionCache(engine, settings.TOKEN_VERSION_MAX_AGE_SECONDS)
+invalidation_bus.subscribe(_evict, token_versions.flush)
@@ -1,43 +1,44 @@
+import asyncio
+import logging
+from typing import Optional
+from sqlmodel import select
+from sqlalchemy import insert, literal
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.schemas.user_schema import UserRead
-from app.schemas.auth_schema import SignUpRequest
+from app.schemas.auth_schema import SignUpRequest, TokenClaims
 from fastapi import HTTPException
 from app.models import User, Player, Profile  # Adjust paths
+from app.models.player_model import PlayerTitle
+from app.models.profile_model import Mood
 
+from app.core.availability import taken_names
+from app.core.invalidation import pending_invalidation_keys
 from app.core.security import Security
+from app.core.token_versions import token_versions
+
+logger = logging.getLogger(__name__)
+
+async def crud_sign_up_user(session: AsyncSession, sign_up_data: SignUpRequest) -> tuple[UserRead, TokenClaims]:
+    # ✅ bcrypt takes ~0.2 s of CPU: hash in a thread so the event loop keeps serving
+    hashed_password = await asyncio.to_thread(Security.hash_string, sign_up_data.password)
 
-async def crud_sign_up_user(session: AsyncSession, sign_up_data: SignUpRequest) -> UserRead:
     try:
-        # Create User
-        new_user = User(
-            username=sign_up_data.username,
-            email=sign_up_data.email,
-            password=Security.hash_string(sign_up_data.password)
-        )
-        session.add(new_user)
-        await session.flush()  # populate new_user.id
-
-        # Create Player
-        new_player = Player(user_id=new_user.id)
-        session.add(new_player)
-        await session.flush()  # populate new_player.id
-
-        # Create Profile
-        new_profile = Profile(player_id=new_player.id, avatar_url=sign_up_data.avatar_url)
-        session.add(new_profile)
-
-        # Finalize
-        await session.commit()
-        await session.refresh(new_user)
+        # ✅ Every worker's availability filter learns the names when the sign-up commits
+        await taken_names.publish_taken(session, sign_up_data.username, sign_up_data.email)
+
+        if session.get_bind().dialect.name == "postgresql":
+            user_id, player_id = await _insert_sign_up_chained(session, sign_up_data, hashed_password)
+        else:
+            user_id, player_id = await _insert_sign_up_returning(session, sign_up_data, hashed_password)
 
-        print("\n\n\n\n\n\n\nSUCESSFULL REGISTRATION\n\n\n\n\n\n\n")
+        logger.info("User registered", extra={"user_id": user_id})
 
         return UserRead(
-            id=new_user.id,
-            username=new_user.username,
-            email=new_user.email
-        )  # or _serialize_user(new_user)
+            id=user_id,
+            username=sign_up_data.username,
+            email=sign_up_data.email
+        ), await _claims(user_id, player_id, False)
 
     except IntegrityError as e:
         await session.rollback()
@@ -45,3 +46,95 @@ async def crud_sign_up_user(session: AsyncSession, sign_up_data: SignUpRequest)
     except Exception as e:
         await session.rollback()
         raise HTTPException(status_code=500, detail=str(e))
+
+def _sign_up_values(sign_up_data: SignUpRequest, hashed_password: str) -> tuple[dict, dict, dict]:
+    """Column values of the new user, player and profile rows (ids aside)."""
+    return (
+        dict(username=sign_up_data.username, email=sign_up_data.email, password=hashed_password),
+        dict(title=PlayerTitle.NOVICE.value),
+        dict(avatar_url=sign_up_data.avatar_url, mood=Mood.NEUTRAL.value),
+    )
+
+def _literals(model, values: dict) -> list:
+    # typed, so asyncpg is told each parameter's type (a bare NULL in a SELECT list has none)
+    return [literal(value, model.__table__.c[name].type) for name, value in values.items()]
+
+async def _insert_sign_up_chained(session: AsyncSession, sign_up_data: SignUpRequest, hashed_password: str) -> tuple[int, int]:
+    """User, player and profile in one statement (Postgres data-modifying CTEs), one round trip.
+
+    A single statement is atomic on its own, so it runs in autocommit: no BEGIN/COMMIT
+    round trips either.
+    """
+    user_values, player_values, profile_values = _sign_up_values(sign_up_data, hashed_password)
+
+    new_user = insert(User).values(**user_values).returning(User.id).cte("u")
+    new_player = (
+        insert(Player)
+        .from_select(["user_id", *player_values], select(new_user.c.id, *_literals(Player, player_values)))
+        .returning(Player.id)
+        .cte("p")
+    )
+    new_profile = (
+        insert(Profile)
+        .from_select(["player_id", *profile_values], select(new_player.c.id, *_literals(Profile, profile_values)))
+        .returning(Profile.id)
+        .cte("pr")
+    )
+    statement = select(new_user.c.id, new_player.c.id).select_from(new_user, new_player, new_profile)
+
+    if session.in_transaction():
+        row = (await session.execute(statement)).one()
+        await session.commit()
+    else:
+        connection = await session.connection(execution_options={"isolation_level": "AUTOCOMMIT"})
+        row = (await connection.execute(statement)).one()
+        if pending_invalidation_keys(session):
+            await session.commit()  # nothing left to commit: runs the hooks sending the invalidations
+    return row[0], row[1]
+
+async def _insert_sign_up_returning(session: AsyncSession, sign_up_data: SignUpRequest, hashed_password: str) -> tuple[int, int]:
+    """Where INSERTs cannot be chained in one statement: three INSERT ... RETURNING, one commit."""
+    user_values, player_values, profile_values = _sign_up_values(sign_up_data, hashed_password)
+
+    user_id = await session.scalar(insert(User).values(**user_values).returning(User.id))
+    player_id = await session.scalar(insert(Player).values(user_id=user_id, **player_values).returning(Player.id))
+    await session.execute(insert(Profile).values(player_id=player_id, **profile_values))
+    await session.commit()
+    return user_id, player_id
+
+async def crud_read_sign_in_user(session: AsyncSession, username: str) -> tuple[Optional[User], Optional[TokenClaims]]:
+    """The user signing in (for its password hash) and the claims its tokens carry, in one query."""
+    result = await session.execute(
+        select(User, Player.id)
+        .outerjoin(Player, Player.user_id == User.id)
+        .where(User.username == username, User.deleted_at.is_(None))
+    )
+    row = result.first()
+
+    if not row:
+        return None, None
+
+    user, player_id = row
+    return user, await _claims(user.id, player_id, user.is_admin)
+
+async def crud_read_token_claims(session: AsyncSession, user_id: int) -> Optional[TokenClaims]:
+    """Claims for a new access token (refresh, sub-only tokens); None once the user is deleted."""
+    result = await session.execute(
+        select(User.id, User.is_admin, Player.id.label("player_id"))
+        .outerjoin(Player, Player.user_id == User.id)
+        .where(User.id == user_id, User.deleted_at.is_(None))
+    )
+    row = result.first()
+
+    if not row:
+        return None
+
+    return await _claims(row.id, row.player_id, row.is_admin)
+
+async def _claims(user_id: int, player_id: Optional[int], is_admin: bool) -> TokenClaims:
+    return TokenClaims(
+        id=user_id,
+        player_id=player_id,
+        is_admin=is_admin,
+        token_version=await token_versions.current(user_id),
+    )
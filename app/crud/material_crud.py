@@ -2,9 +2,17 @@ from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
 from sqlmodel import select
+from typing import Optional
 
-from app.models import Material
+from app.models import Material, Subject
 from app.schemas.material_schema import MaterialCreate, MaterialUpdate, MaterialRead
+from app.crud.projection import read_columns, rows_to_schema
+from app.core.fieldsets import Fieldset
+from app.services.search_service import SearchService
+from app.schemas.search_schema import SearchEntityType
+from app.core.config import settings
+from app.core.cache import cached_read, ReadCache, SUBJECT_MATERIALS
+from app.core.invalidation import invalidation_bus
 
 
 class MaterialNotFound(HTTPException):
@@ -24,6 +32,9 @@ async def crud_create_material(
 
     try:
         session.add(material)
+        await session.flush()
+        await SearchService.index_material(session, material)
+        await invalidation_bus.publish(session, ReadCache.key(SUBJECT_MATERIALS, subject_id))
         await session.commit()
         await session.refresh(material)
         return _serialize_material(material)
@@ -34,23 +45,36 @@ async def crud_create_material(
 
 
 async def crud_read_material(
-    session: AsyncSession, material_id: int, subject_id: int
+    session: AsyncSession, material_id: int, subject_id: int, fieldset: Optional[Fieldset] = None
 ) -> MaterialRead:
-    material = await _get_material_or_404(session, material_id)
+    fieldset = fieldset or Fieldset(MaterialRead)
+    result = await session.execute(
+        select(*fieldset.columns(Material, always=("id", "subject_id")))
+        .join(Subject, Subject.id == Material.subject_id)
+        .where(Material.id == material_id, Subject.deleted_at.is_(None))
+    )
+    row = result.first()
 
-    if material.subject_id != subject_id:
+    if not row:
+        raise MaterialNotFound(material_id)
+
+    if row.subject_id != subject_id:
         raise HTTPException(status_code=404, detail="Material does not belong to this subject")
 
-    return _serialize_material(material)
+    return fieldset.dump(row)
 
 
+@cached_read(SUBJECT_MATERIALS, ttl=settings.CACHE_MATERIAL_LIST_TTL_SECONDS)
 async def crud_read_all_subject_materials(
     session: AsyncSession, subject_id: int
 ) -> list[MaterialRead]:
-    result = await session.scalars(select(Material).where(Material.subject_id == subject_id))
-    materials = result.all()
+    result = await session.execute(
+        select(*read_columns(Material, MaterialRead))
+        .join(Subject, Subject.id == Material.subject_id)
+        .where(Material.subject_id == subject_id, Subject.deleted_at.is_(None))
+    )
 
-    return [_serialize_material(m) for m in materials]
+    return rows_to_schema(MaterialRead, result)
 
 
 async def crud_update_material(
@@ -65,6 +89,8 @@ async def crud_update_material(
         setattr(material, field, value)
 
     try:
+        await SearchService.index_material(session, material)
+        await invalidation_bus.publish(session, ReadCache.key(SUBJECT_MATERIALS, subject_id))
         await session.commit()
         await session.refresh(material)
         return _serialize_material(material)
@@ -81,6 +107,8 @@ async def crud_delete_material(session: AsyncSession, subject_id: int, material_
         raise HTTPException(status_code=403, detail="Material does not belong to the specified subject")
 
     try:
+        await SearchService.remove(session, SearchEntityType.MATERIAL, material.id)
+        await invalidation_bus.publish(session, ReadCache.key(SUBJECT_MATERIALS, subject_id))
         await session.delete(material)
         await session.commit()
         return _serialize_material(material)
@@ -93,7 +121,11 @@ async def crud_delete_material(session: AsyncSession, subject_id: int, material_
         raise HTTPException(status_code=500, detail=str(e))
 
 async def _get_material_or_404(session: AsyncSession, material_id: int) -> Material:
-    result = await session.scalar(select(Material).where(Material.id == material_id))
+    result = await session.scalar(
+        select(Material)
+        .join(Subject, Subject.id == Material.subject_id)
+        .where(Material.id == material_id, Subject.deleted_at.is_(None))
+    )
     if not result:
         raise MaterialNotFound(material_id)
     return result
@@ -1,9 +1,10 @@
+import logging
 from sqlmodel import select
 from typing import List
 from fastapi import HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models import Player, User, Profile
+from app.models import Player, User, Profile, Subject
 
 from app.schemas.player_schema import PlayerRead, PlayerCreate
 from app.schemas.subject_schema import SubjectRead
@@ -17,6 +18,12 @@ from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from app.exceptions.player_exceptions import PlayerNotFound, NoPlayersFound, PlayerAlreadyExist
 from app.exceptions.profile_exceptions import ProfileNotFound
 
+from app.crud.projection import read_columns, row_to_schema, rows_to_schema
+from app.core.config import settings
+from app.core.cache import cached_read, PLAYER
+
+logger = logging.getLogger(__name__)
+
 
 async def crud_create_player(session: AsyncSession, user_id: int, player_create: PlayerCreate) -> PlayerRead:
     """Create a Player associated with a User, ensuring 1:1 relationship."""
@@ -47,83 +54,63 @@ async def crud_create_player(session: AsyncSession, user_id: int, player_create:
         await session.rollback()
         raise RuntimeError(f"Unexpected error while creating Player: {str(e)}")
     
+@cached_read(PLAYER, ttl=settings.CACHE_PLAYER_TTL_SECONDS)
 async def crud_read_player_with_user(session: AsyncSession, player_id: int) -> PlayerRead:
     """Fetch a player along with their associated user data."""
-    player = await _get_player_or_error(session, player_id)
-    return _serialize_player(player)
+    result = await session.execute(
+        select(*read_columns(Player, PlayerRead))
+        .join(User, User.id == Player.user_id)
+        .where(Player.id == player_id, User.deleted_at.is_(None))
+    )
+    row = result.first()
+
+    if not row:
+        raise PlayerNotFound(player_id)
+
+    return row_to_schema(PlayerRead, row)
 
 async def crud_read_all_players_with_users(session: AsyncSession) -> List[PlayerRead]:
     """Fetch all players along with their associated user data."""
-    statement = (
-        select(Player)
-        .options(joinedload(Player.user))  
+    result = await session.execute(
+        select(*read_columns(Player, PlayerRead))
+        .join(User, User.id == Player.user_id)
+        .where(User.deleted_at.is_(None))  # ✅ Soft-deleted users' players wait for the purger, unseen
     )
-    players = await session.execute(statement) 
-    players = players.scalars().all()  # Returns a list of tuples (User, Player)
+    players = rows_to_schema(PlayerRead, result)
 
     if not players:
         raise NoPlayersFound
-    
-    players_with_users = [_serialize_player(player) for player in players]
 
-    return players_with_users  # Return List[PlayerRead]
+    return players
 
 async def crud_read_all_player_subjects(session: AsyncSession, player_id: int) -> List[SubjectRead]:
-    print(f"Fetching subjects for player_id: {player_id}")
-    player: Player = await _get_player_with_subject_or_error(session, player_id)
-
-    return [
-        SubjectRead(
-            id=subject.id,
-            player_id=subject.player.id,
-            code_name=subject.code_name,
-            description=subject.description,
-            difficulty=subject.difficulty
-        )
-        for subject in player.subjects
-    ]   
-
-async def crud_read_player_profile(session: AsyncSession, player_id: int) -> ProfileRead:
-    statement = select(Profile).where(Profile.player_id == player_id)
-    result = await session.execute(statement)
-    profile = result.scalars().first()
-    
-    if not profile:
-        raise ProfileNotFound(-1)
-    
-    return profile
-
+    logger.debug("Fetching subjects", extra={"player_id": player_id})
 
-async def _get_player_or_error(session: AsyncSession, player_id: int) -> Player:
+    # ✅ Outer join so an existing player without subjects still returns one row
     statement = (
-        select(Player)
-        .where(Player.id == player_id)
+        select(*read_columns(Subject, SubjectRead, exclude=["player_id"]), Player.id.label("player_id"))
+        .select_from(Player)
+        .join(User, User.id == Player.user_id)
+        .outerjoin(Subject, (Subject.player_id == Player.id) & Subject.deleted_at.is_(None))
+        .where(Player.id == player_id, User.deleted_at.is_(None))
     )
-    
-    result = await session.execute(statement)
+    rows = (await session.execute(statement)).all()
 
-    player = result.scalar_one_or_none()
-
-    if not player:
+    if not rows:
         raise PlayerNotFound(player_id)
 
-    return player
-
-
-
-async def _get_player_with_subject_or_error(session: AsyncSession, player_id: int) -> Player:
-    statement = (
-        select(Player)
-        .where(Player.id == player_id)
-        .options(selectinload(Player.subjects))
-    )
+    return rows_to_schema(SubjectRead, (row for row in rows if row.id is not None))
 
-    player = await session.scalar(statement)
-
-    if not player:
-        raise PlayerNotFound(player_id)
+async def crud_read_player_profile(session: AsyncSession, player_id: int) -> ProfileRead:
+    statement = select(*read_columns(Profile, ProfileRead)).where(Profile.player_id == player_id)
+    result = await session.execute(statement)
+    row = result.first()
     
-    return player
+    if not row:
+        raise ProfileNotFound(-1)
+    
+    return row_to_schema(ProfileRead, row)
+
 
 async def _get_user_and_player_or_error(session: AsyncSession, user_id: int) -> tuple[User, Player]:
     statement = (
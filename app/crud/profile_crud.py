@@ -9,6 +9,7 @@ from sqlalchemy.exc import SQLAlchemyError
 
 from app.exceptions.player_exceptions import PlayerNotFound
 from app.exceptions.profile_exceptions import ProfileNotFound, ProfileAlreadyExist
+from app.crud.projection import read_columns, row_to_schema, rows_to_schema
 
 
 async def crud_create_profile(session: AsyncSession, player_id: int, profile_create: ProfileCreate) -> ProfileRead:
@@ -37,24 +38,24 @@ async def crud_create_profile(session: AsyncSession, player_id: int, profile_cre
         raise RuntimeError(f"Unexpected error while creating Profile: {str(e)}")
 
 async def crud_read_profile(session: AsyncSession, profile_id: int) -> ProfileRead:
-    profile = await _get_profile_or_error(session, profile_id)
-    return _serialize_profile(profile)
-
-async def crud_read_all_profiles(session: AsyncSession) -> list[ProfileRead]:
-    statement = (
-        select(Profile)
-        .options(joinedload(Profile.player))
+    result = await session.execute(
+        select(*read_columns(Profile, ProfileRead)).where(Profile.id == profile_id)
     )
+    row = result.first()
 
-    result = await session.execute(statement)
-    profiles = result.scalars().all()
+    if not row:
+        raise ProfileNotFound(profile_id)
+
+    return row_to_schema(ProfileRead, row)
+
+async def crud_read_all_profiles(session: AsyncSession) -> list[ProfileRead]:
+    result = await session.execute(select(*read_columns(Profile, ProfileRead)))
+    profiles = rows_to_schema(ProfileRead, result)
 
     if not profiles:
         raise HTTPException(status_code=404, detail="No profiles found")
 
-    profiles_with_users = [_serialize_profile(profile) for profile in profiles]
-
-    return profiles_with_users
+    return profiles
 
 async def crud_update_profile(session: AsyncSession, profile_id: int, profile_update: ProfileUpdate) -> ProfileRead:
     """Update a Profile while allowing partial updates."""
@@ -0,0 +1,24 @@
+from typing import Iterable, TypeVar
+
+from pydantic import BaseModel
+from sqlalchemy.engine import Row
+
+SchemaT = TypeVar("SchemaT", bound=BaseModel)
+
+
+def read_columns(model, schema: type[BaseModel], exclude: Iterable[str] = ()) -> list:
+    """The columns of ``model`` that ``schema`` serializes, in schema field order.
+
+    Selecting these instead of the entity skips ORM hydration and identity-map
+    bookkeeping entirely: the query returns plain ``Row`` tuples.
+    """
+    excluded = set(exclude)
+    return [getattr(model, name).label(name) for name in schema.model_fields if name not in excluded]
+
+
+def row_to_schema(schema: type[SchemaT], row: Row, **extra) -> SchemaT:
+    return schema.model_validate({**row._mapping, **extra})
+
+
+def rows_to_schema(schema: type[SchemaT], rows: Iterable[Row]) -> list[SchemaT]:
+    return [schema.model_validate(row._mapping) for row in rows]
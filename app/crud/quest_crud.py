@@ -1,12 +1,21 @@
+import logging
 from sqlmodel import select, and_, exists
 from fastapi import HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models import Quest, Subject
 from app.schemas.quest_schema import QuestRead, QuestCreate, QuestUpdate, QuestStatus
 from app.crud.subject_crud import SubjectNotFound
+from sqlalchemy import lambda_stmt
 from sqlalchemy.orm import joinedload, selectinload
 from sqlalchemy.exc import SQLAlchemyError
 from typing import Optional
+from app.core.fieldsets import Fieldset
+from app.services.search_service import SearchService
+from app.schemas.search_schema import SearchEntityType
+from app.core.cache import ReadCache, SUBJECT_QUESTS
+from app.core.invalidation import invalidation_bus
+
+logger = logging.getLogger(__name__)
 
 class QuestNotFound(HTTPException):
     def __init__(self, quest_id: int):
@@ -25,7 +34,7 @@ async def crud_create_quest(session: AsyncSession, new_quest: QuestCreate) -> Qu
     """ Create a new quest with validation """
     # Check for existing quest
 
-    print("Creating new quest...", new_quest)
+    logger.debug("Creating quest", extra={"subject_id": new_quest.subject_id})
     
     await _validate_new_quest(session, new_quest)
     
@@ -38,6 +47,9 @@ async def crud_create_quest(session: AsyncSession, new_quest: QuestCreate) -> Qu
 
     try:
         session.add(quest)
+        await session.flush()
+        await SearchService.index_quest(session, quest)
+        await invalidation_bus.publish(session, ReadCache.key(SUBJECT_QUESTS, quest.subject_id))
         await session.commit()
         await session.refresh(quest)
         
@@ -88,6 +100,9 @@ async def crud_update_quest(session: AsyncSession, quest_id: int, updated_quest:
         for key, value in updated_data.items():
             setattr(quest_to_update, key, value)
 
+        if "description" in updated_data:
+            await SearchService.index_quest(session, quest_to_update)
+        await invalidation_bus.publish(session, ReadCache.key(SUBJECT_QUESTS, quest_to_update.subject_id))
         await session.commit()
         await session.refresh(quest_to_update)
 
@@ -106,23 +121,36 @@ async def crud_update_quest(session: AsyncSession, quest_id: int, updated_quest:
             detail=f"Failed to update quest: {str(e)}"
         )
     
-async def crud_read_quest(session: AsyncSession, quest_id: int) -> QuestRead:
-    quest = await _get_quest_or_error(session, quest_id)
-    return _serialize_quest(quest)
-
-async def crud_read_all_quests(session: AsyncSession) -> list[QuestRead]:
-    result = await session.scalars(
-        select(Quest)
+async def crud_read_quest(session: AsyncSession, quest_id: int, fieldset: Optional[Fieldset] = None) -> QuestRead:
+    fieldset = fieldset or Fieldset(QuestRead)
+    result = await session.execute(
+        select(*fieldset.columns(Quest))
+        .join(Subject, Subject.id == Quest.subject_id)
+        .where(Quest.id == quest_id, Subject.deleted_at.is_(None))
     )
+    row = result.first()
 
-    quests = result.all()
+    if not row:
+        raise QuestNotFound(quest_id)
 
-    return [_serialize_quest(quest) for quest in quests]
+    return fieldset.dump(row)
+
+async def crud_read_all_quests(session: AsyncSession, fieldset: Optional[Fieldset] = None) -> list[QuestRead]:
+    fieldset = fieldset or Fieldset(QuestRead)
+    result = await session.execute(
+        select(*fieldset.columns(Quest))
+        .join(Subject, Subject.id == Quest.subject_id)
+        .where(Subject.deleted_at.is_(None))
+    )
+
+    return fieldset.dump_all(result)
 
 async def crud_delete_quest(session: AsyncSession, quest_id: int) -> None:
     quest = await _get_quest_or_error(session, quest_id)
 
     try:
+        await SearchService.remove(session, SearchEntityType.QUEST, quest.id)
+        await invalidation_bus.publish(session, ReadCache.key(SUBJECT_QUESTS, quest.subject_id))
         await session.delete(quest)
         await session.commit()
         return _serialize_quest(quest)
@@ -141,15 +169,20 @@ async def crud_delete_quest(session: AsyncSession, quest_id: int) -> None:
 
 
 async def _validate_new_quest(session: AsyncSession, new_quest: QuestCreate) -> None:
+    subject_id = new_quest.subject_id
+    description = new_quest.description
+
     result = await session.execute(
-        select(
-            exists()
-            .where(and_(
-                Quest.subject_id == new_quest.subject_id,
-                Quest.description == new_quest.description
-            )).label("quest_exists"),
-            exists()
-            .where(Subject.id == new_quest.subject_id).label("subject_exists")
+        lambda_stmt(
+            lambda: select(
+                exists()
+                .where(and_(
+                    Quest.subject_id == subject_id,
+                    Quest.description == description
+                )).label("quest_exists"),
+                exists()
+                .where(Subject.id == subject_id, Subject.deleted_at.is_(None)).label("subject_exists")
+            )
         )
     )
     
@@ -166,8 +199,11 @@ async def _validate_new_quest(session: AsyncSession, new_quest: QuestCreate) ->
 
 async def _get_quest_or_error(session: AsyncSession, quest_id: int) -> Quest:
     quest = await session.scalar(
-        select(Quest)
-        .where(Quest.id == quest_id)
+        lambda_stmt(
+            lambda: select(Quest)
+            .join(Subject, Subject.id == Quest.subject_id)
+            .where(Quest.id == quest_id, Subject.deleted_at.is_(None))
+        )
     )
 
     if not quest:
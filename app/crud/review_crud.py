@@ -0,0 +1,53 @@
+from datetime import datetime, timezone
+from typing import Optional
+from sqlmodel import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import QuestReview, Quest, StudySession, Subject
+from app.schemas.review_schema import QuestReviewRead
+from app.services.review_service import ReviewService
+from app.crud.projection import read_columns, rows_to_schema
+
+
+async def crud_schedule_quest_review(
+    session: AsyncSession, study_session: StudySession, quality: int, reviewed_at: datetime
+) -> QuestReview:
+    """Record a review of the session's quest. Joins the caller's transaction, does not commit."""
+
+    review = await session.scalar(
+        select(QuestReview).where(QuestReview.quest_id == study_session.quest_id)
+    )
+
+    if review is None:
+        review = QuestReview(quest_id=study_session.quest_id, player_id=study_session.player_id)
+        session.add(review)
+
+    return ReviewService.schedule(review, quality, reviewed_at)
+
+
+async def crud_read_due_reviews(
+    session: AsyncSession, player_id: int, limit: int, due_before: Optional[datetime] = None
+) -> list[QuestReviewRead]:
+    """The player's next ``limit`` reviews due by ``due_before`` (default: now), soonest first."""
+
+    due_before = due_before or datetime.now(timezone.utc)
+
+    # ✅ (player_id, due_at) index: seek to the player, read in due_at order, stop after `limit`
+    result = await session.execute(
+        select(
+            *read_columns(QuestReview, QuestReviewRead, exclude=["subject_id", "description"]),
+            Quest.subject_id.label("subject_id"),
+            Quest.description.label("description"),
+        )
+        .join(Quest, Quest.id == QuestReview.quest_id)
+        .join(Subject, Subject.id == Quest.subject_id)
+        .where(
+            QuestReview.player_id == player_id,
+            QuestReview.due_at <= due_before,
+            Subject.deleted_at.is_(None),  # ✅ Soft-deleted subjects wait for the purger, unseen
+        )
+        .order_by(QuestReview.due_at)
+        .limit(limit)
+    )
+
+    return rows_to_schema(QuestReviewRead, result)
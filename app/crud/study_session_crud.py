@@ -1,8 +1,10 @@
+import logging
 from typing import Optional
 from sqlmodel import select, exists, and_, delete
+from sqlalchemy import lambda_stmt
 from sqlalchemy.orm import selectinload
 from fastapi import HTTPException, status
-from app.models import StudySession, Player, Subject, Quest, Task
+from app.models import StudySession, Player, Subject, Quest, Task, User
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.quest_model import QuestStatus
 from app.models.study_session_model import SessionStatus
@@ -14,9 +16,17 @@ from app.schemas.study_session_schema import (
 )
 from app.schemas.task_schema import TaskRead
 from app.services.game_service import GameService
+from app.services.review_service import ReviewService
+from app.crud.review_crud import crud_schedule_quest_review
+from app.core.cache import ReadCache, SUBJECT_QUESTS
+from app.core.invalidation import invalidation_bus
 from datetime import datetime, timezone, timedelta
 
 from app.exceptions.player_exceptions import PlayerNotFound
+from app.crud.projection import read_columns, rows_to_schema
+from app.core.fieldsets import Fieldset
+
+logger = logging.getLogger(__name__)
 
 
 class StudySessionStillActive(HTTPException):
@@ -103,18 +113,45 @@ async def crud_create_study_session(
 
 
 async def crud_read_study_session(
-    session: AsyncSession, study_session_id: int
+    session: AsyncSession, study_session_id: int, fieldset: Optional[Fieldset] = None
 ) -> StudySessionRead:
-    study_session = await _get_study_session_or_error(session, study_session_id)
-    return _serialize_study_session(study_session)
+    study_sessions = await _read_study_sessions(session, StudySession.id == study_session_id, fieldset=fieldset)
+
+    if not study_sessions:
+        raise StudySessionNotFound(study_session_id)
+
+    return study_sessions[0]
+
+
+async def crud_read_all_study_sessions(session: AsyncSession, fieldset: Optional[Fieldset] = None) -> list[StudySessionRead]:
+    return await _read_study_sessions(session, fieldset=fieldset)
+
 
+async def _read_study_sessions(session: AsyncSession, *criteria, fieldset: Optional[Fieldset] = None) -> list[StudySessionRead]:
+    """Projection read of study sessions plus their tasks: two queries, no ORM entities.
 
-async def crud_read_all_study_sessions(session: AsyncSession) -> list[StudySessionRead]:
-    result = await session.scalars(
-        select(StudySession).options(selectinload(StudySession.tasks))
+    Only the requested columns are selected, and the tasks query is skipped
+    entirely when the fieldset does not include them.
+    """
+    fieldset = fieldset or Fieldset(StudySessionRead)
+    result = await session.execute(select(*fieldset.columns(StudySession)).where(*criteria))
+    rows = result.all()
+
+    if not rows:
+        return []
+
+    if not fieldset.includes("tasks"):
+        return fieldset.dump_all(rows)
+
+    tasks_by_session: dict[int, list[TaskRead]] = {row.id: [] for row in rows}
+    task_rows = await session.execute(
+        select(*read_columns(Task, TaskRead))
+        .where(Task.study_session_id.in_(select(StudySession.id).where(*criteria)))
     )
-    study_sessions = result.all()
-    return [_serialize_study_session(study_session) for study_session in study_sessions]
+    for task in rows_to_schema(TaskRead, task_rows):
+        tasks_by_session[task.study_session_id].append(task)
+
+    return [fieldset.dump(row, tasks=tasks_by_session[row.id]) for row in rows]
 
 
 async def crud_end_study_session(
@@ -161,16 +198,25 @@ async def crud_end_study_session(
             session_status,
         )
 
-        print("\n\n\n\n\n\nxp_earned:", xp_earned, "\n\n\n\n\n\n")
+        logger.debug("Study session scored", extra={"study_session_id": study_session.id, "xp_earned": xp_earned})
 
         # ✅ set the quest status to completed
         study_session.quest.status = QuestStatus.COMPLETED
 
         # ✅ End the study session
+        completed_at = datetime.now(timezone.utc)
         study_session.status = session_status
-        study_session.actual_complete_time = datetime.now(timezone.utc)
+        study_session.actual_complete_time = completed_at
         study_session.xp_earned = xp_earned
 
+        # ✅ Schedule the quest's next review from the session outcome
+        end_time = study_session.end_time
+        if end_time.tzinfo is None:
+            end_time = end_time.replace(tzinfo=timezone.utc)
+        quality = ReviewService.quality_from_session(session_status, completion_rate, completed_at < end_time)
+        await crud_schedule_quest_review(session, study_session, quality, completed_at)
+
+        await invalidation_bus.publish(session, ReadCache.key(SUBJECT_QUESTS, study_session.quest.subject_id))
         await session.commit()  # Commit all changes in **one transaction**
 
         return _serialize_study_session(study_session)
@@ -188,9 +234,11 @@ async def _get_study_session_or_error(
 ) -> StudySession:
     """Helper function to retrieve a StudySession or raise 404 error."""
     study_session = await session.scalar(
-        select(StudySession)
-        .where(StudySession.id == study_session_id)
-        .options(selectinload(StudySession.tasks), selectinload(StudySession.quest))
+        lambda_stmt(
+            lambda: select(StudySession)
+            .where(StudySession.id == study_session_id)
+            .options(selectinload(StudySession.tasks), selectinload(StudySession.quest))
+        )
     )
 
     if study_session is None:
@@ -219,27 +267,34 @@ async def _validate_new_study_session(
             status_code=status.HTTP_400_BAD_REQUEST, detail="No tasks selected"
         )
 
-    statement = select(
-        exists().where(Player.id == new_study_session.player_id).label("player_exists"),
-        exists()
-        .where(Subject.id == new_study_session.subject_id)
-        .label("subject_exists"),
-        exists()
-        .where(
-            and_(
-                Subject.id == new_study_session.subject_id,
-                Subject.player_id == new_study_session.player_id,
+    player_id = new_study_session.player_id
+    subject_id = new_study_session.subject_id
+
+    statement = lambda_stmt(
+        lambda: select(
+            exists()
+            .where(Player.id == player_id, User.id == Player.user_id, User.deleted_at.is_(None))
+            .label("player_exists"),
+            exists()
+            .where(Subject.id == subject_id, Subject.deleted_at.is_(None))
+            .label("subject_exists"),
+            exists()
+            .where(
+                and_(
+                    Subject.id == subject_id,
+                    Subject.player_id == player_id,
+                )
             )
-        )
-        .label("subject_belongs_to_player"),
-        exists()
-        .where(
-            and_(
-                StudySession.player_id == new_study_session.player_id,
-                StudySession.status == SessionStatus.ACTIVE,
+            .label("subject_belongs_to_player"),
+            exists()
+            .where(
+                and_(
+                    StudySession.player_id == player_id,
+                    StudySession.status == SessionStatus.ACTIVE,
+                )
             )
+            .label("has_active_session"),
         )
-        .label("has_active_session"),
     )
 
     results = await session.execute(statement)
@@ -1,6 +1,8 @@
+import logging
 from fastapi import HTTPException, status
 from sqlmodel import select, exists
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import lambda_stmt
 from sqlalchemy.exc import SQLAlchemyError
 from app.models import Player, Subject, Quest, Material
 
@@ -8,6 +10,15 @@ from app.schemas.subject_schema import SubjectRead, SubjectCreate, SubjectUpdate
 from app.schemas.quest_schema import QuestRead
 
 from app.exceptions.player_exceptions import PlayerNotFound
+from app.crud.projection import read_columns, row_to_schema, rows_to_schema
+from app.services.search_service import SearchService
+from app.core.config import settings
+from app.core.cache import read_cache, cached_read, ReadCache, SUBJECT, SUBJECT_QUESTS, SUBJECT_MATERIALS
+from app.core.invalidation import invalidation_bus
+from app.schemas.deletion_schema import DeleteMode
+from app.services.deletion_service import DeletionService, deletion_purger
+
+logger = logging.getLogger(__name__)
 
 class SubjectNotFound(HTTPException):
     def __init__(self, subject_id: int):
@@ -23,8 +34,7 @@ class SubjectNotBelongsToPlayer(HTTPException):
 
 
 async def crud_create_subject(session: AsyncSession, player_id: int, new_subject: SubjectCreate) -> SubjectRead:
-    print(f"Creating subject for player_id: {player_id}")
-    print(f"New subject: {new_subject}")
+    logger.debug("Creating subject", extra={"player_id": player_id, "code_name": new_subject.code_name})
     await _validate_new_subject(session, player_id, new_subject)
     
     subject = Subject(
@@ -37,6 +47,8 @@ async def crud_create_subject(session: AsyncSession, player_id: int, new_subject
     try:
         
         session.add(subject)
+        await session.flush()
+        await SearchService.index_subject(session, subject)
         await session.commit()
         await session.refresh(subject)
 
@@ -49,9 +61,17 @@ async def crud_create_subject(session: AsyncSession, player_id: int, new_subject
         await session.rollback()
         raise HTTPException(status_code=500, detail=str(e))
     
+@cached_read(SUBJECT, ttl=settings.CACHE_SUBJECT_TTL_SECONDS)
 async def crud_read_subject(session: AsyncSession, subject_id: int) -> SubjectRead:
-    subject = await _get_subject_or_404(session, subject_id)
-    return _serialize_subject(subject)
+    result = await session.execute(
+        select(*read_columns(Subject, SubjectRead)).where(Subject.id == subject_id, Subject.deleted_at.is_(None))
+    )
+    row = result.first()
+
+    if not row:
+        raise SubjectNotFound(subject_id)
+
+    return row_to_schema(SubjectRead, row)
 
 async def crud_update_subject(session: AsyncSession, subject_id: int, updated_subject: SubjectUpdate) -> SubjectRead:
     
@@ -75,10 +95,15 @@ async def crud_update_subject(session: AsyncSession, subject_id: int, updated_su
         for key, value in updated_data.items():
             setattr(subject, key, value)
 
+        if "code_name" in updated_data or "description" in updated_data:
+            await SearchService.index_subject(session, subject)
+        await invalidation_bus.publish(session, ReadCache.key(SUBJECT, subject.id))
         await session.commit()
         await session.refresh(subject)
 
-        return _serialize_subject(subject)
+        subject_read = _serialize_subject(subject)
+        await read_cache.set(ReadCache.key(SUBJECT, subject.id), subject_read)  # ✅ write-through
+        return subject_read
     
     except SQLAlchemyError as e:
         await session.rollback()
@@ -87,13 +112,16 @@ async def crud_update_subject(session: AsyncSession, subject_id: int, updated_su
         await session.rollback()
         raise HTTPException(status_code=500, detail=str(e))
     
-async def crud_delete_subject(session: AsyncSession, subject_id: int) -> SubjectRead:
+async def crud_delete_subject(session: AsyncSession, subject_id: int, mode: DeleteMode = DeleteMode.AUTO) -> SubjectRead:
     subject = await _get_subject_or_404(session, subject_id)
 
     try:
-        await session.delete(subject)
+        mode = await DeletionService.delete_subject(session, subject, mode)
         await session.commit()
 
+        if mode == DeleteMode.SOFT:
+            deletion_purger.wake()
+
         return _serialize_subject(subject)
     
     except SQLAlchemyError as e:
@@ -103,32 +131,27 @@ async def crud_delete_subject(session: AsyncSession, subject_id: int) -> Subject
         await session.rollback()
         raise HTTPException(status_code=500, detail=str(e))
     
+@cached_read(SUBJECT_QUESTS, ttl=settings.CACHE_QUEST_LIST_TTL_SECONDS)
 async def crud_read_subject_all_quests(session: AsyncSession, subject_id: int) -> list[QuestRead]:
     
-    result = await session.scalars(
-        select(Quest)
-        .where(Quest.subject_id == subject_id)
+    result = await session.execute(
+        select(*read_columns(Quest, QuestRead))
+        .join(Subject, Subject.id == Quest.subject_id)
+        .where(Quest.subject_id == subject_id, Subject.deleted_at.is_(None))
         .order_by(Quest.created_at.desc(), Quest.created_at.asc())
     )
 
-    quests = result.all()
-
-    return [QuestRead(
-        id=quest.id,
-        subject_id=quest.subject_id,
-        description=quest.description,
-        difficulty=quest.difficulty,
-        status=quest.status,
-        created_at=quest.created_at 
-        )     
-        for quest in quests
-    ]
+    return rows_to_schema(QuestRead, result)
     
 async def _validate_new_subject(session: AsyncSession, player_id: int, new_subject: SubjectCreate) -> None:
-    statement = select(
-        exists().where(Player.id == player_id),  # ✅ Check if Player exists
-        exists().where(
-            (Subject.player_id == player_id) & (Subject.code_name == new_subject.code_name)  # ✅ Check if Subject exists
+    code_name = new_subject.code_name
+
+    statement = lambda_stmt(
+        lambda: select(
+            exists().where(Player.id == player_id),  # ✅ Check if Player exists
+            exists().where(
+                (Subject.player_id == player_id) & (Subject.code_name == code_name) & Subject.deleted_at.is_(None)  # ✅ Check if Subject exists
+            )
         )
     )
 
@@ -142,7 +165,7 @@ async def _validate_new_subject(session: AsyncSession, player_id: int, new_subje
         raise SubjectAlreadyExists(player_id)
 
 async def _get_subject_or_404(session: AsyncSession, subject_id: int) -> Subject:
-    statement = select(Subject).where(Subject.id == subject_id)
+    statement = select(Subject).where(Subject.id == subject_id, Subject.deleted_at.is_(None))
 
     subject = await session.scalar(statement)
 
@@ -4,10 +4,15 @@ from sqlalchemy.orm import joinedload,selectinload
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from app.models import User, Player
+from app.core.availability import taken_names
 from app.core.security import Security
+from app.core.token_versions import token_versions
 from app.schemas.user_schema import UserRead, UserUpdate, UserCreate, UserPlayerRead
 from app.schemas.player_schema import PlayerRead    
 from app.exceptions.player_exceptions import PlayerNotFound
+from app.crud.projection import read_columns, row_to_schema, rows_to_schema
+from app.schemas.deletion_schema import DeleteMode
+from app.services.deletion_service import DeletionService, deletion_purger
 
 class UserNotFound(HTTPException):
     def __init__(self):
@@ -32,6 +37,7 @@ async def crud_create_user(session: AsyncSession, user_create: UserCreate) -> Us
 
     try:
         session.add(new_user)
+        await taken_names.publish_taken(session, new_user.username, new_user.email)
         await session.commit()
         await session.refresh(new_user)
         return _serialize_user(new_user)
@@ -40,26 +46,33 @@ async def crud_create_user(session: AsyncSession, user_create: UserCreate) -> Us
         raise UserAlreadyExists
 
 async def crud_read_user_by_id(session: AsyncSession, user_id: int) -> UserRead:
-    user = await _get_user_or_404(session, user_id)
-    return _serialize_user(user)
+    result = await session.execute(
+        select(*read_columns(User, UserRead)).where(User.id == user_id, User.deleted_at.is_(None))
+    )
+    row = result.first()
+
+    if not row:
+        raise UserNotFound
+
+    return row_to_schema(UserRead, row)
 
 async def crud_read_user_player(session: AsyncSession, user_id: int) -> PlayerRead:
-    user_player = await _get_user_player_or_404(session, user_id)
-
-    return PlayerRead(
-        id=user_player.id,
-        user_id=user_player.user_id,
-        experience=user_player.experience,
-        level=user_player.level,
-        title=user_player.title
+    result = await session.execute(
+        select(*read_columns(Player, PlayerRead)).where(Player.user_id == user_id)
     )
+    row = result.first()
+
+    if not row:
+        raise PlayerNotFound(-1)
+
+    return row_to_schema(PlayerRead, row)
 
 async def crud_read_user_by_username(session: AsyncSession, username: str) -> User:
     """ used in authentication """
     
     result = await session.execute(
         select(User)
-        .where(User.username == username)
+        .where(User.username == username, User.deleted_at.is_(None))
     )
 
     user = result.scalar_one_or_none()
@@ -70,11 +83,9 @@ async def crud_read_user_by_username(session: AsyncSession, username: str) -> Us
     return user
 
 async def crud_read_all_users(session: AsyncSession) -> list[UserRead]:
-    result = await session.execute(select(User))
-    
-    users = result.scalars().all()
+    result = await session.execute(select(*read_columns(User, UserRead)).where(User.deleted_at.is_(None)))
 
-    return [_serialize_user(user) for user in users]
+    return rows_to_schema(UserRead, result)
 
 async def crud_update_user(session: AsyncSession, user_id: int, user_update: UserUpdate) -> UserRead:
     """Update a User while preventing duplicate usernames/emails and ensuring partial updates."""
@@ -94,12 +105,21 @@ async def crud_update_user(session: AsyncSession, user_id: int, user_update: Use
         return UserRead(id=user.id, username=user.username, email=user.email)  # ✅ No Updates, Return Existing Data
 
     try:
+        previous_names = {key: getattr(user, key) for key in ("username", "email") if key in update_data}
         for key, value in update_data.items():
             setattr(user, key, value)
 
+        if "password" in update_data:
+            await token_versions.bump(session, user.id)  # ✅ A new password signs out every other session
+
+        # ✅ Keep the availability filter in step: the new names are taken, the old ones free
+        await taken_names.publish_taken(session, update_data.get("username"), update_data.get("email"))
+
         await session.commit()
         await session.refresh(user)
 
+        taken_names.remove(previous_names.get("username"), previous_names.get("email"))
+
         return _serialize_user(user)
     
     except SQLAlchemyError as e:
@@ -109,13 +129,17 @@ async def crud_update_user(session: AsyncSession, user_id: int, user_update: Use
         await session.rollback()
         raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
 
-async def crud_delete_user(session: AsyncSession, user_id: int) -> UserRead:
-    try:
-        user = await _get_user_or_404(session, user_id)
+async def crud_delete_user(session: AsyncSession, user_id: int, mode: DeleteMode = DeleteMode.AUTO) -> UserRead:
+    user = await _get_user_or_404(session, user_id)
 
-        await session.delete(user)
+    try:
+        mode = await DeletionService.delete_user(session, user, mode)
         await session.commit()
-        
+
+        if mode == DeleteMode.SOFT:
+            deletion_purger.wake()  # ✅ Profile, subjects, quests and sessions go in the background
+        taken_names.remove(user.username, user.email)
+
         return _serialize_user(user)
 
     except SQLAlchemyError as e:
@@ -143,7 +167,7 @@ async def _get_user_or_error(session: AsyncSession, user_id: int, user_update: U
     # ✅ Extract User & Potential Duplicate from the same result set
 
     user = next((row for row in results if row.id == user_id), None)
-    if not user:
+    if not user or user.deleted_at is not None:
         raise UserNotFound
 
     existing_user = next((row for row in results if row.id != user_id), None)
@@ -154,20 +178,10 @@ async def _get_user_or_error(session: AsyncSession, user_id: int, user_update: U
 
 async def _get_user_or_404(session: AsyncSession, user_id: int) -> User:
     user = await session.get(User, user_id)
-    if not user:
+    if not user or user.deleted_at is not None:
         raise UserNotFound
     return user
 
-async def _get_user_player_or_404(session: AsyncSession, user_id: int) -> Player:
-    statement = select(Player).where(Player.user_id == user_id)
-    result = await session.execute(statement)
-    player = result.scalars().first()
-    
-    if not player:
-        raise PlayerNotFound(-1)
-    
-    return player
-
 async def _check_existing_user_based_on_email_and_username(session: AsyncSession, email: str, username: str) -> None:
     result = await session.execute(
         select(User.id)
@@ -1,16 +1,67 @@
-from fastapi import FastAPI
-from app.core.database import create_db_and_tables
-from app.api.v1.endpoints import (
-    user_routes, player_routes, 
-    auth_routes, test_routes, 
-    profile_routes, subject_routes, 
-    study_session_routes, quest_routes
-)
+import asyncio
+import importlib
+import logging
+from fastapi import FastAPI, Request
+from app.core.config import settings
+from app.core.admission import AdmissionControlMiddleware, admission_controller, loop_lag_monitor
+from app.core.compression import CompressionMiddleware
+from app.core.database import create_db_and_tables, engine, pool_managers, read_router
+from app.core.idempotency import IdempotencyMiddleware, create_idempotency_store
+from app.core.invalidation import invalidation_bus
+from app.core.profiling import ProfilingMiddleware, profile_store, profiling_enabled
+from app.core.rate_limit import ROUTE_POLICIES, RateLimitMiddleware, create_rate_limit_backend
+from app.core.replica import mark_read_your_writes
+from app.core.singleflight import read_flights
+from app.core.startup import check_migrations
+from app.core.structured_logging import RequestIdMiddleware, configure_logging, stop_logging
 from fastapi.middleware.cors import CORSMiddleware
 
+# ✅ Before anything logs: records go through a queue, stdout is written by a background thread
+configure_logging()
+logger = logging.getLogger(__name__)
+
+# (module, prefix, tags) -- imported lazily so "migrations" startup can overlap them with DB work
+ROUTERS = [
+    ("app.api.v1.endpoints.auth_routes", "/auth", ["auth"]),
+    ("app.api.v1.endpoints.user_routes", "/users", ["users"]),
+    ("app.api.v1.endpoints.player_routes", "/players", ["players"]),
+    ("app.api.v1.endpoints.profile_routes", "/profiles", ["profiles"]),
+    ("app.api.v1.endpoints.subject_routes", "/subjects", ["subjects"]),
+    ("app.api.v1.endpoints.study_session_routes", "/study_sessions", ["study_sessions"]),
+    ("app.api.v1.endpoints.quest_routes", "/quests", ["quests"]),
+    ("app.api.v1.endpoints.search_routes", "/search", ["search"]),
+    ("app.api.v1.endpoints.batch_routes", "/batch", ["batch"]),
+    ("app.api.v1.endpoints.debug_routes", "/debug", ["debug"]),
+    ("app.api.v1.endpoints.test_routes", "/tests", ["tests"]),
+]
+
 
 app = FastAPI(title="CramQuest API", version="1.0.0")
 
+# ✅ Retried POSTs with the same Idempotency-Key get the first response back
+# (added first: innermost, so it stores uncompressed bodies without CORS headers)
+app.add_middleware(
+    IdempotencyMiddleware,
+    store=create_idempotency_store(
+        settings.IDEMPOTENCY_STORE, engine, settings.IDEMPOTENCY_TTL_SECONDS, settings.IDEMPOTENCY_MAX_ENTRIES
+    ),
+    wait_seconds=settings.IDEMPOTENCY_WAIT_SECONDS,
+    excluded_paths=settings.idempotency_excluded_paths,
+)
+
+if settings.RATE_LIMIT_ENABLED:
+    # ✅ Abusive clients are turned away before the route (and its bcrypt) runs
+    app.add_middleware(
+        RateLimitMiddleware,
+        backend=create_rate_limit_backend(settings.RATE_LIMIT_BACKEND),
+        routes=ROUTE_POLICIES,
+        trust_forwarded_for=settings.RATE_LIMIT_TRUST_FORWARDED_FOR,
+    )
+
+if settings.ADMISSION_ENABLED:
+    # ✅ An overloaded worker turns requests away before any work; inside CORS so browsers can read the 503
+    app.add_middleware(AdmissionControlMiddleware, controller=admission_controller)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[
@@ -29,23 +80,103 @@ app.add_middleware(
     allow_headers=["*"],  # ✅ Allow all headers
 )
 
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+    gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+    brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+    zstd_level=settings.COMPRESSION_ZSTD_LEVEL,
+    cache_max_bytes=settings.COMPRESSION_CACHE_MAX_BYTES,
+)
+
+if profiling_enabled():
+    # ✅ Outside the middleware above, so the profile covers them; not installed at all otherwise
+    app.add_middleware(
+        ProfilingMiddleware,
+        store=profile_store,
+        on_request=settings.PROFILING_ON_REQUEST,
+        sample_rate=settings.PROFILING_SAMPLE_RATE,
+    )
+
+
+
+@app.middleware("http")
+async def read_your_writes(request: Request, call_next):
+    response = await call_next(request)
+    if request.method not in ("GET", "HEAD", "OPTIONS"):
+        # ✅ Writes bypass single-flight, and no read coalesced before them is handed out after
+        read_flights.forget()
+    # ✅ Keep this client on the primary for a short while after it wrote something
+    # (without replicas every read already goes there: no cookie)
+    if read_router.replicas and request.method not in ("GET", "HEAD", "OPTIONS") and response.status_code < 400:
+        mark_read_your_writes(response)
+    return response
+
+
+# ✅ Outermost: every log record written while handling a request carries its id
+app.add_middleware(RequestIdMiddleware)
+
+
+def _import_routers() -> list:
+    return [importlib.import_module(module).router for module, _, _ in ROUTERS]
+
+
+def _include_routers(routers: list) -> None:
+    for router, (_, prefix, tags) in zip(routers, ROUTERS):
+        app.include_router(router, prefix=prefix, tags=tags)
+
 
 @app.on_event("startup")
 async def on_startup():
-    print("Starting up cramquest...")
-    await create_db_and_tables()  # Automatically create missing tables
+    logger.info("Starting up cramquest...")
+
+    if settings.STARTUP_MODE == "migrations":
+        # ✅ Import routers in a thread while the DB is checked and the pool warms up
+        routers, *_ = await asyncio.gather(
+            asyncio.to_thread(_import_routers),
+            check_migrations(engine),
+            *(manager.prewarm() for manager in pool_managers),
+        )
+        _include_routers(routers)
+    else:
+        await asyncio.gather(
+            create_db_and_tables(),  # Automatically create missing tables
+            *(manager.prewarm() for manager in pool_managers),
+        )
+
+    for manager in pool_managers:
+        manager.start_keepalive()
+
+    # ✅ Imported here, not at the top: they load the models, which routers load in a thread above
+    from app.core.availability import taken_names
+    from app.core.refresh_tokens import refresh_token_store
+    from app.services.deletion_service import deletion_purger
+
+    invalidation_bus.start(engine.dialect)
+    deletion_purger.start()
+    loop_lag_monitor.start()
+    refresh_token_store.start()
+    taken_names.start()  # ✅ Builds the username/email filter in the background, then keeps it fresh
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    from app.core.availability import taken_names
+    from app.core.refresh_tokens import refresh_token_store
+    from app.services.deletion_service import deletion_purger
+
+    await invalidation_bus.stop()
+    await deletion_purger.stop()
+    await loop_lag_monitor.stop()
+    await refresh_token_store.stop()
+    await taken_names.stop()
+    for manager in pool_managers:
+        await manager.stop_keepalive()
+    stop_logging()
 
 @app.get('/')
 async def root():
     return {"message": "Welcome to cramquest!"}
 
-app.include_router(auth_routes.router, prefix="/auth", tags=["auth"])
-app.include_router(user_routes.router, prefix="/users", tags=["users"])
-app.include_router(player_routes.router, prefix="/players", tags=["players"])
-app.include_router(profile_routes.router, prefix="/profiles", tags=["profiles"])
-app.include_router(subject_routes.router, prefix="/subjects", tags=["subjects"])
-app.include_router(study_session_routes.router, prefix="/study_sessions", tags=["study_sessions"])
-app.include_router(quest_routes.router, prefix="/quests", tags=["quests"])
-
 
-app.include_router(test_routes.router, prefix="/tests", tags=["tests"])
+if settings.STARTUP_MODE != "migrations":
+    _include_routers(_import_routers())
@@ -6,3 +6,7 @@ from app.models.subject_model import Subject
 from app.models.user_model import User
 from app.models.material_model import Material
 from app.models.task_model import Task
+from app.models.quest_review_model import QuestReview
+from app.models.idempotency_model import IdempotencyRecord
+from app.models.token_version_model import TokenVersion
+from app.models.refresh_token_model import RefreshToken
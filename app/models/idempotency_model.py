@@ -0,0 +1,18 @@
+from typing import Optional
+from sqlmodel import SQLModel, Field, Column, DateTime, LargeBinary, String, Text
+from datetime import datetime, timezone
+
+
+class IdempotencyRecord(SQLModel, table=True):
+    """A POST executed under an Idempotency-Key and, once finished, its response."""
+
+    key: str = Field(sa_column=Column(String(128), primary_key=True))
+    fingerprint: str = Field(sa_column=Column(String(64), nullable=False))
+    status_code: Optional[int] = Field(default=None)  # NULL while the first request is still running
+    headers: Optional[str] = Field(default=None, sa_column=Column(Text))  # JSON [[name, value], ...]
+    body: Optional[bytes] = Field(default=None, sa_column=Column(LargeBinary))  # zlib compressed
+    created_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc),
+        sa_type=DateTime(timezone=True),
+    )
+    expires_at: datetime = Field(sa_type=DateTime(timezone=True), index=True)
@@ -33,12 +33,12 @@ class Player(SQLModel, table=True):
     experience: int = Field(default=0)
 
     study_sessions: list["StudySession"] = Relationship(
-        back_populates="player", sa_relationship_kwargs={"cascade": "all, delete"}
+        back_populates="player", sa_relationship_kwargs={"cascade": "all, delete", "passive_deletes": True}
     )
     user: "User" = Relationship(back_populates="player")
     profile: Optional["Profile"] = Relationship(
-        back_populates="player", sa_relationship_kwargs={"cascade": "all, delete"}
+        back_populates="player", sa_relationship_kwargs={"cascade": "all, delete", "passive_deletes": True}
     )
     subjects: list["Subject"] = Relationship(
-        back_populates="player", sa_relationship_kwargs={"cascade": "all, delete"}
+        back_populates="player", sa_relationship_kwargs={"cascade": "all, delete", "passive_deletes": True}
     )
@@ -42,4 +42,6 @@ class Quest(SQLModel, table=True):
     )
 
     subject: "Subject" = Relationship(back_populates="quests")
-    study_sessions: Optional["StudySession"] = Relationship(back_populates="quest")
+    study_sessions: Optional["StudySession"] = Relationship(
+        back_populates="quest", sa_relationship_kwargs={"passive_deletes": "all"}
+    )
@@ -0,0 +1,33 @@
+from typing import Optional
+from sqlmodel import SQLModel, Field, Column, ForeignKey, DateTime, Index
+from datetime import datetime, timezone
+
+
+class QuestReview(SQLModel, table=True):
+    """Spaced-repetition (SM-2) state of a quest: when it is next due for review."""
+
+    __table_args__ = (
+        # ✅ "next N due reviews of a player" is a range scan on this index
+        Index("ix_questreview_player_id_due_at", "player_id", "due_at"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    quest_id: int = Field(
+        sa_column=Column(
+            ForeignKey("quest.id", ondelete="CASCADE"), nullable=False, unique=True
+        )
+    )
+    player_id: int = Field(
+        sa_column=Column(ForeignKey("player.id", ondelete="CASCADE"), nullable=False)
+    )
+    repetitions: int = Field(default=0)
+    interval_days: int = Field(default=0)
+    ease_factor: float = Field(default=2.5)
+    last_quality: Optional[int] = Field(default=None)
+    last_reviewed_at: Optional[datetime] = Field(
+        default=None, sa_type=DateTime(timezone=True)
+    )
+    due_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc),
+        sa_type=DateTime(timezone=True),
+    )
@@ -0,0 +1,23 @@
+from typing import Optional
+from sqlmodel import SQLModel, Field, Column, DateTime, String
+from datetime import datetime, timezone
+
+
+class RefreshToken(SQLModel, table=True):
+    """A refresh token issued by rotation, or revoked.
+
+    Tokens handed out at sign in have no row until they are used or revoked: the
+    first refresh inserts their child. ``parent_jti`` is unique, so a token can be
+    rotated once; a second use of it is a reuse and revokes the whole family.
+    """
+
+    jti: str = Field(sa_column=Column(String(32), primary_key=True))
+    family: str = Field(sa_column=Column(String(32), nullable=False, index=True))
+    parent_jti: Optional[str] = Field(default=None, sa_column=Column(String(32), unique=True))
+    user_id: int = Field(index=True)
+    created_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc),
+        sa_type=DateTime(timezone=True),
+    )
+    expires_at: datetime = Field(sa_type=DateTime(timezone=True), index=True)
+    revoked_at: Optional[datetime] = Field(default=None, sa_type=DateTime(timezone=True))
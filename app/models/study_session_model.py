@@ -18,13 +18,13 @@ class SessionStatus(str, Enum):
 class StudySession(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     player_id: int = Field(
-        sa_column=Column(ForeignKey("player.id", ondelete="CASCADE"), nullable=False)
+        sa_column=Column(ForeignKey("player.id", ondelete="CASCADE"), nullable=False, index=True)
     )
     subject_id: int = Field(
-        sa_column=Column(ForeignKey("subject.id", ondelete="CASCADE"), nullable=False)
+        sa_column=Column(ForeignKey("subject.id", ondelete="CASCADE"), nullable=False, index=True)
     )
     quest_id: int = Field(
-        sa_column=Column(ForeignKey("quest.id", ondelete="CASCADE"), nullable=False)
+        sa_column=Column(ForeignKey("quest.id", ondelete="CASCADE"), nullable=False, index=True)
     )
     start_time: datetime = Field(
         default_factory=lambda: datetime.now(timezone.utc),
@@ -40,4 +40,6 @@ class StudySession(SQLModel, table=True):
     player: "Player" = Relationship(back_populates="study_sessions")
     subject: "Subject" = Relationship(back_populates="study_sessions")
     quest: "Quest" = Relationship(back_populates="study_sessions")
-    tasks: list["Task"] = Relationship(back_populates="study_session")
+    tasks: list["Task"] = Relationship(
+        back_populates="study_session", sa_relationship_kwargs={"passive_deletes": "all"}
+    )
@@ -1,5 +1,6 @@
 from typing import Optional, List, TYPE_CHECKING
-from sqlmodel import SQLModel, Field, Relationship, Column, String, ForeignKey, Integer
+from datetime import datetime
+from sqlmodel import SQLModel, Field, Relationship, Column, String, ForeignKey, Integer, DateTime
 
 if TYPE_CHECKING:
     from app.models.player_model import Player
@@ -11,18 +12,22 @@ if TYPE_CHECKING:
 class Subject(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     player_id: int = Field(
-        sa_column=Column(ForeignKey("player.id", ondelete="CASCADE"), nullable=False)
+        sa_column=Column(ForeignKey("player.id", ondelete="CASCADE"), nullable=False, index=True)
     )
 
     code_name: str = Field(sa_column=Column(String, nullable=False))
     description: str = Field(sa_column=Column(String, nullable=False))
     difficulty: int = Field(sa_column=Column(Integer, nullable=False), ge=1, le=5)
+    # set when a large subject is soft-deleted; the background purge removes it later
+    deleted_at: Optional[datetime] = Field(default=None, sa_type=DateTime(timezone=True), index=True)
 
     player: Optional["Player"] = Relationship(back_populates="subjects")
-    study_sessions: List["StudySession"] = Relationship(back_populates="subject")
+    study_sessions: List["StudySession"] = Relationship(
+        back_populates="subject", sa_relationship_kwargs={"passive_deletes": "all"}
+    )
     quests: List["Quest"] = Relationship(
-        back_populates="subject", sa_relationship_kwargs={"cascade": "all, delete"}
+        back_populates="subject", sa_relationship_kwargs={"cascade": "all, delete", "passive_deletes": True}
     )
     materials: list["Material"] = Relationship(
-        back_populates="subject", sa_relationship_kwargs={"cascade": "all, delete"}
+        back_populates="subject", sa_relationship_kwargs={"cascade": "all, delete", "passive_deletes": True}
     )
@@ -0,0 +1,17 @@
+from sqlmodel import SQLModel, Field, DateTime
+from datetime import datetime, timezone
+
+
+class TokenVersion(SQLModel, table=True):
+    """Per-user access token version, only for users whose tokens were ever revoked.
+
+    A missing row means version 0. No foreign key: the row outlives a deleted user,
+    so that user's outstanding tokens stay revoked.
+    """
+
+    user_id: int = Field(primary_key=True, sa_column_kwargs={"autoincrement": False})
+    version: int = Field(default=1, nullable=False)
+    updated_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc),
+        sa_type=DateTime(timezone=True),
+    )
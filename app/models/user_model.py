@@ -1,5 +1,6 @@
 from typing import Optional, TYPE_CHECKING
-from sqlmodel import Field, Relationship
+from datetime import datetime
+from sqlmodel import Field, Relationship, DateTime
 from app.models.base import Base
 
 if TYPE_CHECKING:
@@ -12,5 +13,10 @@ class User(Base, table=True):
     password: str = Field(nullable=False)
     is_active: bool = Field(default=False)
     is_admin: bool = Field(default=False)
+    # set when a large account is soft-deleted; the background purge removes it later
+    deleted_at: Optional[datetime] = Field(default=None, sa_type=DateTime(timezone=True), index=True)
 
-    player: Optional["Player"] = Relationship(back_populates="user", sa_relationship_kwargs={"cascade": "all, delete"})
+    # ✅ passive_deletes: the ON DELETE CASCADE foreign keys remove the rows, nothing is loaded first
+    player: Optional["Player"] = Relationship(
+        back_populates="user", sa_relationship_kwargs={"cascade": "all, delete", "passive_deletes": True}
+    )
@@ -10,6 +10,17 @@ class SignUpRequest(BaseModel):
     password: str = Field(..., min_length=8)
     avatar_url: Optional[str] = Field(default=None)
 
+class TokenClaims(BaseModel):
+    """Who a request is from, as signed into its access token (or read for sub-only tokens)."""
+    id: int
+    player_id: Optional[int] = None
+    is_admin: bool = False
+    token_version: int = 0
+
+class AvailabilityResponse(BaseModel):
+    username_available: Optional[bool] = None
+    email_available: Optional[bool] = None
+
 class UserInfo(BaseModel):
     id: int
     username: str
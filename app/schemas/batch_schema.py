@@ -0,0 +1,49 @@
+from pydantic import BaseModel, Field
+from typing import Any, Optional
+from enum import Enum
+
+
+class BatchOperationName(str, Enum):
+    CREATE_SUBJECT = "create_subject"
+    UPDATE_SUBJECT = "update_subject"
+    DELETE_SUBJECT = "delete_subject"
+    CREATE_QUEST = "create_quest"
+    UPDATE_QUEST = "update_quest"
+    DELETE_QUEST = "delete_quest"
+    CREATE_MATERIAL = "create_material"
+    UPDATE_MATERIAL = "update_material"
+    DELETE_MATERIAL = "delete_material"
+
+
+class BatchOperation(BaseModel):
+    """One sub-operation. String args like ``"$subject.id"`` (or ``"$0.id"``) are
+    replaced with a field of an earlier operation's result, by ``ref`` or index."""
+
+    op: BatchOperationName
+    args: dict[str, Any] = Field(default_factory=dict)
+    ref: Optional[str] = Field(None, pattern=r"^[A-Za-z_]\w*$")
+
+
+class BatchRequest(BaseModel):
+    operations: list[BatchOperation] = Field(..., min_length=1, max_length=50)
+
+
+class BatchOperationStatus(str, Enum):
+    OK = "ok"
+    FAILED = "failed"
+    SKIPPED = "skipped"
+
+
+class BatchOperationResult(BaseModel):
+    index: int
+    op: BatchOperationName
+    ref: Optional[str] = None
+    status: BatchOperationStatus
+    status_code: int
+    result: Optional[Any] = None
+    error: Optional[Any] = None
+
+
+class BatchResponse(BaseModel):
+    committed: bool
+    results: list[BatchOperationResult]
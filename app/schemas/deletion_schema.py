@@ -0,0 +1,7 @@
+from enum import Enum
+
+
+class DeleteMode(str, Enum):
+    AUTO = "auto"  # soft for accounts/subjects above DELETE_SOFT_THRESHOLD_ROWS, cascade otherwise
+    CASCADE = "cascade"  # one DELETE, the ON DELETE CASCADE foreign keys remove the rest
+    SOFT = "soft"  # hidden now, purged in bounded batches by the background purger
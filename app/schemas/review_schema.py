@@ -0,0 +1,17 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+
+
+class QuestReviewRead(BaseModel):
+    """Schema for returning a quest that is due for review."""
+
+    quest_id: int
+    subject_id: int
+    description: str
+    due_at: datetime
+    interval_days: int
+    repetitions: int
+    ease_factor: float
+    last_quality: Optional[int] = None
+    last_reviewed_at: Optional[datetime] = None
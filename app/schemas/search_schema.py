@@ -0,0 +1,22 @@
+from typing import Optional
+from enum import Enum
+from pydantic import BaseModel
+
+
+class SearchEntityType(str, Enum):
+    SUBJECT = "subject"
+    QUEST = "quest"
+    MATERIAL = "material"
+
+
+class SearchResult(BaseModel):
+    entity_type: SearchEntityType
+    entity_id: int
+    subject_id: int
+    title: str
+    rank: float
+
+
+class SearchPage(BaseModel):
+    results: list[SearchResult]
+    next_cursor: Optional[str] = None
@@ -0,0 +1,180 @@
+import inspect
+import re
+from typing import Any
+
+from fastapi import HTTPException, status
+from pydantic import BaseModel, ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.invalidation import invalidation_bus, pending_invalidation_keys
+from app.crud.material_crud import crud_create_material, crud_update_material, crud_delete_material
+from app.crud.quest_crud import crud_create_quest, crud_update_quest, crud_delete_quest
+from app.crud.subject_crud import crud_create_subject, crud_update_subject, crud_delete_subject
+from app.schemas.batch_schema import (
+    BatchOperation,
+    BatchOperationName,
+    BatchOperationResult,
+    BatchOperationStatus,
+    BatchResponse,
+)
+from app.schemas.material_schema import MaterialCreate, MaterialUpdate
+from app.schemas.quest_schema import QuestCreate, QuestUpdate
+from app.schemas.subject_schema import SubjectCreate, SubjectUpdate
+
+_REFERENCE = re.compile(r"^\$(\w+)\.(\w+)$")
+
+_OPERATIONS = {}
+
+
+class BatchArgumentError(HTTPException):
+    def __init__(self, detail: Any):
+        super().__init__(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=detail)
+
+
+class BatchSession:
+    """Session proxy for batch operations: the CRUD functions' commits become flushes.
+
+    Every operation still gets its generated ids and constraint checks (flush), but
+    the batch commits once, after the last operation.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self._session = session
+
+    async def commit(self) -> None:
+        await self._session.flush()
+
+    def __getattr__(self, name):
+        return getattr(self._session, name)
+
+
+def _operation(name: BatchOperationName):
+    def register(fn):
+        _OPERATIONS[name] = fn
+        return fn
+
+    return register
+
+
+@_operation(BatchOperationName.CREATE_SUBJECT)
+async def _create_subject(session, player_id: int, **subject):
+    return await crud_create_subject(session, player_id, SubjectCreate(**subject))
+
+
+@_operation(BatchOperationName.UPDATE_SUBJECT)
+async def _update_subject(session, subject_id: int, **subject):
+    return await crud_update_subject(session, subject_id, SubjectUpdate(**subject))
+
+
+@_operation(BatchOperationName.DELETE_SUBJECT)
+async def _delete_subject(session, subject_id: int):
+    return await crud_delete_subject(session, subject_id)
+
+
+@_operation(BatchOperationName.CREATE_QUEST)
+async def _create_quest(session, **quest):
+    return await crud_create_quest(session, QuestCreate(**quest))
+
+
+@_operation(BatchOperationName.UPDATE_QUEST)
+async def _update_quest(session, quest_id: int, **quest):
+    return await crud_update_quest(session, quest_id, QuestUpdate(**quest))
+
+
+@_operation(BatchOperationName.DELETE_QUEST)
+async def _delete_quest(session, quest_id: int):
+    return await crud_delete_quest(session, quest_id)
+
+
+@_operation(BatchOperationName.CREATE_MATERIAL)
+async def _create_material(session, subject_id: int, **material):
+    return await crud_create_material(session, subject_id, MaterialCreate(**material))
+
+
+@_operation(BatchOperationName.UPDATE_MATERIAL)
+async def _update_material(session, subject_id: int, material_id: int, **material):
+    return await crud_update_material(session, subject_id, material_id, MaterialUpdate(**material))
+
+
+@_operation(BatchOperationName.DELETE_MATERIAL)
+async def _delete_material(session, subject_id: int, material_id: int):
+    return await crud_delete_material(session, subject_id, material_id)
+
+
+def _resolve(value: Any, by_ref: dict[str, dict]) -> Any:
+    """Replace ``"$ref.field"`` strings (anywhere in the args) with earlier results."""
+    if isinstance(value, dict):
+        return {key: _resolve(item, by_ref) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_resolve(item, by_ref) for item in value]
+    if isinstance(value, str):
+        match = _REFERENCE.match(value)
+        if match:
+            ref, field = match.groups()
+            if ref not in by_ref:
+                raise BatchArgumentError(f"Unknown reference ${ref}: only earlier operations can be referenced")
+            if field not in by_ref[ref]:
+                raise BatchArgumentError(f"Result of ${ref} has no field {field!r}")
+            return by_ref[ref][field]
+    return value
+
+
+async def _run_operation(session: BatchSession, operation: BatchOperation, by_ref: dict[str, dict]) -> Any:
+    fn = _OPERATIONS[operation.op]
+    args = _resolve(operation.args, by_ref)
+
+    try:
+        inspect.signature(fn).bind(session, **args)
+    except TypeError as e:
+        raise BatchArgumentError(str(e))
+
+    # a TypeError from here on is a bug, not a bad argument: let it be a 500
+    try:
+        return await fn(session, **args)
+    except ValidationError as e:
+        raise BatchArgumentError(e.errors(include_url=False, include_context=False))
+
+
+class BatchService:
+    @staticmethod
+    async def run(session: AsyncSession, operations: list[BatchOperation]) -> BatchResponse:
+        """Run ``operations`` in order in one transaction; the first failure rolls all of them back."""
+        batch_session = BatchSession(session)
+        by_ref: dict[str, dict] = {}
+        results: list[BatchOperationResult] = []
+        failed = False
+
+        for index, operation in enumerate(operations):
+            result = BatchOperationResult(
+                index=index, op=operation.op, ref=operation.ref, status=BatchOperationStatus.SKIPPED, status_code=0
+            )
+            results.append(result)
+            if failed:
+                continue
+
+            try:
+                value = await _run_operation(batch_session, operation, by_ref)
+            except HTTPException as e:
+                result.status, result.status_code, result.error = BatchOperationStatus.FAILED, e.status_code, e.detail
+                failed = True
+                continue
+            except Exception as e:
+                result.status, result.status_code, result.error = BatchOperationStatus.FAILED, 500, str(e)
+                failed = True
+                continue
+
+            result.status, result.status_code, result.result = BatchOperationStatus.OK, 200, value
+            dumped = value.model_dump() if isinstance(value, BaseModel) else {}
+            by_ref[str(index)] = dumped
+            if operation.ref:
+                by_ref[operation.ref] = dumped
+
+        if failed:
+            # write-through cache entries set by the operations must not outlive the rollback
+            keys = pending_invalidation_keys(session)
+            await session.rollback()
+            invalidation_bus.evict(keys)
+        else:
+            await session.commit()
+
+        return BatchResponse(committed=not failed, results=results)
@@ -0,0 +1,236 @@
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.core.cache import ReadCache, PLAYER, SUBJECT, SUBJECT_QUESTS, SUBJECT_MATERIALS
+from app.core.config import settings
+from app.core.database import async_session_maker
+from app.core.invalidation import invalidation_bus
+from app.core.token_versions import token_versions
+from app.models import User, Player, Subject, Quest, Material, StudySession, Task, QuestReview
+from app.schemas.deletion_schema import DeleteMode
+from app.services.search_service import SearchService
+
+logger = logging.getLogger(__name__)
+
+
+def _subject_keys(subject_id: int) -> list[str]:
+    return [
+        ReadCache.key(SUBJECT, subject_id),
+        ReadCache.key(SUBJECT_QUESTS, subject_id),
+        ReadCache.key(SUBJECT_MATERIALS, subject_id),
+    ]
+
+
+class DeletionService:
+    """Deletes users and subjects without loading what hangs off them.
+
+    Cascade mode is one DELETE of the root row: the ON DELETE CASCADE foreign keys
+    remove the rest inside the database (the relationships are ``passive_deletes``,
+    so the ORM never loads children to delete them itself). For very large accounts
+    that is still one long transaction, so they are soft-deleted instead: hidden from
+    reads at once (a user's subjects are stamped along with it) and removed later by
+    ``deletion_purger`` in short batches.
+
+    Neither method commits; the caller does, and then wakes the purger on SOFT.
+    """
+
+    @staticmethod
+    async def resolve_mode(session: AsyncSession, mode: DeleteMode, sessions_filter) -> DeleteMode:
+        """AUTO becomes SOFT when more than DELETE_SOFT_THRESHOLD_ROWS study sessions match."""
+        if mode != DeleteMode.AUTO:
+            return mode
+
+        threshold = settings.DELETE_SOFT_THRESHOLD_ROWS
+        # ✅ Counting stops at threshold + 1 rows, however big the account is
+        bounded = select(StudySession.id).where(sessions_filter).limit(threshold + 1).subquery()
+        count = await session.scalar(select(func.count()).select_from(bounded))
+        return DeleteMode.SOFT if count > threshold else DeleteMode.CASCADE
+
+    @staticmethod
+    async def delete_user(session: AsyncSession, user: User, mode: DeleteMode) -> DeleteMode:
+        player_id = await session.scalar(select(Player.id).where(Player.user_id == user.id))
+        subject_ids = []
+        if player_id is not None:
+            subject_ids = (await session.scalars(select(Subject.id).where(Subject.player_id == player_id))).all()
+
+        mode = await DeletionService.resolve_mode(session, mode, StudySession.player_id == player_id)
+
+        keys = [key for subject_id in subject_ids for key in _subject_keys(subject_id)]
+        if player_id is not None:
+            keys.append(ReadCache.key(PLAYER, player_id))
+        for subject_id in subject_ids:
+            await SearchService.remove_subject(session, subject_id)
+        await invalidation_bus.publish(session, *keys)
+        await token_versions.bump(session, user.id)  # ✅ Outstanding claims tokens stop authorizing
+
+        if mode == DeleteMode.SOFT:
+            now = datetime.now(timezone.utc)
+            user.deleted_at = now
+            if subject_ids:
+                # ✅ Subject, quest and material reads check the subject: hide them all at once
+                await session.execute(
+                    update(Subject)
+                    .where(Subject.id.in_(subject_ids), Subject.deleted_at.is_(None))
+                    .values(deleted_at=now)
+                    .execution_options(synchronize_session=False)
+                )
+        else:
+            await session.execute(
+                delete(User).where(User.id == user.id).execution_options(synchronize_session=False)
+            )
+        return mode
+
+    @staticmethod
+    async def delete_subject(session: AsyncSession, subject: Subject, mode: DeleteMode) -> DeleteMode:
+        mode = await DeletionService.resolve_mode(session, mode, StudySession.subject_id == subject.id)
+
+        await SearchService.remove_subject(session, subject.id)
+        await invalidation_bus.publish(session, *_subject_keys(subject.id))
+
+        if mode == DeleteMode.SOFT:
+            subject.deleted_at = datetime.now(timezone.utc)
+        else:
+            await session.execute(
+                delete(Subject).where(Subject.id == subject.id).execution_options(synchronize_session=False)
+            )
+        return mode
+
+
+class DeletionPurger:
+    """Background removal of soft-deleted users and subjects.
+
+    Children are deleted leaf first, ``batch_size`` rows per transaction with a short
+    pause in between, so locks are held briefly and the WAL/replicas keep up; the root
+    row goes last, once only a handful of cascaded rows are left. Every worker runs
+    one: the deletes are idempotent, so two purging the same account is harmless.
+    """
+
+    def __init__(self, session_maker: sessionmaker, batch_size: int, pause: float, interval: float):
+        self.session_maker = session_maker
+        self.batch_size = batch_size
+        self.pause = pause
+        self.interval = interval
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def wake(self) -> None:
+        self._wake.set()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            self._wake.clear()
+            try:
+                rows = await self.purge_pending()
+                if rows:
+                    logger.info("Purged %d soft-deleted rows", rows)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Purging soft-deleted rows failed, retrying in %.0fs", self.interval)
+
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def purge_pending(self) -> int:
+        """Purge everything soft-deleted so far; returns the number of rows deleted."""
+        rows = 0
+        while (subject_id := await self._next_deleted(Subject)) is not None:
+            rows += await self.purge_subject(subject_id)
+        while (user_id := await self._next_deleted(User)) is not None:
+            rows += await self.purge_user(user_id)
+        return rows
+
+    async def purge_subject(self, subject_id: int) -> int:
+        session_ids = select(StudySession.id).where(StudySession.subject_id == subject_id)
+        quest_ids = select(Quest.id).where(Quest.subject_id == subject_id)
+        steps = [
+            (Task, select(Task.id).where(Task.study_session_id.in_(session_ids))),
+            (StudySession, session_ids),
+            (QuestReview, select(QuestReview.id).where(QuestReview.quest_id.in_(quest_ids))),
+            (Quest, quest_ids),
+            (Material, select(Material.id).where(Material.subject_id == subject_id)),
+        ]
+
+        rows = 0
+        for model, ids in steps:
+            rows += await self._delete_in_batches(model, ids)
+
+        async with self.session_maker() as session:
+            await SearchService.remove_subject(session, subject_id)
+            result = await session.execute(
+                delete(Subject).where(Subject.id == subject_id).execution_options(synchronize_session=False)
+            )
+            await session.commit()
+        return rows + result.rowcount
+
+    async def purge_user(self, user_id: int) -> int:
+        async with self.session_maker() as session:
+            subject_ids = (
+                await session.scalars(
+                    select(Subject.id).join(Player, Subject.player_id == Player.id).where(Player.user_id == user_id)
+                )
+            ).all()
+
+        rows = 0
+        for subject_id in subject_ids:
+            rows += await self.purge_subject(subject_id)
+
+        # what is left (player, profile, reviews) is small: let the foreign keys cascade it
+        async with self.session_maker() as session:
+            result = await session.execute(
+                delete(User).where(User.id == user_id).execution_options(synchronize_session=False)
+            )
+            await session.commit()
+        return rows + result.rowcount
+
+    async def _next_deleted(self, model) -> Optional[int]:
+        async with self.session_maker() as session:
+            return await session.scalar(
+                select(model.id).where(model.deleted_at.is_not(None)).order_by(model.deleted_at).limit(1)
+            )
+
+    async def _delete_in_batches(self, model, ids) -> int:
+        total = 0
+        while True:
+            async with self.session_maker() as session:
+                result = await session.execute(
+                    delete(model)
+                    .where(model.id.in_(ids.limit(self.batch_size)))
+                    .execution_options(synchronize_session=False)
+                )
+                await session.commit()
+
+            total += result.rowcount
+            if result.rowcount < self.batch_size:
+                return total
+            await asyncio.sleep(self.pause)
+
+
+deletion_purger = DeletionPurger(
+    async_session_maker,
+    batch_size=settings.DELETE_PURGE_BATCH_SIZE,
+    pause=settings.DELETE_PURGE_PAUSE_MS / 1000,
+    interval=settings.DELETE_PURGE_INTERVAL_SECONDS,
+)
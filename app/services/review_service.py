@@ -0,0 +1,49 @@
+from datetime import datetime, timedelta
+from app.models.study_session_model import SessionStatus
+from app.models import QuestReview
+
+
+class ReviewService:
+    """SM-2 scheduling: quality 0-5 per review, quality < 3 starts the quest over."""
+
+    MIN_EASE_FACTOR = 1.3
+    FIRST_INTERVAL_DAYS = 1
+    SECOND_INTERVAL_DAYS = 6
+    PASSING_QUALITY = 3
+
+    @staticmethod
+    def quality_from_session(session_status: SessionStatus, completion_rate: float, finished_early: bool) -> int:
+        """Grade a finished study session on the SM-2 0-5 scale."""
+
+        if session_status == SessionStatus.COMPLETED:
+            return 5 if finished_early else 4
+
+        # ✅ Defeat: partial recall, always below the passing grade
+        return min(int(completion_rate * ReviewService.PASSING_QUALITY), ReviewService.PASSING_QUALITY - 1)
+
+    @staticmethod
+    def schedule(review: QuestReview, quality: int, reviewed_at: datetime) -> QuestReview:
+        """Apply one review of ``quality`` to ``review`` and move its due date."""
+
+        if quality >= ReviewService.PASSING_QUALITY:
+            if review.repetitions == 0:
+                review.interval_days = ReviewService.FIRST_INTERVAL_DAYS
+            elif review.repetitions == 1:
+                review.interval_days = ReviewService.SECOND_INTERVAL_DAYS
+            else:
+                review.interval_days = round(review.interval_days * review.ease_factor)
+            review.repetitions += 1
+        else:
+            review.repetitions = 0
+            review.interval_days = ReviewService.FIRST_INTERVAL_DAYS
+
+        penalty = 5 - quality
+        review.ease_factor = max(
+            ReviewService.MIN_EASE_FACTOR,
+            review.ease_factor + 0.1 - penalty * (0.08 + penalty * 0.02),
+        )
+
+        review.last_quality = quality
+        review.last_reviewed_at = reviewed_at
+        review.due_at = reviewed_at + timedelta(days=review.interval_days)
+        return review
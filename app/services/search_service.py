@@ -0,0 +1,291 @@
+import base64
+import json
+import re
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from app.schemas.search_schema import SearchEntityType, SearchPage, SearchResult
+
+# One row per searchable entity, scoped to the owning player:
+#   subject  -> title=code_name,   body=description
+#   quest    -> title=description
+#   material -> title=title,       body=type
+SEARCH_TABLE = "search_document"
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+
+class InvalidSearchCursor(ValueError):
+    pass
+
+
+def _encode_cursor(rank: float, row_id: int) -> str:
+    return base64.urlsafe_b64encode(json.dumps([rank, row_id]).encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> tuple[float, int]:
+    try:
+        rank, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return float(rank), int(row_id)
+    except (ValueError, TypeError):
+        raise InvalidSearchCursor(cursor)
+
+
+def _cursor_params(cursor: Optional[tuple[float, int]]) -> dict:
+    return dict(after_rank=cursor[0], after_id=cursor[1]) if cursor else {}
+
+
+class PostgresSearchBackend:
+    """tsvector + GIN for words and prefixes, pg_trgm for fuzzy/substring title matches."""
+
+    SCHEMA = [
+        "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+        "CREATE EXTENSION IF NOT EXISTS btree_gin",
+        f"""
+        CREATE TABLE IF NOT EXISTS {SEARCH_TABLE} (
+            id BIGSERIAL PRIMARY KEY,
+            entity_type VARCHAR(16) NOT NULL,
+            entity_id INTEGER NOT NULL,
+            player_id INTEGER NOT NULL REFERENCES player (id) ON DELETE CASCADE,
+            subject_id INTEGER NOT NULL REFERENCES subject (id) ON DELETE CASCADE,
+            title TEXT NOT NULL,
+            body TEXT NOT NULL DEFAULT '',
+            tsv TSVECTOR GENERATED ALWAYS AS (
+                setweight(to_tsvector('simple', title), 'A') ||
+                setweight(to_tsvector('simple', body), 'B')
+            ) STORED,
+            CONSTRAINT uq_search_document_entity UNIQUE (entity_type, entity_id)
+        )
+        """,
+        f"CREATE INDEX IF NOT EXISTS ix_search_document_player_tsv ON {SEARCH_TABLE} USING gin (player_id, tsv)",
+        f"CREATE INDEX IF NOT EXISTS ix_search_document_player_title_trgm ON {SEARCH_TABLE} USING gin (player_id, title gin_trgm_ops)",
+        # cascaded subject deletes and soft-deletes look documents up by subject
+        f"CREATE INDEX IF NOT EXISTS ix_search_document_subject_id ON {SEARCH_TABLE} (subject_id)",
+    ]
+
+    async def ensure_schema(self, conn: AsyncConnection) -> None:
+        for ddl in self.SCHEMA:
+            await conn.execute(text(ddl))
+
+    async def upsert(self, session: AsyncSession, entity_type: str, entity_id: int, subject_id: int, title: str, body: str) -> None:
+        await session.execute(
+            text(
+                f"""
+                INSERT INTO {SEARCH_TABLE} (entity_type, entity_id, player_id, subject_id, title, body)
+                SELECT :entity_type, :entity_id, subject.player_id, subject.id, :title, :body
+                FROM subject WHERE subject.id = :subject_id
+                ON CONFLICT (entity_type, entity_id)
+                DO UPDATE SET title = excluded.title, body = excluded.body
+                """
+            ),
+            dict(entity_type=entity_type, entity_id=entity_id, subject_id=subject_id, title=title, body=body),
+        )
+
+    async def delete(self, session: AsyncSession, entity_type: str, entity_id: int) -> None:
+        await session.execute(
+            text(f"DELETE FROM {SEARCH_TABLE} WHERE entity_type = :entity_type AND entity_id = :entity_id"),
+            dict(entity_type=entity_type, entity_id=entity_id),
+        )
+
+    async def delete_subject(self, session: AsyncSession, subject_id: int) -> None:
+        # the subject_id foreign key cascades too, but a soft-deleted subject must drop out of search now
+        await session.execute(
+            text(f"DELETE FROM {SEARCH_TABLE} WHERE subject_id = :subject_id"),
+            dict(subject_id=subject_id),
+        )
+
+    async def search(self, session, player_id, words, raw_query, entity_types, limit, cursor) -> list:
+        tsquery = " & ".join(f"{word}:*" for word in words)
+        after = "WHERE (rank, id) < (:after_rank, :after_id)" if cursor else ""
+        result = await session.execute(
+            text(
+                f"""
+                SELECT * FROM (
+                    SELECT id, entity_type, entity_id, subject_id, title,
+                           ts_rank_cd(tsv, to_tsquery('simple', :tsquery)) + similarity(title, :raw_query) AS rank
+                    FROM {SEARCH_TABLE}
+                    WHERE player_id = :player_id
+                      AND entity_type = ANY(:entity_types)
+                      AND (tsv @@ to_tsquery('simple', :tsquery) OR title % :raw_query)
+                ) AS matches
+                {after}
+                ORDER BY rank DESC, id DESC
+                LIMIT :limit
+                """
+            ),
+            dict(
+                tsquery=tsquery,
+                raw_query=raw_query,
+                player_id=player_id,
+                entity_types=list(entity_types),
+                limit=limit,
+                **_cursor_params(cursor),
+            ),
+        )
+        return result.all()
+
+
+class SqliteSearchBackend:
+    """FTS5 index for local development. bm25 is negated so that higher always ranks first."""
+
+    SCHEMA = [
+        f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5(
+            title, body,
+            entity_type UNINDEXED, entity_id UNINDEXED, player_id UNINDEXED, subject_id UNINDEXED,
+            prefix='2 3'
+        )
+        """,
+    ]
+
+    async def ensure_schema(self, conn: AsyncConnection) -> None:
+        for ddl in self.SCHEMA:
+            await conn.execute(text(ddl))
+
+    async def upsert(self, session: AsyncSession, entity_type: str, entity_id: int, subject_id: int, title: str, body: str) -> None:
+        await self.delete(session, entity_type, entity_id)
+        await session.execute(
+            text(
+                f"""
+                INSERT INTO {SEARCH_TABLE} (title, body, entity_type, entity_id, player_id, subject_id)
+                SELECT :title, :body, :entity_type, :entity_id, subject.player_id, subject.id
+                FROM subject WHERE subject.id = :subject_id
+                """
+            ),
+            dict(entity_type=entity_type, entity_id=entity_id, subject_id=subject_id, title=title, body=body),
+        )
+
+    async def delete(self, session: AsyncSession, entity_type: str, entity_id: int) -> None:
+        await session.execute(
+            text(f"DELETE FROM {SEARCH_TABLE} WHERE entity_type = :entity_type AND entity_id = :entity_id"),
+            dict(entity_type=entity_type, entity_id=entity_id),
+        )
+
+    async def delete_subject(self, session: AsyncSession, subject_id: int) -> None:
+        # FTS5 tables have no foreign keys: drop the subject's quests and materials too
+        await session.execute(
+            text(f"DELETE FROM {SEARCH_TABLE} WHERE subject_id = :subject_id"),
+            dict(subject_id=subject_id),
+        )
+
+    async def search(self, session, player_id, words, raw_query, entity_types, limit, cursor) -> list:
+        match = " ".join(f'"{word}"*' for word in words)
+        after = "WHERE rank < :after_rank OR (rank = :after_rank AND id < :after_id)" if cursor else ""
+        type_params = {f"entity_type_{i}": entity_type for i, entity_type in enumerate(entity_types)}
+        result = await session.execute(
+            text(
+                f"""
+                SELECT * FROM (
+                    SELECT rowid AS id, entity_type, entity_id, subject_id, title,
+                           -bm25({SEARCH_TABLE}, 10.0, 5.0) AS rank
+                    FROM {SEARCH_TABLE}
+                    WHERE {SEARCH_TABLE} MATCH :match
+                      AND player_id = :player_id
+                      AND entity_type IN ({", ".join(f":{name}" for name in type_params)})
+                ) AS matches
+                {after}
+                ORDER BY rank DESC, id DESC
+                LIMIT :limit
+                """
+            ),
+            dict(
+                match=match,
+                player_id=player_id,
+                limit=limit,
+                **type_params,
+                **_cursor_params(cursor),
+            ),
+        )
+        return result.all()
+
+
+_BACKENDS = {
+    "postgresql": PostgresSearchBackend(),
+    "sqlite": SqliteSearchBackend(),
+}
+
+
+def _backend_for(dialect_name: str):
+    return _BACKENDS.get(dialect_name)
+
+
+class SearchService:
+    """Keeps the search index in step with CRUD writes and answers /search queries.
+
+    Index writes run on the caller's session, i.e. inside the same transaction as the
+    change they mirror. Dialects without a backend simply have no search.
+    """
+
+    @staticmethod
+    async def ensure_schema(conn: AsyncConnection) -> None:
+        backend = _backend_for(conn.dialect.name)
+        if backend:
+            await backend.ensure_schema(conn)
+
+    @staticmethod
+    async def index_subject(session: AsyncSession, subject) -> None:
+        await SearchService._upsert(session, SearchEntityType.SUBJECT, subject.id, subject.id, subject.code_name, subject.description)
+
+    @staticmethod
+    async def index_quest(session: AsyncSession, quest) -> None:
+        await SearchService._upsert(session, SearchEntityType.QUEST, quest.id, quest.subject_id, quest.description, "")
+
+    @staticmethod
+    async def index_material(session: AsyncSession, material) -> None:
+        await SearchService._upsert(session, SearchEntityType.MATERIAL, material.id, material.subject_id, material.title, getattr(material.type, "value", material.type))
+
+    @staticmethod
+    async def remove(session: AsyncSession, entity_type: SearchEntityType, entity_id: int) -> None:
+        backend = _backend_for(session.get_bind().dialect.name)
+        if backend:
+            await backend.delete(session, entity_type.value, entity_id)
+
+    @staticmethod
+    async def remove_subject(session: AsyncSession, subject_id: int) -> None:
+        """Remove a subject and everything indexed under it."""
+        backend = _backend_for(session.get_bind().dialect.name)
+        if backend:
+            await backend.delete(session, SearchEntityType.SUBJECT.value, subject_id)
+            await backend.delete_subject(session, subject_id)
+
+    @staticmethod
+    async def _upsert(session: AsyncSession, entity_type: SearchEntityType, entity_id: int, subject_id: int, title: str, body: str) -> None:
+        backend = _backend_for(session.get_bind().dialect.name)
+        if backend:
+            await backend.upsert(session, entity_type.value, entity_id, subject_id, title, body or "")
+
+    @staticmethod
+    async def search(
+        session: AsyncSession,
+        player_id: int,
+        query: str,
+        entity_types: list[SearchEntityType],
+        limit: int,
+        cursor: Optional[str] = None,
+    ) -> SearchPage:
+        words = _WORD.findall(query.lower())
+        backend = _backend_for(session.get_bind().dialect.name)
+        if not words or not backend:
+            return SearchPage(results=[], next_cursor=None)
+
+        after = _decode_cursor(cursor) if cursor else None
+        rows = await backend.search(
+            session, player_id, words, query, [entity_type.value for entity_type in entity_types], limit + 1, after
+        )
+
+        page, has_more = rows[:limit], len(rows) > limit
+        return SearchPage(
+            results=[
+                SearchResult(
+                    entity_type=row.entity_type,
+                    entity_id=row.entity_id,
+                    subject_id=row.subject_id,
+                    title=row.title,
+                    rank=row.rank,
+                )
+                for row in page
+            ],
+            next_cursor=_encode_cursor(page[-1].rank, page[-1].id) if has_more else None,
+        )
@@ -0,0 +1,154 @@
+"""Deleting a large account: ORM cascade vs. DB cascade vs. soft delete + purge.
+
+Seeds a fresh account per path (``--sessions`` study sessions with one task each,
+spread over ``--subjects`` subjects with their quests), then times ``DELETE /users/{id}``:
+
+  * orm:     the previous path -- every profile, subject, quest, material, session
+             and task is loaded into the session and deleted row by row
+  * cascade: one DELETE of the user, the ON DELETE CASCADE foreign keys do the rest
+  * soft:    the request only sets ``deleted_at``; the purge time is the background
+             work, in batches of ``--batch-size`` rows per transaction
+
+Usage:
+    python -m benchmarks.delete_benchmark [--url sqlite+aiosqlite:///bench.db] [--sessions 100000]
+
+Use a scratch database: the tables are created and the rows are inserted there.
+"""
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import event, insert
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlmodel import SQLModel, select
+
+from app.models import Material, Player, Profile, Quest, StudySession, Subject, Task, User
+from app.schemas.deletion_schema import DeleteMode
+from app.services.deletion_service import DeletionPurger, DeletionService
+from app.services.search_service import SearchService
+
+CHUNK = 5000
+
+
+async def _seed(factory, name: str, sessions: int, subjects: int) -> int:
+    async with factory() as session:
+        user = User(username=name, email=f"{name}@example.com", password="x")
+        session.add(user)
+        await session.flush()
+
+        player = Player(user_id=user.id, title="Novice")
+        session.add(player)
+        await session.flush()
+        session.add(Profile(player_id=player.id))
+
+        pairs = []
+        for s in range(subjects):
+            subject = Subject(player_id=player.id, code_name=f"S{s}", description="bench", difficulty=1)
+            session.add(subject)
+            await session.flush()
+            session.add(Material(subject_id=subject.id, title="notes", type="Note", link="http://example.com"))
+            quest = Quest(subject_id=subject.id, description=f"quest {s}", difficulty=1)
+            session.add(quest)
+            await session.flush()
+            pairs.append((subject.id, quest.id))
+
+        for start in range(0, sessions, CHUNK):
+            count = min(CHUNK, sessions - start)
+            rows = [
+                dict(player_id=player.id, subject_id=pairs[i % subjects][0], quest_id=pairs[i % subjects][1], status="completed")
+                for i in range(start, start + count)
+            ]
+            result = await session.execute(insert(StudySession).returning(StudySession.id), rows)
+            await session.execute(insert(Task), [dict(study_session_id=session_id, description="task") for session_id in result.scalars()])
+
+        await session.commit()
+        return user.id
+
+
+async def _orm_path(factory, user_id: int) -> dict:
+    async with factory() as session:
+        start = time.perf_counter()
+        user = await session.get(User, user_id)
+        player = await session.scalar(select(Player).where(Player.user_id == user_id))
+        # what cascade="all, delete" used to load before deleting
+        for model, column in [
+            (Task, Task.study_session_id.in_(select(StudySession.id).where(StudySession.player_id == player.id))),
+            (StudySession, StudySession.player_id == player.id),
+            (Quest, Quest.subject_id.in_(select(Subject.id).where(Subject.player_id == player.id))),
+            (Material, Material.subject_id.in_(select(Subject.id).where(Subject.player_id == player.id))),
+            (Subject, Subject.player_id == player.id),
+            (Profile, Profile.player_id == player.id),
+        ]:
+            for row in (await session.scalars(select(model).where(column))).all():
+                await session.delete(row)
+        await session.delete(player)
+        await session.delete(user)
+        await session.commit()
+        return {"request": time.perf_counter() - start}
+
+
+async def _cascade_path(factory, user_id: int) -> dict:
+    async with factory() as session:
+        start = time.perf_counter()
+        user = await session.get(User, user_id)
+        await DeletionService.delete_user(session, user, DeleteMode.CASCADE)
+        await session.commit()
+        return {"request": time.perf_counter() - start}
+
+
+async def _soft_path(factory, user_id: int, batch_size: int) -> dict:
+    async with factory() as session:
+        start = time.perf_counter()
+        user = await session.get(User, user_id)
+        await DeletionService.delete_user(session, user, DeleteMode.SOFT)
+        await session.commit()
+        request = time.perf_counter() - start
+
+    purger = DeletionPurger(factory, batch_size=batch_size, pause=0, interval=60)
+    start = time.perf_counter()
+    await purger.purge_pending()
+    return {"request": request, "purge": time.perf_counter() - start}
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="sqlite+aiosqlite:///bench_delete.db")
+    parser.add_argument("--sessions", type=int, default=100_000)
+    parser.add_argument("--subjects", type=int, default=20)
+    parser.add_argument("--batch-size", type=int, default=2000)
+    args = parser.parse_args()
+
+    engine = create_async_engine(args.url)
+    if engine.dialect.name == "sqlite":
+        @event.listens_for(engine.sync_engine, "connect")
+        def _foreign_keys(dbapi_connection, _):
+            dbapi_connection.cursor().execute("PRAGMA foreign_keys=ON")
+
+    factory = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.create_all)
+            await SearchService.ensure_schema(conn)
+
+        results = {}
+        for name, path in [
+            ("orm", _orm_path),
+            ("cascade", _cascade_path),
+            ("soft", lambda f, user_id: _soft_path(f, user_id, args.batch_size)),
+        ]:
+            user_id = await _seed(factory, f"bench_{name}_{time.time_ns()}", args.sessions, args.subjects)
+            results[name] = await path(factory, user_id)
+
+        print(f"{args.sessions} study sessions (+ as many tasks), {args.subjects} subjects:")
+        for name, timings in results.items():
+            line = f"  {name:8} request {timings['request'] * 1000:10.1f} ms"
+            if "purge" in timings:
+                line += f"   background purge {timings['purge'] * 1000:10.1f} ms"
+            print(line)
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
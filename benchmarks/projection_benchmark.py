@@ -0,0 +1,108 @@
+"""ORM entity reads vs. column projections for list endpoints.
+
+Seeds one subject with ``--quests`` quests into a scratch database, then times the
+full read path of ``GET /subjects/{id}/quests`` both ways:
+
+  * orm:        select(Quest) -> ORM entities -> QuestRead -> response_model
+                re-validation + jsonable_encoder (the previous path)
+  * projection: select(<QuestRead columns>) -> Row -> QuestRead -> JSON bytes
+
+Usage:
+    python -m benchmarks.projection_benchmark [--url sqlite+aiosqlite:///bench.db] [--quests 5000]
+
+Use a scratch database: the tables are created and the rows are inserted there.
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlmodel import SQLModel, select
+
+from app.core.responses import SchemaResponse
+from app.crud.subject_crud import crud_read_subject_all_quests
+from app.models import Player, Quest, Subject, User
+from app.schemas.quest_schema import QuestRead
+
+
+async def _seed(factory, quests: int) -> int:
+    async with factory() as session:
+        user = User(username="bench", email="bench@example.com", password="x")
+        session.add(user)
+        await session.flush()
+
+        player = Player(user_id=user.id, title="Novice")
+        session.add(player)
+        await session.flush()
+
+        subject = Subject(player_id=player.id, code_name="BENCH", description="bench", difficulty=1)
+        session.add(subject)
+        await session.flush()
+
+        session.add_all(
+            Quest(subject_id=subject.id, description=f"quest {i}", difficulty=1 + i % 5) for i in range(quests)
+        )
+        await session.commit()
+        return subject.id
+
+
+async def _orm_path(session: AsyncSession, subject_id: int) -> bytes:
+    result = await session.scalars(select(Quest).where(Quest.subject_id == subject_id))
+    quests = [
+        QuestRead(
+            id=quest.id,
+            subject_id=quest.subject_id,
+            description=quest.description,
+            difficulty=quest.difficulty,
+            status=quest.status,
+            created_at=quest.created_at,
+        )
+        for quest in result.all()
+    ]
+    validated = TypeAdapter(list[QuestRead]).validate_python(jsonable_encoder(quests))
+    return json.dumps(jsonable_encoder(validated)).encode()
+
+
+async def _projection_path(session: AsyncSession, subject_id: int) -> bytes:
+    return SchemaResponse(await crud_read_subject_all_quests.uncached(session, subject_id)).body
+
+
+async def _time(factory, path, subject_id: int, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        async with factory() as session:
+            start = time.perf_counter()
+            await path(session, subject_id)
+            best = min(best, time.perf_counter() - start)
+    return best
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="sqlite+aiosqlite:///bench_projection.db")
+    parser.add_argument("--quests", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    engine = create_async_engine(args.url)
+    factory = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.create_all)
+        subject_id = await _seed(factory, args.quests)
+
+        orm = await _time(factory, _orm_path, subject_id, args.repeat)
+        projection = await _time(factory, _projection_path, subject_id, args.repeat)
+        print(f"{args.quests} quests, best of {args.repeat}:")
+        print(f"  orm        {orm * 1000:8.2f} ms")
+        print(f"  projection {projection * 1000:8.2f} ms  ({orm / projection:.1f}x faster)")
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
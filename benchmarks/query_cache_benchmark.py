@@ -0,0 +1,138 @@
+"""Measure what the statement caches save on the hot lookup queries.
+
+For each hot query this reports:
+  * client side: building + executing a fresh ``select()`` vs. the cached ``lambda_stmt``
+  * server side (Postgres only): mean latency with SQLAlchemy's prepared statement
+    cache disabled vs. enabled, i.e. parse/plan on every execution vs. reuse, and the
+    planning time Postgres reports for one execution of the statement
+
+Usage:
+    python -m benchmarks.query_cache_benchmark [--url URL] [--iterations 500]
+
+The URL defaults to DATABASE_URL. Rows with id 1 are looked up, so point it at a
+database that has some data (a missing row still exercises parse/plan).
+"""
+import argparse
+import asyncio
+import time
+from uuid import uuid4
+
+from sqlalchemy import and_, exists, lambda_stmt, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.orm import selectinload
+from sqlmodel import select
+
+from app.core.config import settings
+from app.models import Quest, StudySession, Subject, User
+
+
+PLAIN_QUERIES = {
+    "get_current_user": lambda row_id: select(User).where(User.id == row_id),
+    "_get_quest_or_error": lambda row_id: select(Quest).where(Quest.id == row_id),
+    "_get_study_session_or_error": lambda row_id: select(StudySession)
+    .where(StudySession.id == row_id)
+    .options(selectinload(StudySession.tasks), selectinload(StudySession.quest)),
+    "_validate_new_quest": lambda row_id: select(
+        exists().where(and_(Quest.subject_id == row_id, Quest.description == "bench")).label("quest_exists"),
+        exists().where(Subject.id == row_id).label("subject_exists"),
+    ),
+}
+
+LAMBDA_QUERIES = {
+    "get_current_user": lambda row_id: lambda_stmt(lambda: select(User).where(User.id == row_id)),
+    "_get_quest_or_error": lambda row_id: lambda_stmt(lambda: select(Quest).where(Quest.id == row_id)),
+    "_get_study_session_or_error": lambda row_id: lambda_stmt(
+        lambda: select(StudySession)
+        .where(StudySession.id == row_id)
+        .options(selectinload(StudySession.tasks), selectinload(StudySession.quest))
+    ),
+    "_validate_new_quest": lambda row_id: lambda_stmt(
+        lambda: select(
+            exists().where(and_(Quest.subject_id == row_id, Quest.description == "bench")).label("quest_exists"),
+            exists().where(Subject.id == row_id).label("subject_exists"),
+        )
+    ),
+}
+
+
+async def _time_queries(engine, queries: dict, iterations: int) -> dict:
+    timings = {}
+    async with engine.connect() as conn:
+        for name, build in queries.items():
+            await conn.execute(build(1))  # warm up caches
+            start = time.perf_counter()
+            for _ in range(iterations):
+                await conn.execute(build(1))
+            timings[name] = (time.perf_counter() - start) / iterations
+        await conn.rollback()
+    return timings
+
+
+async def _planning_times(engine) -> dict:
+    planning = {}
+    async with engine.connect() as conn:
+        for name, build in PLAIN_QUERIES.items():
+            statement = build(1)
+            compiled = statement.compile(engine.sync_engine, compile_kwargs={"literal_binds": True})
+            result = await conn.execute(text(f"EXPLAIN (ANALYZE, SUMMARY ON) {compiled}"))
+            for (line,) in result:
+                if line.startswith("Planning Time"):
+                    planning[name] = float(line.split(":")[1].split()[0]) / 1000
+        await conn.rollback()
+    return planning
+
+
+def _report(title: str, baseline: dict, cached: dict, baseline_label: str, cached_label: str) -> None:
+    print(f"\n{title}")
+    for name in baseline:
+        saved = baseline[name] - cached[name]
+        print(
+            f"  {name:<30} {baseline_label} {baseline[name] * 1e6:9.1f} us | "
+            f"{cached_label} {cached[name] * 1e6:9.1f} us | saved {saved * 1e6:9.1f} us"
+        )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=settings.DATABASE_URL)
+    parser.add_argument("--iterations", type=int, default=500)
+    args = parser.parse_args()
+
+    engine = create_async_engine(args.url)
+    try:
+        plain = await _time_queries(engine, PLAIN_QUERIES, args.iterations)
+        cached = await _time_queries(engine, LAMBDA_QUERIES, args.iterations)
+        _report("Client side (statement construction + SQL compilation cache)", plain, cached, "select()", "lambda_stmt")
+    finally:
+        await engine.dispose()
+
+    if make_url(args.url).get_driver_name() != "asyncpg":
+        return
+
+    def pgbouncer_engine(cache_size: int):
+        return create_async_engine(
+            args.url,
+            connect_args={
+                "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+                "prepared_statement_cache_size": cache_size,
+                "statement_cache_size": 0,
+            },
+        )
+
+    uncached_engine, cached_engine = pgbouncer_engine(0), pgbouncer_engine(settings.DB_PREPARED_STATEMENT_CACHE_SIZE or 100)
+    try:
+        unprepared = await _time_queries(uncached_engine, LAMBDA_QUERIES, args.iterations)
+        prepared = await _time_queries(cached_engine, LAMBDA_QUERIES, args.iterations)
+        _report("Server side (parse/plan per execution vs. reused prepared statement)", unprepared, prepared, "no cache", "cached")
+
+        print("\nPostgres planning time per execution (what a reused generic plan skips)")
+        for name, seconds in (await _planning_times(cached_engine)).items():
+            print(f"  {name:<30} {seconds * 1e6:9.1f} us")
+    finally:
+        await uncached_engine.dispose()
+        await cached_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
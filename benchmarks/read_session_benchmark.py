@@ -0,0 +1,86 @@
+"""Compare the read session modes on a typical GET handler.
+
+Runs ``crud_read_subject_all_quests`` the way a request does (lazy session, released
+when the handler returns) once per DB_READ_SESSION_MODE and reports latency and, on
+asyncpg, the number of statements sent to the server per request (BEGIN/COMMIT/
+ROLLBACK included), i.e. the round trips each mode costs.
+
+Usage:
+    python -m benchmarks.read_session_benchmark [--url URL] [--subject-id 1] [--requests 200]
+"""
+import argparse
+import asyncio
+import time
+
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.core.database import LazySession
+from app.crud.subject_crud import crud_read_subject_all_quests
+
+MODES = {
+    "transaction": {},
+    "read_only": {"postgresql_readonly": True},
+    "autocommit": {"isolation_level": "AUTOCOMMIT"},
+}
+
+
+async def _run_mode(engine, options: dict, subject_id: int, requests: int) -> tuple[float, float | None]:
+    bind = engine.execution_options(**options) if options else engine
+    factory = sessionmaker(bind=bind, class_=AsyncSession, expire_on_commit=False, autoflush=False)
+
+    statements = 0
+
+    def count_statement(record) -> None:
+        nonlocal statements
+        statements += 1
+
+    logged_connections = set()
+    counting = engine.dialect.driver == "asyncpg"
+
+    start = time.perf_counter()
+    for _ in range(requests):
+        session = LazySession(factory)
+        try:
+            if counting:
+                conn = await session.connection()
+                raw = (await conn.get_raw_connection()).driver_connection
+                if id(raw) not in logged_connections:
+                    raw.add_query_logger(count_statement)
+                    logged_connections.add(id(raw))
+            await crud_read_subject_all_quests.uncached(session, subject_id)
+        finally:
+            await session.release()
+    elapsed = (time.perf_counter() - start) / requests
+
+    return elapsed, (statements / requests if counting else None)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=settings.DATABASE_URL)
+    parser.add_argument("--subject-id", type=int, default=1)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    engine = create_async_engine(args.url, pool_size=1, max_overflow=0)
+    try:
+        baseline = None
+        for mode, options in MODES.items():
+            if "postgresql_readonly" in options and engine.dialect.name != "postgresql":
+                continue
+            await _run_mode(engine, options, args.subject_id, 5)  # warm up
+            latency, statements = await _run_mode(engine, options, args.subject_id, args.requests)
+            baseline = baseline or (latency, statements)
+
+            line = f"{mode:>12}: {latency * 1000:7.2f} ms/request"
+            if statements is not None:
+                line += f" | {statements:4.1f} statements/request ({baseline[1] - statements:+.1f} saved)"
+            print(line)
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,119 @@
+"""Sign-up latency: the previous ORM path vs. the INSERT ... RETURNING paths.
+
+Creates ``--requests`` accounts (user + player + profile) per path and reports the
+mean latency and, on asyncpg, the statements sent to the server per sign-up
+(BEGIN/COMMIT included), i.e. the round trips to a remote database:
+
+  * orm:       add User, flush, add Player, flush, add Profile, commit, refresh
+  * returning: three INSERT ... RETURNING and a commit (the non-Postgres fallback)
+  * chained:   one statement of chained data-modifying CTEs in autocommit (Postgres)
+
+The password is hashed once up front: bcrypt costs the same on every path (and runs
+in a thread since this change), so only the database work is timed.
+
+Usage:
+    python -m benchmarks.sign_up_benchmark [--url URL] [--requests 200]
+
+Use a scratch database: the tables are created and the accounts are inserted there.
+"""
+import argparse
+import asyncio
+import itertools
+import time
+
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlmodel import SQLModel
+
+from app.core.database import LazySession
+from app.core.security import Security
+from app.crud.auth_crud import _insert_sign_up_chained, _insert_sign_up_returning
+from app.models import Player, Profile, User
+from app.schemas.auth_schema import SignUpRequest
+
+# unique usernames (at most 12 characters) across runs against the same database
+_accounts = itertools.count(time.time_ns() % 10**10)
+
+
+async def _orm_sign_up(session, sign_up_data: SignUpRequest, hashed_password: str) -> tuple[int, int]:
+    user = User(username=sign_up_data.username, email=sign_up_data.email, password=hashed_password)
+    session.add(user)
+    await session.flush()
+    player = Player(user_id=user.id)
+    session.add(player)
+    await session.flush()
+    session.add(Profile(player_id=player.id, avatar_url=sign_up_data.avatar_url))
+    await session.commit()
+    await session.refresh(user)
+    return user.id, player.id
+
+
+async def _run_path(engine, factory, path, requests: int, hashed_password: str) -> tuple[float, float | None]:
+    statements = 0
+
+    def count_statement(record) -> None:
+        nonlocal statements
+        statements += 1
+
+    logged_connections = set()
+    counting = engine.dialect.driver == "asyncpg"
+
+    elapsed = 0.0
+    for i in range(requests):
+        account = next(_accounts)
+        sign_up_data = SignUpRequest(username=f"b{account}", email=f"b{account}@example.com", password="x" * 8)
+        session = LazySession(factory)
+        try:
+            if counting:
+                # a throwaway session just to hook the pooled connection (pool_size=1)
+                probe = factory()
+                raw = (await (await probe.connection()).get_raw_connection()).driver_connection
+                await probe.close()
+                if id(raw) not in logged_connections:
+                    raw.add_query_logger(count_statement)
+                    logged_connections.add(id(raw))
+            start = time.perf_counter()
+            await path(session, sign_up_data, hashed_password)
+            elapsed += time.perf_counter() - start
+        finally:
+            await session.release()
+
+    return elapsed / requests, (statements / requests if counting else None)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="sqlite+aiosqlite:///bench_sign_up.db")
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    engine = create_async_engine(args.url, pool_size=1, max_overflow=0)
+    factory = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    hashed_password = Security.hash_string("x" * 8)
+
+    paths = [("orm", _orm_sign_up), ("returning", _insert_sign_up_returning)]
+    if engine.dialect.name == "postgresql":
+        paths.append(("chained", _insert_sign_up_chained))
+
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.create_all)
+
+        baseline = None
+        for name, path in paths:
+            await _run_path(engine, factory, path, 5, hashed_password)  # warm up
+            latency, statements = await _run_path(engine, factory, path, args.requests, hashed_password)
+            baseline = baseline or (latency, statements)
+
+            line = f"{name:>10}: {latency * 1000:7.2f} ms/sign-up ({latency / baseline[0]:4.2f}x)"
+            if statements is not None:
+                line += f" | {statements:4.1f} statements/sign-up"
+            print(line)
+        if engine.dialect.name != "postgresql":
+            print("   chained: Postgres only (SQLite cannot INSERT inside a WITH clause)")
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,88 @@
+"""Measure cold-start cost of the API.
+
+Reports, for each STARTUP_MODE:
+  * import time of ``app.main`` in a fresh interpreter
+  * time from spawning uvicorn until the first request succeeds
+
+Usage:
+    python -m benchmarks.startup_benchmark [--runs 3] [--modes create_all,migrations]
+
+The server talks to whatever DATABASE_URL is configured, so time-to-first-request
+includes the real connect/TLS cost of that database.
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+IMPORT_SNIPPET = (
+    "import time; start = time.perf_counter(); import app.main; "
+    "print(time.perf_counter() - start)"
+)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def measure_import(mode: str) -> float:
+    env = {**os.environ, "STARTUP_MODE": mode}
+    output = subprocess.check_output([sys.executable, "-c", IMPORT_SNIPPET], cwd=PROJECT_ROOT, env=env)
+    return float(output.decode().strip().splitlines()[-1])
+
+
+def measure_first_request(mode: str, timeout: float = 120.0) -> float:
+    port = _free_port()
+    env = {**os.environ, "STARTUP_MODE": mode}
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=PROJECT_ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+    try:
+        while time.perf_counter() - start < timeout:
+            if server.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with code {server.returncode} in mode {mode!r}")
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - start
+            except OSError:
+                time.sleep(0.01)
+        raise TimeoutError(f"No successful request within {timeout}s in mode {mode!r}")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--modes", default="create_all,migrations")
+    args = parser.parse_args()
+
+    for mode in args.modes.split(","):
+        imports = [measure_import(mode) for _ in range(args.runs)]
+        first_requests = [measure_first_request(mode) for _ in range(args.runs)]
+        print(
+            f"{mode:>12}: import {statistics.median(imports) * 1000:8.1f} ms | "
+            f"time-to-first-request {statistics.median(first_requests) * 1000:8.1f} ms "
+            f"(median of {args.runs})"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -8,7 +8,7 @@ from alembic import context
 from app.core.config import settings 
 from app.core.database import engine  # ✅ Import your database engine
 from sqlmodel import SQLModel
-from app.models import user_model, player_model, profile_model, subject_model, study_session_model, quest_model, material_model, task_model
+from app.models import user_model, player_model, profile_model, subject_model, study_session_model, quest_model, material_model, task_model, quest_review_model, idempotency_model, token_version_model, refresh_token_model
 
 import asyncio
 # this is the Alembic Config object, which provides
@@ -36,6 +36,17 @@ target_metadata = SQLModel.metadata
 
 connectable = create_async_engine(settings.DATABASE_URL, echo=True, future=True)
 
+# ✅ Tables managed with raw DDL (not SQLModel metadata) that autogenerate must not drop
+UNMANAGED_TABLES = {"search_document"}
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    if type_ == "table" and name in UNMANAGED_TABLES:
+        return False
+    if type_ == "index" and getattr(object, "table", None) is not None and object.table.name in UNMANAGED_TABLES:
+        return False
+    return True
+
 
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode.
@@ -53,6 +64,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -65,6 +77,7 @@ def do_migrations(connection):
     context.configure(
         connection=connection,
         target_metadata=target_metadata,
+        include_object=include_object,
         compare_type=True
     )
     with context.begin_transaction():
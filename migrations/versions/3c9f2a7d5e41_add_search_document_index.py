@@ -0,0 +1,60 @@
+"""add search_document full-text index
+
+Revision ID: 3c9f2a7d5e41
+Revises: 1210686e697f
+Create Date: 2026-10-19 10:12:44.120391
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.services.search_service import PostgresSearchBackend, SEARCH_TABLE
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c9f2a7d5e41'
+down_revision: Union[str, None] = '1210686e697f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+BACKFILL = [
+    f"""
+    INSERT INTO {SEARCH_TABLE} (entity_type, entity_id, player_id, subject_id, title, body)
+    SELECT 'subject', subject.id, subject.player_id, subject.id, subject.code_name, coalesce(subject.description, '')
+    FROM subject
+    ON CONFLICT (entity_type, entity_id) DO NOTHING
+    """,
+    f"""
+    INSERT INTO {SEARCH_TABLE} (entity_type, entity_id, player_id, subject_id, title, body)
+    SELECT 'quest', quest.id, subject.player_id, subject.id, quest.description, ''
+    FROM quest JOIN subject ON subject.id = quest.subject_id
+    ON CONFLICT (entity_type, entity_id) DO NOTHING
+    """,
+    f"""
+    INSERT INTO {SEARCH_TABLE} (entity_type, entity_id, player_id, subject_id, title, body)
+    SELECT 'material', material.id, subject.player_id, subject.id, material.title, material.type::text
+    FROM material JOIN subject ON subject.id = material.subject_id
+    ON CONFLICT (entity_type, entity_id) DO NOTHING
+    """,
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Postgres only: other dialects build their index in create_db_and_tables
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    for ddl in PostgresSearchBackend.SCHEMA + BACKFILL:
+        op.execute(sa.text(ddl))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    op.execute(sa.text(f"DROP TABLE IF EXISTS {SEARCH_TABLE}"))
@@ -0,0 +1,51 @@
+import math
+
+import pytest
+
+from app.core.bloom import BloomFilter
+
+
+def test_sizing_follows_the_optimal_formulas():
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    # m = -n ln p / (ln 2)^2, k = m / n ln 2
+    assert bloom.size == math.ceil(-1000 * math.log(0.01) / math.log(2) ** 2) == 9586
+    assert bloom.hash_count == 7
+    assert len(bloom._bits) == (bloom.size + 7) // 8
+
+
+def test_sized_for_leaves_headroom_with_a_minimum():
+    assert BloomFilter.sized_for(10_000, 0.01).capacity == 20_000
+    assert BloomFilter.sized_for(0, 0.01).capacity == 1024
+    assert BloomFilter.sized_for(100, 0.01, headroom=3, minimum=10).capacity == 300
+
+
+def test_degenerate_capacity_still_works():
+    bloom = BloomFilter(capacity=0)
+    bloom.add("x")
+    assert "x" in bloom
+    assert bloom.hash_count >= 1
+
+
+def test_no_false_negatives():
+    bloom = BloomFilter(capacity=5000, error_rate=0.01)
+    items = [f"u:user{i}" for i in range(5000)]
+    bloom.update(items)
+
+    assert bloom.count == 5000
+    assert all(item in bloom for item in items)
+
+
+def test_false_positive_rate_at_capacity():
+    bloom = BloomFilter(capacity=5000, error_rate=0.01)
+    bloom.update(f"in:{i}" for i in range(5000))
+
+    assert bloom.false_positive_rate() == pytest.approx(0.01, rel=0.1)
+    measured = sum(f"out:{i}" in bloom for i in range(20_000)) / 20_000
+    assert measured < 0.02
+
+
+def test_empty_filter_contains_nothing():
+    bloom = BloomFilter(capacity=100)
+    assert "anything" not in bloom
+    assert bloom.false_positive_rate() == 0.0
+    assert bloom.stats()["items"] == 0
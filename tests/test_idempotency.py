@@ -0,0 +1,190 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.idempotency import DatabaseIdempotencyStore, IdempotencyMiddleware, MemoryIdempotencyStore
+
+
+def _app(store, calls: dict, delay: float = 0.0) -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/items")
+    async def create_item(request: Request):
+        calls["n"] += 1
+        body = await request.json()
+        await asyncio.sleep(delay)
+        if body.get("fail"):
+            return JSONResponse({"detail": "boom"}, status_code=500)
+        response = JSONResponse({"call": calls["n"], **body})
+        response.set_cookie("session", "secret")
+        return response
+
+    @app.post("/auth/sign_in")
+    async def sign_in():
+        calls["n"] += 1
+        return {"access_token": f"token{calls['n']}"}
+
+    @app.post("/auth/sign_up")
+    async def sign_up():
+        calls["n"] += 1
+        response = JSONResponse({"user_info": {"id": calls["n"]}, "access_token": "secret"})
+        response.set_cookie("refresh", "secret")
+        return response
+
+    app.add_middleware(
+        IdempotencyMiddleware, store=store, wait_seconds=2, excluded_paths=[r"^/auth/(sign_in|sign_out|refresh_token)$"]
+    )
+    return app
+
+
+async def _database_store(tmp_path) -> DatabaseIdempotencyStore:
+    from app.models import IdempotencyRecord
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'idempotency.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(IdempotencyRecord.__table__.create)
+    return DatabaseIdempotencyStore(engine, ttl=60)
+
+
+@pytest.fixture(params=["memory", "database"])
+def make_store(request, tmp_path):
+    async def make():
+        if request.param == "memory":
+            return MemoryIdempotencyStore(ttl=60, max_entries=100)
+        return await _database_store(tmp_path)
+
+    return make
+
+
+def _run(make_store, scenario, delay: float = 0.0):
+    async def run():
+        store = await make_store()
+        calls = {"n": 0}
+        transport = httpx.ASGITransport(app=_app(store, calls, delay))
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            await scenario(client, calls, store)
+        if isinstance(store, DatabaseIdempotencyStore):
+            await store.engine.dispose()
+
+    asyncio.run(run())
+
+
+def test_retry_replays_the_stored_response(make_store):
+    async def scenario(client, calls, store):
+        headers = {"Idempotency-Key": "k1"}
+        first = await client.post("/items", json={"a": 1}, headers=headers)
+        retry = await client.post("/items", json={"a": 1}, headers=headers)
+
+        assert calls["n"] == 1
+        assert first.json() == retry.json() == {"call": 1, "a": 1}
+        assert "idempotent-replayed" not in first.headers
+        assert retry.headers["idempotent-replayed"] == "true"
+        assert "set-cookie" in first.headers and "set-cookie" not in retry.headers
+
+    _run(make_store, scenario)
+
+
+def test_concurrent_duplicates_wait_for_the_first(make_store):
+    async def scenario(client, calls, store):
+        headers = {"Idempotency-Key": "k1"}
+        responses = await asyncio.gather(*(client.post("/items", json={"a": 1}, headers=headers) for _ in range(5)))
+
+        assert calls["n"] == 1
+        assert [response.status_code for response in responses] == [200] * 5
+        assert sum(response.headers.get("idempotent-replayed") == "true" for response in responses) == 4
+
+    _run(make_store, scenario, delay=0.1)
+
+
+def test_same_key_different_request_is_rejected(make_store):
+    async def scenario(client, calls, store):
+        headers = {"Idempotency-Key": "k1"}
+        await client.post("/items", json={"a": 1}, headers=headers)
+        response = await client.post("/items", json={"a": 2}, headers=headers)
+
+        assert response.status_code == 422
+        assert calls["n"] == 1
+
+    _run(make_store, scenario)
+
+
+def test_keys_are_scoped_to_the_caller(make_store):
+    async def scenario(client, calls, store):
+        await client.post("/items", json={"a": 1}, headers={"Idempotency-Key": "k1", "Authorization": "Bearer a"})
+        response = await client.post("/items", json={"a": 1}, headers={"Idempotency-Key": "k1", "Authorization": "Bearer b"})
+
+        assert "idempotent-replayed" not in response.headers
+        assert calls["n"] == 2
+
+    _run(make_store, scenario)
+
+
+def test_server_errors_are_not_stored(make_store):
+    async def scenario(client, calls, store):
+        headers = {"Idempotency-Key": "k1"}
+        first = await client.post("/items", json={"fail": True}, headers=headers)
+        retry = await client.post("/items", json={"fail": True}, headers=headers)
+
+        assert first.status_code == retry.status_code == 500
+        assert calls["n"] == 2
+
+    _run(make_store, scenario)
+
+
+def test_excluded_paths_are_never_stored(make_store):
+    async def scenario(client, calls, store):
+        headers = {"Idempotency-Key": "k1"}
+        first = await client.post("/auth/sign_in", headers=headers)
+        retry = await client.post("/auth/sign_in", headers=headers)
+
+        assert first.json() != retry.json()
+        assert "idempotent-replayed" not in retry.headers
+        assert calls["n"] == 2
+
+    _run(make_store, scenario)
+
+
+def test_tokens_are_not_stored(make_store):
+    async def scenario(client, calls, store):
+        headers = {"Idempotency-Key": "k1"}
+        first = await client.post("/auth/sign_up", headers=headers)
+        retry = await client.post("/auth/sign_up", headers=headers)
+
+        assert calls["n"] == 1
+        assert first.json()["access_token"] == "secret" and "set-cookie" in first.headers
+        assert retry.headers["idempotent-replayed"] == "true"
+        assert retry.json() == {"user_info": {"id": 1}}
+        assert "set-cookie" not in retry.headers
+
+    _run(make_store, scenario)
+
+
+def test_invalid_key_is_rejected(make_store):
+    async def scenario(client, calls, store):
+        response = await client.post("/items", json={}, headers={"Idempotency-Key": "x" * 65})
+
+        assert response.status_code == 400
+        assert calls["n"] == 0
+
+    _run(make_store, scenario)
+
+
+def test_memory_store_expires_and_evicts():
+    async def run():
+        store = MemoryIdempotencyStore(ttl=60, max_entries=2)
+        assert await store.claim("a", "f")
+        assert not await store.claim("a", "f")
+        await store.claim("b", "f")
+        await store.claim("c", "f")
+        assert await store.get("a") is None  # least recently used, evicted
+
+        expired = MemoryIdempotencyStore(ttl=-1, max_entries=2)
+        await expired.claim("a", "f")
+        assert await expired.get("a") is None
+        assert await expired.claim("a", "f")
+
+    asyncio.run(run())
@@ -0,0 +1,123 @@
+import asyncio
+
+import pytest
+
+from app.core.rate_limit import (
+    SLIDING_WINDOW,
+    TOKEN_BUCKET,
+    MemoryRateLimitBackend,
+    RateLimitPolicy,
+    SqliteRateLimitBackend,
+    take,
+)
+
+
+def _hits(policy: RateLimitPolicy, times: list[float], state=None):
+    results = []
+    for now in times:
+        state, result = take(state, policy, now)
+        results.append(result)
+    return state, results
+
+
+def test_policy_parse():
+    policy = RateLimitPolicy.parse("sign_in", "10/60", algorithm=SLIDING_WINDOW)
+    assert (policy.limit, policy.period, policy.algorithm) == (10, 60.0, SLIDING_WINDOW)
+    assert RateLimitPolicy.parse("x", "5").period == 60
+
+
+def test_token_bucket_allows_a_burst_then_one_request_per_refill():
+    policy = RateLimitPolicy("t", limit=10, period=60, algorithm=TOKEN_BUCKET)
+    state, results = _hits(policy, [0.0] * 11)
+
+    assert all(result.allowed for result in results[:10])
+    assert [result.remaining for result in results[:3]] == [9, 8, 7]
+    denied = results[10]
+    assert not denied.allowed
+    assert denied.retry_after == pytest.approx(6.0)  # one token refills every 60 / 10 seconds
+    assert denied.reset_after == pytest.approx(60.0)
+
+    _, [early] = _hits(policy, [5.9], state)
+    assert not early.allowed
+    _, [refilled] = _hits(policy, [6.0], state)
+    assert refilled.allowed and refilled.retry_after == 0.0
+
+
+def test_sliding_window_full_window_waits_for_it_to_slide_out():
+    policy = RateLimitPolicy("s", limit=10, period=60, algorithm=SLIDING_WINDOW)
+    state, results = _hits(policy, [0.0] * 11)
+
+    assert all(result.allowed for result in results[:10])
+    denied = results[10]
+    assert not denied.allowed
+    # next window, once 10 * (1 - elapsed) + 1 <= 10: elapsed 0.1, i.e. 60 + 6 seconds
+    assert denied.retry_after == pytest.approx(66.0)
+
+    _, [early] = _hits(policy, [65.9], state)
+    assert not early.allowed
+    _, [on_time] = _hits(policy, [66.0], state)
+    assert on_time.allowed
+
+
+def test_sliding_window_weights_the_previous_window():
+    policy = RateLimitPolicy("s", limit=10, period=60, algorithm=SLIDING_WINDOW)
+    state, _ = _hits(policy, [0.0] * 10)
+
+    # half way through the next window half of the previous one still counts: 5 more fit
+    state, results = _hits(policy, [90.0] * 6, state)
+    assert [result.allowed for result in results] == [True] * 5 + [False]
+    # 10 * (1 - elapsed) + 5 + 1 <= 10 once elapsed reaches 0.6
+    assert results[-1].retry_after == pytest.approx(6.0)
+
+    _, [on_time] = _hits(policy, [96.0], state)
+    assert on_time.allowed
+
+
+def test_sliding_window_forgets_windows_older_than_the_previous_one():
+    policy = RateLimitPolicy("s", limit=2, period=60, algorithm=SLIDING_WINDOW)
+    state, _ = _hits(policy, [0.0, 0.0])
+    _, [result] = _hits(policy, [125.0], state)
+    assert result.allowed and result.remaining == 1
+
+
+def test_memory_backend_evicts_least_recently_used_keys():
+    backend = MemoryRateLimitBackend(max_keys=2)
+    policy = RateLimitPolicy("m", limit=1, period=60)
+
+    async def run():
+        assert (await backend.hit("a", policy)).allowed
+        assert (await backend.hit("b", policy)).allowed
+        assert not (await backend.hit("a", policy)).allowed  # "a" is now the most recent
+        assert (await backend.hit("c", policy)).allowed  # evicts "b"
+        assert (await backend.hit("b", policy)).allowed  # starts over
+        assert not (await backend.hit("c", policy)).allowed
+
+    asyncio.run(run())
+
+
+def test_sqlite_backend_is_shared_through_the_file(tmp_path):
+    path = str(tmp_path / "rate_limit.db")
+    worker_a = SqliteRateLimitBackend(path, max_keys=100)
+    worker_b = SqliteRateLimitBackend(path, max_keys=100)
+    policy = RateLimitPolicy("q", limit=3, period=60)
+
+    async def run():
+        results = [await backend.hit("ip:1", policy) for backend in (worker_a, worker_b, worker_a, worker_b)]
+        assert [result.allowed for result in results] == [True, True, True, False]
+        assert (await worker_b.hit("ip:2", policy)).allowed
+
+    asyncio.run(run())
+
+
+def test_sqlite_backend_prunes_past_max_keys(tmp_path):
+    backend = SqliteRateLimitBackend(str(tmp_path / "rate_limit.db"), max_keys=5)
+    backend.PRUNE_EVERY_NEW_KEYS = 10
+    policy = RateLimitPolicy("q", limit=1, period=60)
+
+    async def run():
+        for i in range(10):
+            await backend.hit(f"ip:{i}", policy)
+
+    asyncio.run(run())
+    count = backend._connect().execute("SELECT count(*) FROM rate_limit").fetchone()[0]
+    assert count == 5